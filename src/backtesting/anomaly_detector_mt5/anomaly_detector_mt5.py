@@ -62,7 +62,13 @@ class BacktestIsolationForestAnomalyDetector:
                 f"equal to the window size ({self.window_size})."
             )
 
-        windows = self._create_windows(data_df)
+        self.fit_windows(self._create_windows(data_df))
+
+    def fit_windows(self, windows: np.ndarray):
+        """
+        Trains the model with windows already built and flattened as _create_windows() does,
+        e.g. slices of the windows of a whole history shared by several training periods.
+        """
         if windows.shape[0] == 0:  # Not enough data to create training windows.
             raise ValueError("Not enough data to create training windows.")
 
@@ -151,6 +157,22 @@ class BacktestIsolationForestAnomalyDetector:
         )
         return self.threshold  # Example usage:
 
+    def get_state(self) -> dict:
+        """Trained model and threshold, so a resumed backtest does not retrain it."""
+        return {
+            "window_size": self.window_size, "features": list(self.features), "model": self.model,
+            "trained": self.trained, "decision_scores_train": self.decision_scores_train, "threshold": self.threshold
+        }
+
+    def restore_state(self, state: dict) -> None:
+        self.window_size = state["window_size"]
+        self.features = list(state["features"])
+        self.num_features_per_timestep = len(self.features)
+        self.model = state["model"]
+        self.trained = state["trained"]
+        self.decision_scores_train = state["decision_scores_train"]
+        self.threshold = state["threshold"]
+
     def get_model_metrics(self):
         """
         Returns a dictionary with the model's configuration and current state metrics.
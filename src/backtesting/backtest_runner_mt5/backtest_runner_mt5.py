@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass, field
+from bar_store.bar_store import BarStore
+from backtesting.data_source_mt5.data_source_mt5 import MT5BacktestDataSource
+from backtesting.event_queue_mt5.event_queue_mt5 import BacktestEventQueue
+from backtesting.order_executor_mt5.order_executor_mt5 import BacktestOrderExecutor
+from backtesting.platform_conector_mt5.platform_connector_mt5 import BacktestPlatformConnector
+from backtesting_director.backtesting_director import BacktestingDirector
+from backtesting.backtest_snapshot_mt5.backtest_snapshot_mt5 import restore_snapshot, save_snapshot
+from portfolio.portfolio import Portfolio
+from position_sizer.position_sizer import PositionSizer
+from position_sizer.properties.position_sizer_properties import BaseSizingProps, FixedSizingProps
+from risk_manager.risk_manager import RiskManager
+from risk_manager.properties.risk_manager_properties import BaseRiskProps, MaxLeverageFactorRiskProps
+from strategy_manager.strategy_manager import StrategyManager
+from strategy_manager.properties.strategy_manager_properties import BaseStrategyProps
+
+
+@dataclass
+class BacktestRunResult:
+    """
+    Closed trades of an event-driven backtest run by run_backtest(), and its equity marked
+    to market after every bar (empty unless record_equity was set).
+    """
+    trade_log: list[dict] = field(default_factory=list)
+    initial_balance: float = 0.0
+    bars_processed: int = 0
+    equity_time: np.ndarray = field(default_factory=lambda: np.array([], dtype=np.int64))
+    equity: np.ndarray = field(default_factory=lambda: np.array([], dtype=np.float64))
+
+    def trade_log_df(self) -> pd.DataFrame:
+        """Trade log as the DataFrame consumed by DataDisplayMT5."""
+        return pd.DataFrame(self.trade_log)
+
+    @property
+    def net_profit(self) -> float:
+        return float(sum(trade["profit"] for trade in self.trade_log))
+
+    @property
+    def max_drawdown_pct(self) -> float:
+        """Largest fall of the closed-trade balance from its running peak, in percent."""
+        balance = self.initial_balance + np.cumsum([0.0] + [trade["profit"] for trade in self.trade_log])
+        peak = np.maximum.accumulate(balance)
+        drawdown = np.divide(peak - balance, peak, out=np.zeros(len(balance)), where=peak > 0)
+        return float(drawdown.max() * 100)
+
+
+def run_backtest(
+    strategy_properties: BaseStrategyProps | dict[int, BaseStrategyProps],
+    bars: dict[str, BarStore] | MT5BacktestDataSource,
+    timeframe: str,
+    sizing_properties: BaseSizingProps | None = None,
+    risk_properties: BaseRiskProps | None = None,
+    initial_balance: float = 10000.0,
+    magic_number: int = 0,
+    record_equity: bool = False,
+    snapshot_path: str | None = None,
+    fast_forward: bool = False,
+    cross_sectional: bool = False,
+    resample_timeframes: list[str] | None = None
+) -> BacktestRunResult:
+    """
+    Wire the backtest components around StrategyManager and BacktestingDirector, replay the
+    given bars (or a data source, which then provides the events queue) and return the closed
+    trades. Any strategy with a properties model known to StrategyManager can be run this way,
+    or several at once given as properties by magic number (magic_number is then the main one).
+    Sizing defaults to a fixed 0.1 lots and risk to a max leverage factor of 5.
+
+    With a snapshot_path the backtest resumes from the snapshot there, if any, so only the bars
+    after it are replayed (e.g. a longer date range with the same start), and the final state
+    is saved back to it. The result is the same as replaying all the bars.
+
+    fast_forward skips the bars on which the strategy declares it cannot signal (see
+    BacktestingDirector); the trades and equity are the same. cross_sectional computes the
+    signals of all the symbols of a bar time at once (see StrategyManager.flush_cross_section).
+    resample_timeframes builds those timeframes from the given bars, for strategies with one of
+    them as timeframe (see MT5BacktestDataSource); it does not apply to a given data source.
+    """
+    if isinstance(bars, MT5BacktestDataSource):
+        data_source = bars
+        events_queue = data_source.events_queue
+    else:
+        events_queue = BacktestEventQueue()
+        data_source = MT5BacktestDataSource.from_bars(
+            events_queue, bars, timeframe, resample_timeframes=resample_timeframes
+        )
+    platform_connector = BacktestPlatformConnector(initial_balance=initial_balance)
+    portfolio = Portfolio(magic_number=magic_number, platform_connector=platform_connector)
+    order_executor = BacktestOrderExecutor(platform_connector, events_queue, data_source, portfolio)
+    strategy_manager = StrategyManager(
+        events_queue, data_source, portfolio, order_executor, strategy_properties, cross_sectional=cross_sectional
+    )
+    director = BacktestingDirector(
+        events_queue=events_queue,
+        data_source=data_source,
+        strategy_manager=strategy_manager,
+        position_sizer=PositionSizer(
+            events_queue, data_source, sizing_properties or FixedSizingProps(volume=0.1)
+        ),
+        risk_manager=RiskManager(
+            events_queue, data_source, portfolio, risk_properties or MaxLeverageFactorRiskProps(max_leverage_factor=5),
+            magic_numbers=strategy_manager.magic_numbers
+        ),
+        order_executor=order_executor,
+        record_equity=record_equity,
+        fast_forward=fast_forward
+    )
+    if snapshot_path is not None:
+        restore_snapshot(director, snapshot_path)
+    director.run()
+    if snapshot_path is not None:
+        save_snapshot(director, snapshot_path)
+    result = BacktestRunResult(
+        trade_log=order_executor.trade_log, initial_balance=initial_balance, bars_processed=director.bars_processed
+    )
+    if director.equity_curve:
+        result.equity_time = np.array([bar_time for bar_time, _ in director.equity_curve], dtype=np.int64)
+        result.equity = np.array([equity for _, equity in director.equity_curve], dtype=np.float64)
+    return result
@@ -0,0 +1,49 @@
+import os
+import pickle
+from backtesting_director.backtesting_director import BacktestingDirector
+from logger.logger import get_logger
+
+logger = get_logger("backtest_snapshot")
+
+SNAPSHOT_VERSION = 1
+
+
+def save_snapshot(director: BacktestingDirector, path: str) -> None:
+    """
+    Write the full state of a backtest to path. The file is replaced atomically, so an
+    interrupted save leaves the previous snapshot intact.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    state = {"version": SNAPSHOT_VERSION, **director.get_state()}
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, "wb") as snapshot:
+        pickle.dump(state, snapshot, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporary_path, path)
+    logger.info(
+        "Backtest snapshot saved",
+        extra={"fields": {
+            "path": path, "bars": state["bars_processed"], "trades": len(state["order_executor"]["trade_log"])
+        }}
+    )
+
+
+def load_snapshot(path: str) -> dict:
+    with open(path, "rb") as snapshot:
+        state = pickle.load(snapshot)
+    if state.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"{path} is not a backtest snapshot of version {SNAPSHOT_VERSION}.")
+    return state
+
+
+def restore_snapshot(director: BacktestingDirector, path: str) -> bool:
+    """
+    Restore the snapshot at path, if there is one, into a director built with the same
+    components and bars that start like the snapshotted ones. Returns whether it was restored.
+    """
+    if not os.path.exists(path):
+        return False
+    director.restore_state(load_snapshot(path))
+    logger.info("Backtest resumed from snapshot", extra={"fields": {"path": path, "bars": director.bars_processed}})
+    return True
@@ -0,0 +1,126 @@
+import calendar
+import os
+import numpy as np
+from datetime import datetime
+from bar_store.bar_store import BarStore, BAR_COLUMNS
+
+
+# Fixed-width, packed on-disk record (60 bytes per bar)
+BAR_RECORD_DTYPE = np.dtype([
+    ('time', '<i8'),
+    ('open', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('close', '<f8'),
+    ('tickvol', '<i8'),
+    ('vol', '<i8'),
+    ('spread', '<i4'),
+])
+
+SECONDS_PER_DAY = 86400
+
+
+class MT5BarArchive:
+    """
+    Append-only bar archive backed by numpy.memmap.
+    Each symbol/timeframe is stored as a flat file of fixed-width records
+    (<symbol>_<TF>.bars) plus a sidecar daily index (<symbol>_<TF>.idx.npy) that maps every
+    UTC day to the position of its first record. Opening a date range only maps the
+    records of that range, so startup time and resident memory do not grow with the
+    length of the archived history.
+    """
+
+    def __init__(self, archive_dir: str):
+        self.archive_dir = archive_dir
+        os.makedirs(self.archive_dir, exist_ok=True)
+
+    def _records_path(self, symbol: str, timeframe: str) -> str:
+        return os.path.join(self.archive_dir, f"{symbol}_{timeframe.upper()}.bars")
+
+    def _index_path(self, symbol: str, timeframe: str) -> str:
+        return os.path.join(self.archive_dir, f"{symbol}_{timeframe.upper()}.idx.npy")
+
+    def _load_index(self, symbol: str, timeframe: str) -> np.ndarray:
+        path = self._index_path(symbol, timeframe)
+        if not os.path.exists(path):
+            return np.empty((0, 2), dtype=np.int64)
+        return np.load(path)
+
+    def num_records(self, symbol: str, timeframe: str) -> int:
+        path = self._records_path(symbol, timeframe)
+        if not os.path.exists(path):
+            return 0
+        return os.path.getsize(path) // BAR_RECORD_DTYPE.itemsize
+
+    def _open_records(self, symbol: str, timeframe: str, first: int, count: int) -> np.ndarray:
+        return np.memmap(
+            self._records_path(symbol, timeframe),
+            dtype=BAR_RECORD_DTYPE,
+            mode='r',
+            offset=first * BAR_RECORD_DTYPE.itemsize,
+            shape=(count,)
+        )
+
+    def last_time(self, symbol: str, timeframe: str) -> int | None:
+        """Open time (epoch seconds) of the last archived bar, or None if the archive is empty."""
+        count = self.num_records(symbol, timeframe)
+        if count == 0:
+            return None
+        return int(self._open_records(symbol, timeframe, count - 1, 1)['time'][0])
+
+    def append(self, symbol: str, timeframe: str, bars: BarStore) -> int:
+        """
+        Append bars to the archive. Bars that are not newer than the last archived bar are
+        skipped, so the same history can be appended repeatedly. Returns the number of
+        records written.
+        """
+        last_time = self.last_time(symbol, timeframe)
+        if last_time is not None:
+            bars = bars.slice(int(np.searchsorted(bars.time, last_time, side='right')), len(bars))
+        if len(bars) == 0:
+            return 0
+
+        records = np.empty(len(bars), dtype=BAR_RECORD_DTYPE)
+        for field in ('time',) + BAR_COLUMNS:
+            records[field] = getattr(bars, field)
+
+        first_position = self.num_records(symbol, timeframe)
+        with open(self._records_path(symbol, timeframe), 'ab') as records_file:
+            records_file.write(records.tobytes())
+
+        # Extend the daily index with the days that start in the appended block
+        index = self._load_index(symbol, timeframe)
+        days = records['time'] // SECONDS_PER_DAY
+        new_days, first_in_day = np.unique(days, return_index=True)
+        if len(index) > 0:
+            is_new = new_days > index[-1, 0]
+            new_days, first_in_day = new_days[is_new], first_in_day[is_new]
+        new_rows = np.column_stack([new_days, first_in_day + first_position]).astype(np.int64)
+        np.save(self._index_path(symbol, timeframe), np.concatenate([index, new_rows]))
+
+        return len(records)
+
+    def open_range(self, symbol: str, timeframe: str, start_date: datetime, end_date: datetime) -> BarStore:
+        """
+        Map the bars whose open time lies in [start_date, end_date] as a BarStore.
+        The columns are views over the memory map: pages are only read when accessed.
+        """
+        start = calendar.timegm(start_date.timetuple())
+        end = calendar.timegm(end_date.timetuple())
+        index = self._load_index(symbol, timeframe)
+        total = self.num_records(symbol, timeframe)
+        if len(index) == 0 or total == 0:
+            return BarStore.empty()
+
+        # Coarse bounds from the daily index...
+        first_day_row = np.searchsorted(index[:, 0], start // SECONDS_PER_DAY, side='left')
+        last_day_row = np.searchsorted(index[:, 0], end // SECONDS_PER_DAY, side='right')
+        first = int(index[first_day_row, 1]) if first_day_row < len(index) else total
+        stop = int(index[last_day_row, 1]) if last_day_row < len(index) else total
+        if stop <= first:
+            return BarStore.empty()
+
+        # ...refined within the boundary days on the mapped times
+        records = self._open_records(symbol, timeframe, first, stop - first)
+        bars = BarStore(**{field: records[field] for field in ('time',) + BAR_COLUMNS})
+        return bars.between(start, end)
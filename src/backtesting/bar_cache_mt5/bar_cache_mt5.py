@@ -0,0 +1,144 @@
+import calendar
+import os
+import time
+import numpy as np
+from datetime import datetime, timedelta
+from typing import Callable
+from bar_store.bar_store import BarStore, BAR_COLUMNS
+from utils.utils import Utils
+from logger.logger import get_logger
+
+logger = get_logger("bar_cache")
+
+
+class MT5BarCache:
+    """
+    Persistent local cache of historical bars, one .npz file per symbol/timeframe.
+    Each file stores the bar columns plus the list of date ranges that have already been
+    requested from MT5, so later backtests only download the ranges they are missing and
+    otherwise load straight from disk (no MT5 terminal needed).
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _cache_path(self, symbol: str, timeframe: str) -> str:
+        return os.path.join(self.cache_dir, f"{symbol}_{timeframe.upper()}.npz")
+
+    @staticmethod
+    def _to_epoch(date: datetime) -> int:
+        return calendar.timegm(date.timetuple())
+
+    @staticmethod
+    def _from_epoch(seconds: int) -> datetime:
+        return datetime(1970, 1, 1) + timedelta(seconds=int(seconds))
+
+    def load(self, symbol: str, timeframe: str) -> tuple[BarStore, np.ndarray]:
+        """
+        Load the cached bars and covered ranges for a symbol/timeframe.
+        Covered ranges are returned as an (n, 2) int64 array of inclusive epoch-second bounds.
+        """
+        path = self._cache_path(symbol, timeframe)
+        if not os.path.exists(path):
+            return BarStore.empty(), np.empty((0, 2), dtype=np.int64)
+
+        with np.load(path) as cached:
+            bars = BarStore(**{col: cached[col] for col in ('time',) + BAR_COLUMNS})
+            covered = cached['covered']
+        return bars, covered
+
+    def _save(self, symbol: str, timeframe: str, bars: BarStore, covered: np.ndarray) -> None:
+        path = self._cache_path(symbol, timeframe)
+        tmp_path = path + ".tmp.npz"
+        np.savez(
+            tmp_path,
+            covered=covered,
+            **{col: getattr(bars, col) for col in ('time',) + BAR_COLUMNS}
+        )
+        os.replace(tmp_path, path)  # Atomic swap so an interrupted write never corrupts the cache
+
+    @staticmethod
+    def _merge_ranges(ranges: np.ndarray) -> np.ndarray:
+        if len(ranges) == 0:
+            return ranges
+        ranges = ranges[np.argsort(ranges[:, 0])]
+        merged = [list(ranges[0])]
+        for start, end in ranges[1:]:
+            if start <= merged[-1][1] + 1:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        return np.array(merged, dtype=np.int64)
+
+    @staticmethod
+    def _missing_ranges(covered: np.ndarray, start: int, end: int) -> list[tuple[int, int]]:
+        missing = []
+        cursor = start
+        for covered_start, covered_end in covered:
+            if covered_end < cursor:
+                continue
+            if covered_start > end:
+                break
+            if covered_start > cursor:
+                missing.append((cursor, covered_start - 1))
+            cursor = max(cursor, covered_end + 1)
+            if cursor > end:
+                break
+        if cursor <= end:
+            missing.append((cursor, end))
+        return missing
+
+    def get_bars(
+        self,
+        symbol: str,
+        timeframe: str,
+        start_date: datetime,
+        end_date: datetime,
+        fetch_rates: Callable[[datetime, datetime], np.ndarray | None]
+    ) -> BarStore:
+        """
+        Return the bars of [start_date, end_date], downloading only the sub-ranges that are
+        not cached yet through fetch_rates (e.g. a wrapper around mt5.copy_rates_range).
+        """
+        start = self._to_epoch(start_date)
+        end = self._to_epoch(end_date)
+        bars, covered = self.load(symbol, timeframe)
+
+        missing = self._missing_ranges(covered, start, end)
+        if missing:
+            # Bars that have not closed yet must not be marked as covered
+            last_closed = int(time.time()) - Utils.timeframe_to_seconds(timeframe)
+            fetched_stores = []
+            new_ranges = []
+            for range_start, range_end in missing:
+                rates = fetch_rates(self._from_epoch(range_start), self._from_epoch(range_end))
+                if rates is None:
+                    logger.warning(
+                        "CACHE: Could not fetch %s %s from %s to %s.",
+                        symbol, timeframe, self._from_epoch(range_start), self._from_epoch(range_end)
+                    )
+                    continue
+                if len(rates) > 0:
+                    fetched_stores.append(BarStore.from_rates(rates))
+                covered_end = min(range_end, last_closed)
+                if covered_end >= range_start:
+                    new_ranges.append((range_start, covered_end))
+
+            if fetched_stores or new_ranges:
+                bars = BarStore.concatenate([bars] + fetched_stores)
+                covered = self._merge_ranges(
+                    np.concatenate([covered, np.array(new_ranges, dtype=np.int64).reshape(-1, 2)])
+                )
+                self._save(symbol, timeframe, bars, covered)
+                logger.info(
+                    "CACHE: Stored %s %s %s bars (%s range(s) requested from MT5).",
+                    len(bars), symbol, timeframe, len(missing)
+                )
+
+        return bars.between(start, end)
+
+    def clear(self, symbol: str, timeframe: str) -> None:
+        path = self._cache_path(symbol, timeframe)
+        if os.path.exists(path):
+            os.remove(path)
@@ -1,25 +1,90 @@
+import heapq
 import MetaTrader5 as mt5
+import numpy as np
 import pandas as pd
 from datetime import datetime
-from events.events import DataEvent
+from bar_store.bar_store import Bar, BarStore, BAR_COLUMNS
+from bar_store.bar_resampler import resample_bars
+from backtesting.bar_cache_mt5.bar_cache_mt5 import MT5BarCache
+from backtesting.bar_archive_mt5.bar_archive_mt5 import MT5BarArchive
+from events.events import DataEvent, EventTrace
+from logger.logger import get_logger
 from queue import Queue
 
+logger = get_logger("backtest_data_source")
+
 
 class MT5BacktestDataSource:
-    def __init__(self, events_queue: Queue, symbols: list, timeframe: str, start_date: str, end_date: str):
+    def __init__(
+        self,
+        events_queue: Queue,
+        symbols: list,
+        timeframe: str,
+        start_date: str,
+        end_date: str,
+        price_dtype=np.float64,
+        cache_dir: str | None = None,
+        archive_dir: str | None = None,
+        latency_tracing: bool = False,
+        resample_timeframes: list[str] | None = None
+    ):
         self.events_queue = events_queue
         self.symbols = symbols
+        self.timeframe_name = timeframe.upper()
         self.timeframe = self._map_timeframe(timeframe)
         self.start_date = datetime.strptime(start_date, "%Y-%m-%d")
         self.end_date = datetime.strptime(end_date, "%Y-%m-%d")
+        self.price_dtype = price_dtype
+        self.latency_tracing = latency_tracing
+        self.cache = MT5BarCache(cache_dir) if cache_dir else None
+        self.archive = MT5BarArchive(archive_dir) if archive_dir else None
         if not mt5.initialize():
-            print(
-                f"MT5 initialization failed: {mt5.last_error()}, "
-                "proceeding without MT5 for backtest data loading if possible."
+            logger.warning(
+                "MT5 initialization failed: %s, proceeding without MT5 for backtest data loading if possible.",
+                mt5.last_error()
             )
-        self.data = self._load_historical_data()
+        self.bars: dict[str, BarStore] = {symbol: self._load_historical_data(symbol) for symbol in self.symbols}
+        self.cursors: dict[str, int] = {symbol: 0 for symbol in self.symbols}  # Bars replayed per symbol
         self.index = 0
-        self.pointer = 0
+        self.pointer = 0  # Total bars replayed across all symbols
+        self.quiet_until: dict[str, int] = {}  # Fast-forward: bars replayed without DATA events, per symbol
+        self.resample_timeframes = [timeframe.upper() for timeframe in resample_timeframes or []]
+        self._build_resampled()
+        self._build_merge_heap()
+
+    @classmethod
+    def from_bars(
+        cls,
+        events_queue: Queue,
+        bars: dict[str, BarStore],
+        timeframe: str,
+        latency_tracing: bool = False,
+        resample_timeframes: list[str] | None = None
+    ) -> "MT5BacktestDataSource":
+        """Build a data source that replays bars already in memory, without loading them from MT5."""
+        data_source = cls.__new__(cls)
+        data_source.events_queue = events_queue
+        data_source.symbols = list(bars)
+        data_source.timeframe_name = timeframe.upper()
+        data_source.timeframe = data_source._map_timeframe(timeframe)
+        loaded = [store for store in bars.values() if len(store) > 0]
+        if not loaded:
+            raise RuntimeError(f"No bars given for {list(bars)}")
+        data_source.start_date = pd.Timestamp(min(int(store.time[0]) for store in loaded), unit='s').to_pydatetime()
+        data_source.end_date = pd.Timestamp(max(int(store.time[-1]) for store in loaded), unit='s').to_pydatetime()
+        data_source.price_dtype = loaded[0].close.dtype
+        data_source.latency_tracing = latency_tracing
+        data_source.cache = None
+        data_source.archive = None
+        data_source.bars = dict(bars)
+        data_source.cursors = {symbol: 0 for symbol in data_source.symbols}
+        data_source.index = 0
+        data_source.pointer = 0
+        data_source.quiet_until = {}
+        data_source.resample_timeframes = [timeframe.upper() for timeframe in resample_timeframes or []]
+        data_source._build_resampled()
+        data_source._build_merge_heap()
+        return data_source
 
     def _map_timeframe(self, tf_str: str):
         mapping = {
@@ -32,86 +97,229 @@ class MT5BacktestDataSource:
         }
         return mapping.get(tf_str.upper(), mt5.TIMEFRAME_M15)
 
-    def _load_historical_data(self) -> pd.DataFrame:
-        rates = mt5.copy_rates_range(
-            self.symbols[0],
-            self.timeframe,
-            self.start_date,
-            self.end_date
-        )
-        if rates is None or len(rates) == 0:
+    def _load_historical_data(self, symbol: str) -> BarStore:
+        if self.archive is not None:
+            # Memory-mapped: only the replayed range is paged in, on access
+            bars = self.archive.open_range(symbol, self.timeframe_name, self.start_date, self.end_date)
+        elif self.cache is not None:
+            bars = self.cache.get_bars(
+                symbol,
+                self.timeframe_name,
+                self.start_date,
+                self.end_date,
+                fetch_rates=lambda date_from, date_to: mt5.copy_rates_range(
+                    symbol, self.timeframe, date_from, date_to
+                )
+            )
+        else:
+            rates = mt5.copy_rates_range(
+                symbol,
+                self.timeframe,
+                self.start_date,
+                self.end_date
+            )
+            bars = BarStore.from_rates(rates) if rates is not None else BarStore.empty()
+
+        if len(bars) == 0:
             raise RuntimeError(
-                f"No historical data returned for {self.symbols[0]} "
+                f"No historical data returned for {symbol} "
                 f"from {self.start_date} to {self.end_date}"
             )
-        df = pd.DataFrame(rates)
-        df['time'] = pd.to_datetime(df['time'], unit='s')
-        df.set_index('time', inplace=True)
-        df.rename(columns={'tick_volume': 'tickvol', 'real_volume': 'vol'}, inplace=True)
-        if 'spread' not in df.columns:
-            df['spread'] = 0
+        return bars.as_dtype(self.price_dtype)
 
-        expected_cols = ['open', 'high', 'low', 'close', 'tickvol', 'vol', 'spread']
-        for col in expected_cols:
-            if col not in df.columns:
-                df[col] = 0.0
+    def _build_resampled(self) -> None:
+        """
+        Bars of the resample timeframes, built once from the loaded bars of every symbol with the
+        number of bars after which each one closes (see resample_bars). The replay emits a DATA
+        event with the timeframe for each of them right after the DATA event of the bar closing it.
+        """
+        self.resampled: dict[tuple[str, str], tuple[BarStore, np.ndarray]] = {
+            (symbol, timeframe): resample_bars(self.bars[symbol], timeframe, self.timeframe_name)
+            for symbol in self.symbols
+            for timeframe in self.resample_timeframes
+        }
 
-        return df
+    def _build_merge_heap(self) -> None:
+        """
+        Build the k-way merge heap with the next pending bar of every symbol.
+        Entries are (bar_time, symbol_order, symbol) so that bars sharing a timestamp are
+        replayed in the order the symbols were given.
+        """
+        self._heap = [
+            (int(self.bars[symbol].time[self.cursors[symbol]]), order, symbol)
+            for order, symbol in enumerate(self.symbols)
+            if self.cursors[symbol] < len(self.bars[symbol])
+        ]
+        heapq.heapify(self._heap)
 
     def has_data(self):
-        return self.pointer < len(self.data)
+        return len(self._heap) > 0
 
     def check_for_new_data(self):
         if self.has_data():
-            bar_series = self.data.iloc[self.pointer].copy()
-            bar_series.name = self.data.index[self.pointer]
+            _, order, symbol = self._heap[0]
+            bars = self.bars[symbol]
+            cursor = self.cursors[symbol]
             event = DataEvent(
-                symbol=self.symbols[0],
-                data=bar_series,
-                event_type="DATA"
+                symbol=symbol,
+                data=bars.bar(cursor),
+                event_type="DATA",
+                timeframe=self.timeframe_name,
+                trace=EventTrace.start("data") if self.latency_tracing else None
             )
-            self.events_queue.put(event)
+            cursor += 1
+            self.cursors[symbol] = cursor
+            if cursor < len(bars):
+                heapq.heapreplace(self._heap, (int(bars.time[cursor]), order, symbol))
+            else:
+                heapq.heappop(self._heap)
             self.pointer += 1
+            self.events_queue.put(event)
+            if self.resample_timeframes:
+                self._put_resampled_events(symbol, cursor)
+
+    def _put_resampled_events(self, symbol: str, cursor: int) -> None:
+        """DATA events of the bars of the resample timeframes closed by the bar replayed last."""
+        for timeframe in self.resample_timeframes:
+            bars, closed_after = self.resampled[(symbol, timeframe)]
+            index = int(np.searchsorted(closed_after, cursor, side='left'))
+            while index < len(bars) and closed_after[index] == cursor:
+                self.events_queue.put(DataEvent(
+                    symbol=symbol,
+                    data=bars.bar(index),
+                    event_type="DATA",
+                    timeframe=timeframe,
+                    trace=EventTrace.start("data") if self.latency_tracing else None
+                ))
+                index += 1
 
-    def get_next_bar(self):
-        if self.index < len(self.data):
-            bar = self.data.iloc[self.index]
+    def check_for_new_bar_time(self):
+        """Emit the DATA events of every symbol with a bar at the next bar time, in symbol order."""
+        if self.has_data():
+            bar_time = self._heap[0][0]
+            while self._heap and self._heap[0][0] == bar_time:
+                self.check_for_new_data()
+
+    def skip_to(self, symbol: str, index: int) -> None:
+        """Replay the bars of symbol before index without DATA events (see skip_quiet_bars)."""
+        self.quiet_until[symbol] = index
+
+    def skip_quiet_bars(self) -> tuple[str, int, int] | None:
+        """
+        If the next bar to replay is one of the bars set with skip_to, replay in one step, without
+        events, every bar of that symbol up to the next bar of any other symbol, so the prices of
+        all the symbols stay in time order. Returns (symbol, start, stop) of the bars skipped.
+        """
+        _, order, symbol = self._heap[0]
+        cursor = self.cursors[symbol]
+        stop = self.quiet_until.get(symbol, 0)
+        if cursor >= stop:
+            return None
+        bars = self.bars[symbol]
+        if len(self._heap) > 1:
+            # The smallest of the other entries is a child of the root
+            next_time, next_order, _ = min(self._heap[1:3])
+            stop = min(stop, int(np.searchsorted(bars.time, next_time, side='right' if order < next_order else 'left')))
+        self.cursors[symbol] = stop
+        self.pointer += stop - cursor
+        if stop < len(bars):
+            heapq.heapreplace(self._heap, (int(bars.time[stop]), order, symbol))
+        else:
+            heapq.heappop(self._heap)
+        return symbol, cursor, stop
+
+    def get_state(self) -> dict:
+        """Replay position of every symbol, with the time of the last bar replayed to check it on restore."""
+        return {
+            "symbols": list(self.symbols),
+            "timeframe": self.timeframe_name,
+            "cursors": dict(self.cursors),
+            "last_times": {
+                symbol: int(self.bars[symbol].time[cursor - 1]) if cursor > 0 else None
+                for symbol, cursor in self.cursors.items()
+            },
+            "index": self.index,
+            "pointer": self.pointer,
+        }
+
+    def restore_state(self, state: dict) -> None:
+        """
+        Continue the replay where the state was taken. The loaded bars may extend past the
+        snapshot (e.g. new bars appended), but must contain the bars already replayed.
+        """
+        if list(state["symbols"]) != list(self.symbols) or state["timeframe"] != self.timeframe_name:
+            raise ValueError(
+                f"Snapshot of {state['symbols']} {state['timeframe']} cannot be restored on "
+                f"{self.symbols} {self.timeframe_name}."
+            )
+        for symbol, cursor in state["cursors"].items():
+            bars = self.bars[symbol]
+            last_time = state["last_times"][symbol]
+            if cursor > len(bars) or (cursor > 0 and int(bars.time[cursor - 1]) != last_time):
+                raise ValueError(f"The bars of {symbol} do not contain the bars replayed in the snapshot.")
+        self.cursors = dict(state["cursors"])
+        self.index = state["index"]
+        self.pointer = state["pointer"]
+        self.quiet_until = {}
+        self._build_merge_heap()
+
+    def get_next_bar(self, symbol: str | None = None) -> Bar | None:
+        bars = self.bars[symbol or self.symbols[0]]
+        if self.index < len(bars):
+            bar = bars.bar(self.index)
             self.index += 1
             return bar
         else:
             return None
 
-    def get_all_data(self) -> pd.DataFrame:
-        return self.data
+    def get_all_data(self, symbol: str | None = None) -> pd.DataFrame:
+        return self.bars[symbol or self.symbols[0]].to_dataframe()
 
     def reset(self):
         self.index = 0
 
+    def get_latest_closed_bars_array(self, symbol: str, timeframe: str, num_bars: int = 1) -> BarStore:
+        """
+        Zero-copy variant of get_latest_closed_bars: returns a BarStore view over the
+        last num_bars bars already replayed for the symbol, or already closed for a resample timeframe.
+        """
+        cursor = self.cursors[symbol]
+        if self.resampled:
+            resampled = self.resampled.get((symbol, timeframe.upper()))
+            if resampled is not None:
+                bars, closed_after = resampled
+                stop = int(np.searchsorted(closed_after, cursor, side='right'))
+                return bars.slice(max(0, stop - num_bars), stop)
+        return self.bars[symbol].slice(max(0, cursor - num_bars), cursor)
+
     def get_latest_closed_bars(self, symbol: str, timeframe: str, num_bars: int = 1) -> pd.DataFrame:
-        if self.pointer == 0:
-            return pd.DataFrame(columns=self.data.columns)
-        start_index = max(0, self.pointer - num_bars)
-        bars_df = self.data.iloc[start_index:self.pointer]
-        return bars_df
+        if self.cursors[symbol] == 0:
+            return pd.DataFrame(columns=list(BAR_COLUMNS))
+        return self.get_latest_closed_bars_array(symbol, timeframe, num_bars).to_dataframe()
 
     def get_latest_tick(self, symbol: str) -> dict:
-        if self.pointer == 0:
-            if len(self.data) > 0:
-                current_bar_data = self.data.iloc[0]
+        bars = self.bars[symbol]
+        cursor = self.cursors[symbol]
+        if cursor == 0:
+            if len(bars) > 0:
+                index = 0
             else:
                 raise RuntimeError("get_latest_tick called before any data was loaded/processed in backtest.")
         else:
-            current_bar_data = self.data.iloc[self.pointer - 1]
+            index = cursor - 1
 
+        bar_time = int(bars.time[index])
+        close = float(bars.close[index])
+        volume = float(bars.vol[index])
         return {
-            "time": int(current_bar_data.name.timestamp()),
-            "bid": float(current_bar_data['close']),
-            "ask": float(current_bar_data['close']),
-            "last": float(current_bar_data['close']),
-            "volume": float(current_bar_data.get('vol', 0)),
-            "time_msc": int(current_bar_data.name.timestamp() * 1000),
+            "time": bar_time,
+            "bid": close,
+            "ask": close,
+            "last": close,
+            "volume": volume,
+            "time_msc": bar_time * 1000,
             "flags": 0,
-            "volume_real": float(current_bar_data.get('vol', 0))
+            "volume_real": volume
         }
 
     def shutdown(self):
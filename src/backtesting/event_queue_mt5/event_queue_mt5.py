@@ -0,0 +1,29 @@
+from collections import deque
+
+
+class BacktestEventQueue(deque):
+    """
+    Single-threaded FIFO with the put/get/empty interface of queue.Queue, used by backtests
+    in place of the thread-safe queue. The event ordering is the same, but put and get are
+    plain deque appends and pops, without the lock and condition handling of queue.Queue.
+    """
+
+    __slots__ = ()
+
+    def put(self, event) -> None:
+        self.append(event)
+
+    def get(self):
+        return self.popleft()
+
+    def put_nowait(self, event) -> None:
+        self.append(event)
+
+    def get_nowait(self):
+        return self.popleft()
+
+    def empty(self) -> bool:
+        return not self
+
+    def qsize(self) -> int:
+        return len(self)
@@ -0,0 +1,147 @@
+import numpy as np
+from queue import Queue
+from bar_store.bar_store import BarStore
+from backtesting.data_source_mt5.data_source_mt5 import MT5BacktestDataSource
+from event_journal.event_journal import EventJournalReader
+from events.events import DataEvent
+from logger.logger import get_logger
+
+logger = get_logger("journal_data_source")
+
+
+class JournalReplayDataSource(MT5BacktestDataSource):
+    """
+    Backtest data source that replays the data events of an event journal, in the order
+    they were recorded, as fast as the pipeline can consume them. Bars are read from the
+    journal only, so a recorded live session can be reproduced offline and profiled.
+
+    The warm-up history journaled at the start of the session is preloaded, so the
+    strategies see the same bars they saw live.
+
+    Usage: pass it to BacktestingDirector in place of MT5BacktestDataSource.
+    """
+
+    def __init__(
+        self,
+        events_queue: Queue,
+        journal_path: str,
+        timeframe: str,
+        symbols: list | None = None,
+        price_dtype=np.float64
+    ):
+        self.events_queue = events_queue
+        self.timeframe_name = timeframe.upper()
+        self.timeframe = self._map_timeframe(timeframe)
+        self.price_dtype = price_dtype
+        self.latency_tracing = False
+        self.resample_timeframes = []
+        self.resampled = {}
+
+        reader = EventJournalReader(journal_path)
+        histories = {
+            record.symbol: record.bars for record in reader.bar_histories()
+            if record.timeframe.upper() == self.timeframe_name
+        }
+        recorded_bars: dict[str, list] = {}
+        recorded_symbols: list[str] = []
+        for event in reader.events("DATA"):
+            if symbols is not None and event.symbol not in symbols:
+                continue
+            if getattr(event, "timeframe", None) not in (None, self.timeframe_name):
+                continue  # Bar of a higher timeframe built live by a BarResampler
+            recorded_bars.setdefault(event.symbol, []).append(event.data)
+            recorded_symbols.append(event.symbol)
+
+        if not recorded_symbols:
+            raise RuntimeError(f"No data events found in the journal {journal_path}")
+
+        self.symbols = symbols if symbols is not None else list(recorded_bars)
+        self.bars: dict[str, BarStore] = {}
+        self.cursors: dict[str, int] = {}
+        for symbol in self.symbols:
+            replayed = BarStore.from_bars(recorded_bars.get(symbol, []))
+            history = histories.get(symbol)
+            bars = BarStore.concatenate([history, replayed]) if history is not None else replayed
+            self.bars[symbol] = bars.as_dtype(price_dtype)
+            # Bars older than the first replayed one were already closed when the session started
+            first_time = replayed.time[0] if len(replayed) > 0 else np.iinfo(np.int64).max
+            self.cursors[symbol] = int(np.searchsorted(bars.time, first_time, side='left'))
+
+        # Position of every recorded data event in the bars of its symbol, in recording order
+        self._sequence = self._build_sequence(recorded_symbols, recorded_bars)
+        self._position = 0
+        self.index = 0
+        self.pointer = 0
+        self.quiet_until: dict[str, int] = {}  # Fast-forward: bars replayed without DATA events, per symbol
+        logger.info(
+            "Replaying %s data events for %s from %s", len(self._sequence), self.symbols, journal_path
+        )
+
+    def _build_sequence(
+        self, recorded_symbols: list[str], recorded_bars: dict[str, list]
+    ) -> list[tuple[str, int]]:
+        next_bar = {symbol: 0 for symbol in recorded_bars}
+        sequence = []
+        for symbol in recorded_symbols:
+            bar = recorded_bars[symbol][next_bar[symbol]]
+            next_bar[symbol] += 1
+            index = int(np.searchsorted(self.bars[symbol].time, bar.time, side='left'))
+            sequence.append((symbol, index))
+        return sequence
+
+    def has_data(self):
+        return self._position < len(self._sequence)
+
+    def check_for_new_data(self):
+        if self.has_data():
+            symbol, index = self._sequence[self._position]
+            self._position += 1
+            self.cursors[symbol] = index + 1
+            self.pointer += 1
+            self.events_queue.put(
+                DataEvent(symbol=symbol, data=self.bars[symbol].bar(index), timeframe=self.timeframe_name)
+            )
+
+    def check_for_new_bar_time(self):
+        """Emit the recorded data events from the next one on that share its bar time, in recording order."""
+        if self.has_data():
+            symbol, index = self._sequence[self._position]
+            bar_time = self.bars[symbol].time[index]
+            while self.has_data():
+                symbol, index = self._sequence[self._position]
+                if self.bars[symbol].time[index] != bar_time:
+                    break
+                self.check_for_new_data()
+
+    def skip_quiet_bars(self) -> tuple[str, int, int] | None:
+        """
+        If the next recorded event is a bar set with skip_to, replay without events the recorded
+        events of that symbol from it up to the next event of any other symbol, so the replay
+        keeps the recorded order. Returns (symbol, start, stop) of the bars skipped.
+        """
+        symbol, start = self._sequence[self._position]
+        quiet_until = self.quiet_until.get(symbol, 0)
+        if start >= quiet_until:
+            return None
+        position = self._position
+        while position < len(self._sequence) and self._sequence[position][0] == symbol:
+            if self._sequence[position][1] >= quiet_until:
+                break
+            position += 1
+        stop = self._sequence[position - 1][1] + 1
+        self.pointer += position - self._position
+        self._position = position
+        self.cursors[symbol] = stop
+        return symbol, start, stop
+
+    def get_state(self) -> dict:
+        state = super().get_state()
+        state["position"] = self._position
+        return state
+
+    def restore_state(self, state: dict) -> None:
+        super().restore_state(state)
+        self._position = state["position"]
+
+    def shutdown(self):
+        pass
@@ -0,0 +1,286 @@
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass, field
+from bar_store.bar_store import BarStore
+from backtesting.vectorized_backtester_mt5.vectorized_backtester_mt5 import CONTRACT_SIZE, VectorizedBacktester
+from indicator_engine.indicator_engine import rolling_mean, rsi_values
+from strategy_manager.properties.strategy_manager_properties import BaseStrategyProps, MACrossoverProps, RSIProps
+from strategy_manager.strategies.strategy_ma_crossover import StrategyMACrossover
+from strategy_manager.strategies.strategy_rsi_mr import StrategyRSI
+from logger.logger import get_logger
+
+logger = get_logger("multi_config_backtester")
+
+TRADE_FIELDS = (
+    "config", "symbol", "entry_index", "exit_index", "side", "entry_price", "exit_price", "profit"
+)
+
+
+@dataclass
+class MultiConfigBacktestResult:
+    """
+    Trades of every configuration of a multi-configuration backtest, stored column-wise:
+    trades[name] is an array with one value per trade for every name in TRADE_FIELDS
+    (config is the index in configurations, symbol the index in symbols).
+    Configurations rejected by their strategy are listed in errors with the reason.
+    """
+    configurations: list[BaseStrategyProps]
+    symbols: list[str]
+    bars: dict[str, BarStore]
+    trades: dict[str, np.ndarray]
+    initial_balance: float = 0.0
+    volume: float = 0.0
+    magic_number: int = 0
+    errors: dict[int, str] = field(default_factory=dict)
+    stop_levels: dict = field(default_factory=dict)
+
+    def net_profit(self) -> np.ndarray:
+        return np.bincount(
+            self.trades["config"], weights=self.trades["profit"], minlength=len(self.configurations)
+        )
+
+    def trade_log(self, config: int) -> list[dict]:
+        """Trade log of one configuration, with the same records as VectorizedBacktester.run()."""
+        selected = np.flatnonzero(self.trades["config"] == config)
+        exit_times = np.array([
+            self.bars[self.symbols[symbol]].time[exit_index]
+            for symbol, exit_index in zip(self.trades["symbol"][selected], self.trades["exit_index"][selected])
+        ], dtype=np.int64)
+        # By close time, then by symbol order, as in the event-driven backtest
+        selected = selected[np.lexsort((self.trades["symbol"][selected], exit_times))]
+
+        trade_log = []
+        for trade in selected:
+            symbol = self.symbols[self.trades["symbol"][trade]]
+            times = self.bars[symbol].time
+            side = self.trades["side"][trade]
+            stop_loss, take_profit = self.stop_levels.get((config, symbol), (None, None))
+            entry_price = self.trades["entry_price"][trade]
+            trade_log.append({
+                "ticket": f"{symbol}-{int(self.trades['entry_index'][trade])}", "symbol": symbol,
+                "open_side": "buy" if side > 0 else "sell", "entry_price": float(entry_price),
+                "entry_time": pd.to_datetime(times[self.trades["entry_index"][trade]] * 1000, unit='ms'),
+                "volume": self.volume, "close_side": "sell" if side > 0 else "buy",
+                "exit_price": float(self.trades["exit_price"][trade]),
+                "exit_time": pd.to_datetime(times[self.trades["exit_index"][trade]] * 1000, unit='ms'),
+                "profit": float(self.trades["profit"][trade]), "magic": self.magic_number,
+                "sl": float(entry_price - side * stop_loss) if stop_loss else 0.0,
+                "tp": float(entry_price + side * take_profit) if take_profit else 0.0
+            })
+        return trade_log
+
+    def trade_log_df(self, config: int) -> pd.DataFrame:
+        """Trade log of one configuration as the DataFrame consumed by DataDisplayMT5."""
+        return pd.DataFrame(self.trade_log(config))
+
+    def summary(self, parameters: list[str] | None = None) -> pd.DataFrame:
+        """One row per configuration: its parameters, number of trades, win rate and net profit."""
+        count = len(self.configurations)
+        trades = np.bincount(self.trades["config"], minlength=count)
+        wins = np.bincount(self.trades["config"], weights=self.trades["profit"] > 0, minlength=count)
+        net_profit = self.net_profit()
+        rows = []
+        for config, properties in enumerate(self.configurations):
+            values = properties.model_dump()
+            row = {name: values.get(name) for name in parameters} if parameters is not None else values
+            row.update({
+                "trades": int(trades[config]),
+                "win_rate": float(wins[config] / trades[config] * 100) if trades[config] > 0 else 0.0,
+                "net_profit": float(net_profit[config]),
+                "final_balance": float(self.initial_balance + net_profit[config]),
+                "error": self.errors.get(config),
+            })
+            rows.append(row)
+        return pd.DataFrame(rows)
+
+
+class MultiConfigBacktester(VectorizedBacktester):
+    """
+    Backtests many configurations of the MA crossover and RSI strategies in one pass over the
+    bars. The bars are walked in chunks of chunk_size; in every chunk, each distinct indicator
+    is computed once (from the chunk plus the bars its longest period looks back) and shared by
+    the configurations that use it, and the signals and positions of all the configurations are
+    evaluated together as (configurations x bars) arrays. The open position of every
+    configuration (side and entry bar) is carried from one chunk to the next, so memory stays
+    bounded by chunk_size x (configurations + indicators).
+
+    Trading rules and results are those of VectorizedBacktester.run() for each configuration.
+    The anomaly detector and the sentiment analyzer are not supported.
+    """
+
+    def __init__(
+        self,
+        bars: dict[str, BarStore],
+        initial_balance: float = 10000.0,
+        volume: float = 0.1,
+        magic_number: int = 0,
+        chunk_size: int = 16384
+    ):
+        super().__init__(bars, initial_balance, volume, magic_number)
+        self.chunk_size = chunk_size
+
+    @staticmethod
+    def _indicator_keys(strategy_properties: BaseStrategyProps) -> tuple:
+        """
+        Indicators and thresholds used by one configuration, with the parameters as adjusted
+        by its strategy class: ("ma", fast, slow) or ("rsi", period, upper, lower).
+        """
+        if isinstance(strategy_properties, MACrossoverProps):
+            strategy = StrategyMACrossover(properties=strategy_properties)
+            return ("ma", strategy.fast_ma_period, strategy.slow_ma_period)
+        elif isinstance(strategy_properties, RSIProps):
+            strategy = StrategyRSI(properties=strategy_properties)
+            return ("rsi", strategy.rsi_period, strategy.rsi_upper, strategy.rsi_lower)
+        raise ValueError(f"Unknown strategy generator properties: {strategy_properties}")
+
+    @staticmethod
+    def _indicator_chunk(
+        close: np.ndarray, indicator_ids: dict[tuple, int], start: int, stop: int
+    ) -> np.ndarray:
+        """
+        Indicators of the bars [start, stop), shape (indicators, bars). Both indicators only look
+        at the last period + 1 closes of a bar, so the values match those computed over all the bars.
+        """
+        lookback = max((period for _, period in indicator_ids), default=0) + 1
+        offset = min(start, lookback)
+        window = close[start - offset:stop]
+        indicators = np.empty((len(indicator_ids), stop - start))
+        for (kind, period), row in indicator_ids.items():
+            values = rolling_mean(window, period) if kind == "ma" else rsi_values(window, period)
+            indicators[row] = values[offset:]
+        return indicators
+
+    def _signal_chunk(self, chunk: np.ndarray, plan: dict[str, np.ndarray]) -> np.ndarray:
+        """Signals of all the configurations for a chunk of indicators, shape (configurations, bars)."""
+        signals = np.zeros((len(plan["kind"]), chunk.shape[1]), dtype=np.int8)
+
+        ma = plan["kind"] == 0
+        if ma.any():
+            fast = chunk[plan["first"][ma]]
+            slow = chunk[plan["second"][ma]]
+            # NaN means fewer than period bars: comparisons are False and the signal stays 0
+            signals[ma] = np.where(fast > slow, 1, np.where(fast < slow, -1, 0))
+
+        rsi = plan["kind"] == 1
+        if rsi.any():
+            values = chunk[plan["first"][rsi]]
+            signals[rsi] = np.where(
+                values < plan["lower"][rsi, None], 1, np.where(values > plan["upper"][rsi, None], -1, 0)
+            )
+        return signals
+
+    def _run_symbol_configs(
+        self, symbol: str, indicator_ids: dict[tuple, int], plan: dict[str, np.ndarray]
+    ) -> dict[str, np.ndarray]:
+        bars = self.bars[symbol]
+        close = np.asarray(bars.close, dtype=np.float64)
+        count = len(plan["kind"])
+        # Position book of every configuration, carried across chunks
+        position = np.zeros(count, dtype=np.int8)
+        entry = np.full(count, -1, dtype=np.int64)
+
+        trades = {name: [] for name in ("config", "entry_index", "exit_index", "side")}
+        for start in range(0, len(close), self.chunk_size):
+            stop = min(start + self.chunk_size, len(close))
+            signals = self._signal_chunk(self._indicator_chunk(close, indicator_ids, start, stop), plan)
+
+            # Forward-fill the last signal of every configuration, starting from its carried position
+            last = np.where(signals != 0, np.arange(stop - start), -1)
+            np.maximum.accumulate(last, axis=1, out=last)
+            positions = np.where(
+                last >= 0, np.take_along_axis(signals, np.maximum(last, 0), axis=1), position[:, None]
+            )
+            previous = np.concatenate((position[:, None], positions[:, :-1]), axis=1)
+
+            # Position changes in (configuration, bar) order: each one closes the previous position, if any
+            rows, columns = np.nonzero(positions != previous)
+            if len(rows) > 0:
+                first_of_row = np.concatenate(([True], rows[1:] != rows[:-1]))
+                previous_change = np.concatenate(([0], columns[:-1])) + start
+                entries = np.where(first_of_row, entry[rows], previous_change)
+                closing = previous[rows, columns] != 0
+                trades["config"].append(rows[closing])
+                trades["entry_index"].append(entries[closing])
+                trades["exit_index"].append(columns[closing] + start)
+                trades["side"].append(previous[rows, columns][closing])
+
+                last_of_row = np.concatenate((rows[1:] != rows[:-1], [True]))
+                changed_rows = rows[last_of_row]
+                entry[changed_rows] = np.where(
+                    positions[changed_rows, -1] != 0, columns[last_of_row] + start, -1
+                )
+            position = positions[:, -1].astype(np.int8)
+
+        result = {
+            name: np.concatenate(values) if values else np.array([], dtype=np.int64)
+            for name, values in trades.items()
+        }
+        side = result["side"].astype(np.float64)
+        result["side"] = side
+        result["entry_price"] = close[result["entry_index"]]
+        result["exit_price"] = close[result["exit_index"]]
+        result["profit"] = side * (result["exit_price"] - result["entry_price"]) * self.volume * CONTRACT_SIZE
+        return result
+
+    def run_configs(self, configurations: list[BaseStrategyProps]) -> MultiConfigBacktestResult:
+        """Backtest all the configurations over all the bars in a single pass per symbol."""
+        errors = {}
+        keys = []
+        for config, strategy_properties in enumerate(configurations):
+            try:
+                keys.append(self._indicator_keys(strategy_properties))
+            except ValueError as e:  # Invalid combination, e.g. fast_period >= slow_period
+                errors[config] = str(e)
+        valid = np.array([config for config in range(len(configurations)) if config not in errors], dtype=np.int64)
+
+        # Every distinct indicator is computed once and shared by the configurations that use it
+        indicator_ids: dict[tuple, int] = {}
+        for key in keys:
+            if key[0] == "ma":
+                indicator_ids.setdefault(("ma", key[1]), len(indicator_ids))
+                indicator_ids.setdefault(("ma", key[2]), len(indicator_ids))
+            else:
+                indicator_ids.setdefault(("rsi", key[1]), len(indicator_ids))
+        plan = {
+            "kind": np.array([0 if key[0] == "ma" else 1 for key in keys], dtype=np.int8),
+            "first": np.array([indicator_ids[(key[0], key[1])] for key in keys], dtype=np.int64),
+            "second": np.array(
+                [indicator_ids[("ma", key[2])] if key[0] == "ma" else 0 for key in keys], dtype=np.int64
+            ),
+            "upper": np.array([key[2] if key[0] == "rsi" else 0 for key in keys], dtype=np.float64),
+            "lower": np.array([key[3] if key[0] == "rsi" else 0 for key in keys], dtype=np.float64),
+        }
+        logger.info(
+            "Multi-configuration backtest",
+            extra={"fields": {
+                "configurations": len(configurations), "invalid": len(errors), "indicators": len(indicator_ids)
+            }}
+        )
+
+        columns = {name: [] for name in TRADE_FIELDS}
+        stop_levels = {}
+        for symbol_index, symbol in enumerate(self.symbols):
+            if len(keys) > 0:
+                trades = self._run_symbol_configs(symbol, indicator_ids, plan)
+                trades["config"] = valid[trades["config"]]
+                trades["symbol"] = np.full(len(trades["config"]), symbol_index, dtype=np.int64)
+                for name in TRADE_FIELDS:
+                    columns[name].append(trades[name])
+
+            for config in valid:
+                # Distance of the SL/TP from the entry price, recorded on the trades of RSI configurations
+                stop_loss, take_profit = self._stop_levels(
+                    symbol, configurations[config], np.zeros(1), np.ones(1)
+                )
+                if stop_loss[0] or take_profit[0]:
+                    stop_levels[(int(config), symbol)] = (-stop_loss[0], take_profit[0])
+
+        trades = {
+            name: np.concatenate(values) if values else np.array([], dtype=np.int64)
+            for name, values in columns.items()
+        }
+        return MultiConfigBacktestResult(
+            configurations=configurations, symbols=self.symbols, bars=self.bars, trades=trades,
+            initial_balance=self.initial_balance, volume=self.volume, magic_number=self.magic_number,
+            errors=errors, stop_levels=stop_levels
+        )
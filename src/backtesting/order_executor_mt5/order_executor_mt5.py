@@ -1,7 +1,11 @@
 import uuid
 from queue import Queue
-from events.events import OrderEvent, ExecutionEvent, PlacedPendingOrderEvent, StrategyType, OrderType
+from events.events import OrderEvent, ExecutionEvent, PlacedPendingOrderEvent, StrategyType, OrderType, mark_trace
+import numpy as np
 import pandas as pd
+from logger.logger import get_logger
+
+logger = get_logger("backtest_order_executor")
 
 
 class BacktestOrderExecutor:
@@ -37,25 +41,28 @@ class BacktestOrderExecutor:
             exec_event = ExecutionEvent(
                 symbol=symbol, strategy=order_strategy_type,
                 fill_price=price_to_execute_at, fill_time=current_time,
-                volume=volume
+                volume=volume, trace=mark_trace(order_event.trace, "fill")
             )
             self.events_queue.put(exec_event)
-            print(f"BACKTEST EXEC: Market {side} {volume} {symbol} @ {price_to_execute_at} at {current_time}")
+            logger.info(
+                "BACKTEST EXEC: Market %s %s %s @ %s at %s", side, volume, symbol, price_to_execute_at, current_time
+            )
 
         elif order_type_enum in [OrderType.LIMIT, OrderType.STOP]:
             placed_event = PlacedPendingOrderEvent(
                 symbol=symbol, strategy=order_strategy_type,
                 target_order=order_type_enum, target_price=order_event.target_price,
                 magic_number=order_event.magic_number, stop_loss=order_event.stop_loss,
-                take_profit=order_event.take_profit, volume=order_event.volume
+                take_profit=order_event.take_profit, volume=order_event.volume,
+                trace=mark_trace(order_event.trace, "fill")
             )
             self.events_queue.put(placed_event)
-            print(
-                f"BACKTEST EXEC: Placed Pending {order_type_enum.value} {side} "
-                f"{volume} {symbol} @ {order_event.target_price}"
+            logger.info(
+                "BACKTEST EXEC: Placed Pending %s %s %s %s @ %s",
+                order_type_enum.value, side, volume, symbol, order_event.target_price
             )
         else:
-            print(f"BACKTEST EXEC: Unknown order type {order_type_enum} in OrderEvent")
+            logger.warning("BACKTEST EXEC: Unknown order type %s in OrderEvent", order_type_enum)
 
     def _calculate_pnl(self, position_dict: dict, exit_price: float) -> float:
         direction = 1 if position_dict["side"] == "buy" else -1
@@ -63,6 +70,33 @@ class BacktestOrderExecutor:
         pnl = direction * price_diff * position_dict["volume"] * 100000
         return pnl
 
+    def mark_to_market(self) -> float:
+        """Balance plus the open PnL of every position at the latest replayed prices; also sets the platform equity."""
+        equity = self.platform.get_balance()
+        for position in self.platform.get_open_positions():
+            latest_tick = self.data_source.get_latest_tick(position['symbol'])
+            exit_price = latest_tick['bid'] if position['side'] == 'buy' else latest_tick['ask']
+            equity += self._calculate_pnl(position, exit_price)
+        self.platform.update_equity(equity)
+        return equity
+
+    def mark_to_market_prices(self, symbol: str, prices: np.ndarray) -> np.ndarray:
+        """
+        Equity at each of a run of prices of symbol, with the other symbols at their latest prices;
+        also sets the platform equity to the last one.
+        """
+        equity = np.full(len(prices), self.platform.get_balance(), dtype=np.float64)
+        for position in self.platform.get_open_positions():
+            if position['symbol'] == symbol:
+                equity += self._calculate_pnl(position, prices)
+            else:
+                latest_tick = self.data_source.get_latest_tick(position['symbol'])
+                exit_price = latest_tick['bid'] if position['side'] == 'buy' else latest_tick['ask']
+                equity += self._calculate_pnl(position, exit_price)
+        if len(equity) > 0:
+            self.platform.update_equity(float(equity[-1]))
+        return equity
+
     def close_position_by_ticket(self, ticket: str):
         position_to_close = None
         open_positions = self.platform.get_open_positions()
@@ -72,7 +106,7 @@ class BacktestOrderExecutor:
                 break
 
         if not position_to_close:
-            print(f"BACKTEST CLOSE: Position with ticket {ticket} not found to close.")
+            logger.warning("BACKTEST CLOSE: Position with ticket %s not found to close.", ticket)
             return
 
         latest_tick = self.data_source.get_latest_tick(position_to_close['symbol'])
@@ -104,20 +138,24 @@ class BacktestOrderExecutor:
             volume=position_to_close['volume']
         )
         self.events_queue.put(exec_event_close)
-        print(
-            f"BACKTEST CLOSE: Closed {position_to_close['side']} {ticket} "
-            f"for {position_to_close['symbol']} @ {exit_price}, "
-            f"PnL: {pnl:.2f}"
+        logger.info(
+            "BACKTEST CLOSE: Closed %s %s for %s @ %s, PnL: %.2f",
+            position_to_close['side'], ticket, position_to_close['symbol'], exit_price, pnl
         )
 
-    def close_strategy_positions_by_symbol(self, symbol: str, side_to_close: str = None):
+    def close_strategy_positions_by_symbol(
+        self, symbol: str, side_to_close: str = None, magic_number: int | None = None
+    ):
         """
-        Closes positions for a given symbol and strategy magic number.
-        Optionally filters by side ('buy' or 'sell').
+        Closes positions for a given symbol and strategy magic number (the portfolio's unless
+        magic_number is given). Optionally filters by side ('buy' or 'sell').
         """
-        positions_to_check = list(
-            self.portfolio.get_strategy_open_positions()
-        )
+        if magic_number is None:
+            positions_to_check = list(self.portfolio.get_strategy_open_positions())
+        else:
+            positions_to_check = [
+                position for position in self.portfolio.get_open_positions() if position.magic == magic_number
+            ]
 
         closed_any = False
         for pos_info in positions_to_check:
@@ -133,26 +171,34 @@ class BacktestOrderExecutor:
                     should_close = True
 
                 if should_close:
-                    print(
-                        f"BACKTEST CLOSE_STRATEGY: Attempting to close position ticket {pos_info.ticket} "
-                        f"for {symbol}"
+                    logger.debug(
+                        "BACKTEST CLOSE_STRATEGY: Attempting to close position ticket %s for %s",
+                        pos_info.ticket, symbol
                     )
                     self.close_position_by_ticket(pos_info.ticket)
                     closed_any = True
         if not closed_any:
-            print(
-                f"BACKTEST CLOSE_STRATEGY: No matching {side_to_close or 'any'} positions found "
-                f"for symbol {symbol} with magic {self.portfolio.magic}"
+            logger.debug(
+                "BACKTEST CLOSE_STRATEGY: No matching %s positions found for symbol %s with magic %s",
+                side_to_close or 'any', symbol, self.portfolio.magic if magic_number is None else magic_number
             )
 
-    def close_strategy_long_positions_by_symbol(self, symbol: str):
-        self.close_strategy_positions_by_symbol(symbol, side_to_close='buy')
+    def close_strategy_long_positions_by_symbol(self, symbol: str, magic_number: int | None = None):
+        self.close_strategy_positions_by_symbol(symbol, side_to_close='buy', magic_number=magic_number)
 
-    def close_strategy_short_positions_by_symbol(self, symbol: str):
-        self.close_strategy_positions_by_symbol(symbol, side_to_close='sell')
+    def close_strategy_short_positions_by_symbol(self, symbol: str, magic_number: int | None = None):
+        self.close_strategy_positions_by_symbol(symbol, side_to_close='sell', magic_number=magic_number)
 
     def get_open_orders(self):
         return self.platform.get_open_positions()
 
     def get_trade_log(self):
         return self.trade_log
+
+    def get_state(self) -> dict:
+        """Closed trades and the state of the platform (balance and open positions)."""
+        return {"trade_log": list(self.trade_log), "platform": self.platform.get_state()}
+
+    def restore_state(self, state: dict) -> None:
+        self.trade_log = list(state["trade_log"])
+        self.platform.restore_state(state["platform"])
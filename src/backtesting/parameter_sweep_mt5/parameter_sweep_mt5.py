@@ -0,0 +1,143 @@
+import itertools
+import json
+import os
+import time
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from bar_store.bar_store import BarStore
+from backtesting.data_display_mt5.data_display_mt5 import DataDisplayMT5
+from backtesting.vectorized_backtester_mt5.vectorized_backtester_mt5 import VectorizedBacktester
+from strategy_manager.properties.strategy_manager_properties import BaseStrategyProps
+from logger.logger import get_logger
+
+logger = get_logger("parameter_sweep")
+
+# Backtester of the current worker process, built once by the pool initializer
+_worker_backtester: VectorizedBacktester | None = None
+
+
+def _init_worker(bars: dict[str, BarStore], initial_balance: float, volume: float, magic_number: int) -> None:
+    global _worker_backtester
+    _worker_backtester = VectorizedBacktester(bars, initial_balance, volume, magic_number)
+
+
+def _to_builtin(value):
+    return value.item() if hasattr(value, "item") else value
+
+
+def _run_job(strategy_properties: BaseStrategyProps) -> dict:
+    """Backtest one parameter combination in a worker and return its metrics."""
+    try:
+        result = _worker_backtester.run(strategy_properties)
+    except ValueError as e:  # Invalid combination, e.g. fast_period >= slow_period
+        return {"error": str(e)}
+    if not result.trade_log:
+        return {"Total Executed Trades": 0}
+    metrics = DataDisplayMT5(result.trade_log_df(), result.initial_balance).calculate_metrics()
+    return {name: _to_builtin(value) for name, value in metrics.items()}
+
+
+class ParameterSweep:
+    """
+    Runs one backtest per combination of a parameter grid in a pool of worker processes.
+    The bars are sent to every worker once, when the pool starts, and each job only ships
+    its strategy properties. Jobs use the VectorizedBacktester, so no MT5 terminal is needed
+    in the workers.
+
+    With a checkpoint_path every finished job is appended to a JSON-lines file, and a sweep
+    restarted with the same file skips the combinations that are already there.
+    """
+
+    def __init__(
+        self,
+        bars: dict[str, BarStore],
+        initial_balance: float = 10000.0,
+        volume: float = 0.1,
+        magic_number: int = 0,
+        max_workers: int | None = None,
+        checkpoint_path: str | None = None,
+        progress_every: int = 10
+    ):
+        self.bars = bars
+        self.initial_balance = initial_balance
+        self.volume = volume
+        self.magic_number = magic_number
+        self.max_workers = max_workers or os.cpu_count()
+        self.checkpoint_path = checkpoint_path
+        self.progress_every = progress_every
+
+    @staticmethod
+    def expand_grid(base_properties: BaseStrategyProps, grid: dict[str, list]) -> list[BaseStrategyProps]:
+        """
+        Combine every value of every grid entry on top of base_properties, e.g.
+        expand_grid(MACrossoverProps(timeframe="M15", fast_period=5, slow_period=20),
+                    {"fast_period": [5, 10], "slow_period": [20, 50]}).
+        """
+        names = list(grid)
+        return [
+            base_properties.model_copy(update=dict(zip(names, values)))
+            for values in itertools.product(*(grid[name] for name in names))
+        ]
+
+    @staticmethod
+    def job_key(strategy_properties: BaseStrategyProps) -> str:
+        return json.dumps(
+            {"strategy": type(strategy_properties).__name__, **strategy_properties.model_dump()},
+            sort_keys=True
+        )
+
+    def _load_checkpoint(self) -> dict[str, dict]:
+        completed = {}
+        if self.checkpoint_path and os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path, "r") as checkpoint:
+                for line in checkpoint:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:  # Line cut short by an interrupted write
+                        continue
+                    completed[record["key"]] = record["metrics"]
+        return completed
+
+    def run(self, base_properties: BaseStrategyProps, grid: dict[str, list]) -> pd.DataFrame:
+        """Run the sweep and return one row per combination: the grid parameters followed by the metrics."""
+        all_properties = self.expand_grid(base_properties, grid)
+        completed = self._load_checkpoint()
+        pending = [props for props in all_properties if self.job_key(props) not in completed]
+        if completed:
+            logger.info(
+                "Resuming sweep: %s of %s jobs already done", len(all_properties) - len(pending), len(all_properties)
+            )
+
+        checkpoint = open(self.checkpoint_path, "a") if self.checkpoint_path else None
+        start = time.perf_counter()
+        try:
+            with ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_worker,
+                initargs=(self.bars, self.initial_balance, self.volume, self.magic_number)
+            ) as executor:
+                futures = {executor.submit(_run_job, props): props for props in pending}
+                for done, future in enumerate(as_completed(futures), start=1):
+                    key = self.job_key(futures[future])
+                    completed[key] = future.result()
+                    if checkpoint is not None:
+                        checkpoint.write(json.dumps({"key": key, "metrics": completed[key]}) + "\n")
+                        checkpoint.flush()
+                    if done % self.progress_every == 0 or done == len(pending):
+                        elapsed = time.perf_counter() - start
+                        logger.info(
+                            "Sweep progress",
+                            extra={"fields": {
+                                "done": done, "total": len(pending), "seconds": round(elapsed, 1),
+                                "eta_seconds": round(elapsed / done * (len(pending) - done), 1)
+                            }}
+                        )
+        finally:
+            if checkpoint is not None:
+                checkpoint.close()
+
+        rows = [
+            {**{name: getattr(props, name) for name in grid}, **completed[self.job_key(props)]}
+            for props in all_properties
+        ]
+        return pd.DataFrame(rows)
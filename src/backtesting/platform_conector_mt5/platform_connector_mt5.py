@@ -1,3 +1,6 @@
+import copy
+
+
 class BacktestPlatformConnector:
     def __init__(self, initial_balance=1000.0, leverage=5):
         self.balance = initial_balance
@@ -25,3 +28,15 @@ class BacktestPlatformConnector:
 
     def close_position(self, ticket):
         self.positions = [p for p in self.positions if p["ticket"] != ticket]
+
+    def get_state(self) -> dict:
+        return {
+            "balance": self.balance, "equity": self.equity, "leverage": self.leverage,
+            "positions": copy.deepcopy(self.positions)
+        }
+
+    def restore_state(self, state: dict) -> None:
+        self.balance = state["balance"]
+        self.equity = state["equity"]
+        self.leverage = state["leverage"]
+        self.positions = copy.deepcopy(state["positions"])
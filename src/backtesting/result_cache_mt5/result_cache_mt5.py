@@ -0,0 +1,251 @@
+import os
+import json
+import time
+import pickle
+import hashlib
+import pandas as pd
+from dataclasses import dataclass, field
+from datetime import timedelta
+from pathlib import Path
+from bar_store.bar_store import BarStore, BAR_COLUMNS
+from backtesting.backtest_runner_mt5.backtest_runner_mt5 import BacktestRunResult, run_backtest
+from backtesting.data_display_mt5.data_display_mt5 import DataDisplayMT5
+from position_sizer.properties.position_sizer_properties import BaseSizingProps, FixedSizingProps
+from risk_manager.properties.risk_manager_properties import BaseRiskProps, MaxLeverageFactorRiskProps
+from strategy_manager.properties.strategy_manager_properties import BaseStrategyProps
+from logger.logger import get_logger
+
+logger = get_logger("result_cache")
+
+# Root of the trading framework sources, hashed as the code version
+_SOURCE_ROOT = Path(__file__).resolve().parents[2]
+_code_version: str | None = None
+
+
+def source_code_version() -> str:
+    """Hash of every .py file of the framework, so any code change invalidates the cached results."""
+    global _code_version
+    if _code_version is None:
+        digest = hashlib.sha256()
+        for path in sorted(_SOURCE_ROOT.rglob("*.py")):
+            if "__pycache__" in path.parts:
+                continue
+            digest.update(str(path.relative_to(_SOURCE_ROOT)).encode())
+            digest.update(path.read_bytes())
+        _code_version = digest.hexdigest()
+    return _code_version
+
+
+def bars_fingerprint(bars: dict[str, BarStore]) -> str:
+    """Hash of the symbols and the content of their bars (every column)."""
+    digest = hashlib.sha256()
+    for symbol, store in bars.items():
+        digest.update(symbol.encode())
+        for column in ('time',) + BAR_COLUMNS:
+            values = getattr(store, column)
+            digest.update(str(values.dtype).encode())
+            digest.update(values.tobytes())
+    return digest.hexdigest()
+
+
+def _properties_key(properties) -> dict:
+    return {"type": type(properties).__name__, "values": properties.model_dump(mode="json")}
+
+
+@dataclass
+class CachedBacktest:
+    """A backtest result and its DataDisplayMT5 metrics, as stored in the cache."""
+    key: str
+    result: BacktestRunResult
+    metrics: dict
+    inputs: dict
+    created: float
+    hit: bool = False
+    size: int = field(default=0, repr=False)
+
+
+class BacktestResultCache:
+    """
+    Content-addressed cache of event-driven backtest results, one pickle file per result.
+    The key hashes everything that determines the result: the bars (content, not dates), the
+    timeframe, the strategy, sizing and risk properties, the initial balance and magic number
+    and the framework source code. A hit returns the stored trade log and metrics without
+    replaying any bar.
+
+    Entries not used for max_age are dropped, and so are the least recently used ones while the
+    cache is larger than max_bytes. entries() lists the cache content.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        max_bytes: int | None = 1 << 30,
+        max_age: timedelta | None = None,
+        code_version: str | None = None
+    ):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.code_version = code_version
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+
+    def inputs(
+        self,
+        strategy_properties: BaseStrategyProps,
+        bars: dict[str, BarStore],
+        timeframe: str,
+        sizing_properties: BaseSizingProps,
+        risk_properties: BaseRiskProps,
+        initial_balance: float,
+        magic_number: int
+    ) -> dict:
+        return {
+            "bars": bars_fingerprint(bars),
+            "symbols": list(bars),
+            "range": [
+                str(pd.to_datetime(min(int(store.time[0]) for store in bars.values() if len(store) > 0), unit='s')),
+                str(pd.to_datetime(max(int(store.time[-1]) for store in bars.values() if len(store) > 0), unit='s'))
+            ],
+            "timeframe": timeframe.upper(),
+            "strategy": _properties_key(strategy_properties),
+            "sizing": _properties_key(sizing_properties),
+            "risk": _properties_key(risk_properties),
+            "initial_balance": initial_balance,
+            "magic_number": magic_number,
+            "code_version": self.code_version or source_code_version(),
+        }
+
+    @staticmethod
+    def key(inputs: dict) -> str:
+        # The range is derived from the bars; only what determines the result is hashed
+        hashed = {name: value for name, value in inputs.items() if name != "range"}
+        return hashlib.sha256(json.dumps(hashed, sort_keys=True).encode()).hexdigest()
+
+    def get(self, key: str) -> CachedBacktest | None:
+        """Cached entry of key, or None if there is none or it was not used for max_age (it is then removed)."""
+        path = self._path(key)
+        try:
+            if self.max_age is not None and os.path.getmtime(path) < time.time() - self.max_age.total_seconds():
+                self.remove(key)
+                return None
+            with open(path, "rb") as entry_file:
+                entry = pickle.load(entry_file)
+        except FileNotFoundError:
+            return None
+        except (pickle.UnpicklingError, EOFError, AttributeError) as e:  # Corrupt or written by other code
+            logger.warning("Dropping unreadable cache entry %s: %s", key, e)
+            self.remove(key)
+            return None
+        os.utime(path)  # The modification time tracks the last use, for eviction
+        entry.hit = True
+        entry.size = os.path.getsize(path)
+        return entry
+
+    def put(self, key: str, result: BacktestRunResult, metrics: dict, inputs: dict) -> CachedBacktest:
+        entry = CachedBacktest(key=key, result=result, metrics=metrics, inputs=inputs, created=time.time())
+        path = self._path(key)
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, "wb") as entry_file:
+            pickle.dump(entry, entry_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_path, path)
+        entry.size = os.path.getsize(path)
+        self.evict()
+        return entry
+
+    def run(
+        self,
+        strategy_properties: BaseStrategyProps,
+        bars: dict[str, BarStore],
+        timeframe: str,
+        sizing_properties: BaseSizingProps | None = None,
+        risk_properties: BaseRiskProps | None = None,
+        initial_balance: float = 10000.0,
+        magic_number: int = 0
+    ) -> CachedBacktest:
+        """Same backtest as run_backtest(), served from the cache when its inputs were already run."""
+        sizing_properties = sizing_properties or FixedSizingProps(volume=0.1)
+        risk_properties = risk_properties or MaxLeverageFactorRiskProps(max_leverage_factor=5)
+        inputs = self.inputs(
+            strategy_properties, bars, timeframe, sizing_properties, risk_properties, initial_balance, magic_number
+        )
+        key = self.key(inputs)
+        entry = self.get(key)
+        if entry is not None:
+            logger.info("Backtest result cache hit", extra={"fields": {"key": key[:12]}})
+            return entry
+
+        result = run_backtest(
+            strategy_properties, bars, timeframe, sizing_properties, risk_properties, initial_balance, magic_number
+        )
+        metrics = DataDisplayMT5(result.trade_log_df(), initial_balance).calculate_metrics() if result.trade_log else {}
+        return self.put(key, result, metrics, inputs)
+
+    def entries(self) -> pd.DataFrame:
+        """One row per cached result: key, strategy, symbols, range, trades, size and dates, most recent first."""
+        rows = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".pkl"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                with open(path, "rb") as entry_file:
+                    entry = pickle.load(entry_file)
+            except (pickle.UnpicklingError, EOFError, AttributeError, FileNotFoundError):
+                continue
+            rows.append({
+                "key": entry.key,
+                "strategy": entry.inputs["strategy"]["type"],
+                "parameters": entry.inputs["strategy"]["values"],
+                "symbols": entry.inputs["symbols"],
+                "start": entry.inputs["range"][0],
+                "end": entry.inputs["range"][1],
+                "trades": len(entry.result.trade_log),
+                "bytes": os.path.getsize(path),
+                "created": pd.to_datetime(entry.created, unit='s'),
+                "last_used": pd.to_datetime(os.path.getmtime(path), unit='s'),
+            })
+        columns = [
+            "key", "strategy", "parameters", "symbols", "start", "end", "trades", "bytes", "created", "last_used"
+        ]
+        return pd.DataFrame(rows, columns=columns).sort_values("last_used", ascending=False, ignore_index=True)
+
+    def remove(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def clear(self) -> None:
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".pkl"):
+                self.remove(name[:-len(".pkl")])
+
+    def evict(self) -> int:
+        """Drop the entries not used for max_age, then the least recently used until the rest fit in max_bytes."""
+        files = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".pkl"):
+                stat = os.stat(os.path.join(self.cache_dir, name))
+                files.append((stat.st_mtime, stat.st_size, name[:-len(".pkl")]))
+        files.sort()
+        removed = 0
+        if self.max_age is not None:
+            oldest_allowed = time.time() - self.max_age.total_seconds()
+            for _, _, key in [item for item in files if item[0] < oldest_allowed]:
+                self.remove(key)
+                removed += 1
+            files = [item for item in files if item[0] >= oldest_allowed]
+        if self.max_bytes is not None:
+            total = sum(size for _, size, _ in files)
+            for _, size, key in files:
+                if total <= self.max_bytes:
+                    break
+                self.remove(key)
+                total -= size
+                removed += 1
+        if removed:
+            logger.info("Evicted %s backtest results from the cache", removed)
+        return removed
@@ -21,6 +21,13 @@ class BacktestSentimentAnalyzer:
         self.master_news_df = pd.DataFrame()  # Inicializar como DataFrame vacío
         self._preload_csv_data()  # Cargar el CSV al inicio
 
+    def get_state(self) -> dict:
+        """Sentiment already computed, so a resumed backtest does not run the model again."""
+        return {"sentiment_cache": dict(self.sentiment_cache)}
+
+    def restore_state(self, state: dict) -> None:
+        self.sentiment_cache.update(state["sentiment_cache"])
+
     def _preload_csv_data(self):
         """
         Carga el archivo CSV completo en memoria y lo preprocesa.
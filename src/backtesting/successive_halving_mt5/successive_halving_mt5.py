@@ -0,0 +1,201 @@
+import os
+import math
+import random
+import numpy as np
+import pandas as pd
+from typing import Callable
+from concurrent.futures import ProcessPoolExecutor
+from bar_store.bar_store import BarStore
+from backtesting.backtest_runner_mt5.backtest_runner_mt5 import BacktestRunResult, run_backtest
+from backtesting.parameter_sweep_mt5.parameter_sweep_mt5 import ParameterSweep
+from position_sizer.properties.position_sizer_properties import BaseSizingProps
+from risk_manager.properties.risk_manager_properties import BaseRiskProps
+from strategy_manager.properties.strategy_manager_properties import BaseStrategyProps
+from logger.logger import get_logger
+
+logger = get_logger("successive_halving")
+
+# State of the current worker process, set once by the pool initializer
+_worker_state: dict = {}
+
+
+def net_profit_objective(result: BacktestRunResult) -> float:
+    return result.net_profit
+
+
+def _init_worker(
+    bars: dict[str, BarStore],
+    timeframe: str,
+    sizing_properties: BaseSizingProps | None,
+    risk_properties: BaseRiskProps | None,
+    initial_balance: float,
+    magic_number: int,
+    objective: Callable[[BacktestRunResult], float]
+) -> None:
+    _worker_state.update(
+        bars=bars, timeframe=timeframe, sizing_properties=sizing_properties, risk_properties=risk_properties,
+        initial_balance=initial_balance, magic_number=magic_number, objective=objective
+    )
+
+
+def _evaluate(strategy_properties: BaseStrategyProps, end_time: int) -> dict:
+    """Event-driven backtest of one candidate over the bars up to end_time."""
+    bars = {
+        symbol: store.slice(0, int(np.searchsorted(store.time, end_time, side='right')))
+        for symbol, store in _worker_state["bars"].items()
+    }
+    bars = {symbol: store for symbol, store in bars.items() if len(store) > 0}
+    try:
+        result = run_backtest(
+            strategy_properties, bars, _worker_state["timeframe"], _worker_state["sizing_properties"],
+            _worker_state["risk_properties"], _worker_state["initial_balance"], _worker_state["magic_number"]
+        )
+    except ValueError as e:  # Invalid combination, e.g. fast_period >= slow_period
+        return {"error": str(e)}
+    return {
+        "score": float(_worker_state["objective"](result)),
+        "net_profit": result.net_profit,
+        "max_drawdown_pct": result.max_drawdown_pct,
+        "trades": len(result.trade_log),
+    }
+
+
+class SuccessiveHalvingOptimizer:
+    """
+    Adaptive parameter search with successive halving. All the candidates are backtested on
+    the first part of the history; only the best 1/eta of them move on to the next rung, which
+    replays a history eta times longer, until the last rung uses all the bars. A candidate is
+    also dropped as soon as its partial result is hopeless: a drawdown above max_drawdown_pct
+    or a net profit below min_net_profit on the bars seen so far.
+
+    Every trial is a full event-driven backtest (StrategyManager, PositionSizer, RiskManager
+    and BacktestingDirector, see run_backtest), run in a pool of worker processes that receive
+    the bars once, so any strategy with a properties model can be optimized. objective maps a
+    BacktestRunResult to a score (higher is better) and must be picklable.
+    """
+
+    def __init__(
+        self,
+        bars: dict[str, BarStore],
+        timeframe: str,
+        sizing_properties: BaseSizingProps | None = None,
+        risk_properties: BaseRiskProps | None = None,
+        initial_balance: float = 10000.0,
+        magic_number: int = 0,
+        objective: Callable[[BacktestRunResult], float] = net_profit_objective,
+        eta: int = 3,
+        rungs: int = 3,
+        max_drawdown_pct: float | None = None,
+        min_net_profit: float | None = None,
+        max_workers: int | None = None,
+        seed: int = 0
+    ):
+        if eta < 2 or rungs < 1:
+            raise ValueError("eta must be at least 2 and rungs at least 1.")
+        self.bars = bars
+        self.timeframe = timeframe
+        self.sizing_properties = sizing_properties
+        self.risk_properties = risk_properties
+        self.initial_balance = initial_balance
+        self.magic_number = magic_number
+        self.objective = objective
+        self.eta = eta
+        self.rungs = rungs
+        self.max_drawdown_pct = max_drawdown_pct
+        self.min_net_profit = min_net_profit
+        self.max_workers = max_workers or os.cpu_count()
+        self.seed = seed
+        self.best_properties: BaseStrategyProps | None = None
+
+    def candidates(
+        self, base_properties: BaseStrategyProps, space: dict[str, list], n_candidates: int | None = None
+    ) -> list[BaseStrategyProps]:
+        """Every combination of space, or n_candidates of them drawn at random with the optimizer seed."""
+        all_properties = ParameterSweep.expand_grid(base_properties, space)
+        if n_candidates is None or n_candidates >= len(all_properties):
+            return all_properties
+        return random.Random(self.seed).sample(all_properties, n_candidates)
+
+    def rung_end_times(self) -> list[int]:
+        """Last bar time replayed by each rung: 1/eta^(rungs - 1) of the history, then eta times longer every rung."""
+        first = min(int(store.time[0]) for store in self.bars.values() if len(store) > 0)
+        last = max(int(store.time[-1]) for store in self.bars.values() if len(store) > 0)
+        return [
+            first + int((last - first) * self.eta ** (rung - self.rungs + 1)) for rung in range(self.rungs - 1)
+        ] + [last]
+
+    def _prune_reason(self, metrics: dict) -> str | None:
+        if "error" in metrics:
+            return metrics["error"]
+        if self.max_drawdown_pct is not None and metrics["max_drawdown_pct"] > self.max_drawdown_pct:
+            return "max drawdown"
+        if self.min_net_profit is not None and metrics["net_profit"] < self.min_net_profit:
+            return "net profit"
+        return None
+
+    def run(
+        self, base_properties: BaseStrategyProps, space: dict[str, list], n_candidates: int | None = None
+    ) -> pd.DataFrame:
+        """
+        Run the search and return one row per candidate: its parameters, the last rung it reached,
+        why it was dropped (empty for the finalists) and the metrics of its last backtest, best first.
+        The best candidate is left in best_properties.
+        """
+        candidates = self.candidates(base_properties, space, n_candidates)
+        records = [{"rung": None, "pruned": None} for _ in candidates]
+        alive = list(range(len(candidates)))
+
+        with ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=_init_worker,
+            initargs=(
+                self.bars, self.timeframe, self.sizing_properties, self.risk_properties,
+                self.initial_balance, self.magic_number, self.objective
+            )
+        ) as executor:
+            for rung, end_time in enumerate(self.rung_end_times()):
+                results = list(executor.map(
+                    _evaluate, [candidates[index] for index in alive], [end_time] * len(alive)
+                ))
+                survivors = []
+                for index, metrics in zip(alive, results):
+                    reason = self._prune_reason(metrics)
+                    records[index].update(
+                        {name: value for name, value in metrics.items() if name != "error"}, rung=rung
+                    )
+                    if reason is None:
+                        survivors.append(index)
+                    else:
+                        records[index]["pruned"] = reason
+
+                # Best first; ties keep the candidate order
+                survivors.sort(key=lambda index: -records[index]["score"])
+                if rung < self.rungs - 1:
+                    keep = max(1, math.ceil(len(survivors) / self.eta))
+                    for index in survivors[keep:]:
+                        records[index]["pruned"] = "halving"
+                    survivors = survivors[:keep]
+                logger.info(
+                    "Successive halving rung done",
+                    extra={"fields": {
+                        "rung": rung, "end": str(pd.to_datetime(end_time, unit='s')), "evaluated": len(alive),
+                        "kept": len(survivors),
+                        "best_score": round(records[survivors[0]]["score"], 2) if survivors else None
+                    }}
+                )
+                alive = survivors
+                if not alive:
+                    break
+
+        self.best_properties = candidates[alive[0]] if alive else None
+        rows = [
+            {**{name: getattr(candidates[index], name) for name in space}, **records[index]}
+            for index in range(len(candidates))
+        ]
+        frame = pd.DataFrame(rows)
+        # Finalists first, then by the rung reached and the score there
+        frame["_finalist"] = frame["pruned"].isna()
+        frame = frame.sort_values(
+            ["_finalist", "rung", "score"], ascending=[False, False, False], na_position="last", kind="stable"
+        )
+        return frame.drop(columns="_finalist").reset_index(drop=True)
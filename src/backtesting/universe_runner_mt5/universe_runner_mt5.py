@@ -0,0 +1,179 @@
+import os
+import time
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass, field
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from backtesting.backtest_runner_mt5.backtest_runner_mt5 import run_backtest
+from backtesting.data_display_mt5.data_display_mt5 import DataDisplayMT5
+from backtesting.data_source_mt5.data_source_mt5 import MT5BacktestDataSource
+from backtesting.event_queue_mt5.event_queue_mt5 import BacktestEventQueue
+from position_sizer.properties.position_sizer_properties import BaseSizingProps
+from risk_manager.properties.risk_manager_properties import BaseRiskProps
+from strategy_manager.properties.strategy_manager_properties import BaseStrategyProps
+from logger.logger import get_logger
+
+logger = get_logger("universe_runner")
+
+
+def _run_shard(
+    symbol: str,
+    timeframe: str,
+    start_date: str,
+    end_date: str,
+    strategy_properties: BaseStrategyProps,
+    sizing_properties: BaseSizingProps | None,
+    risk_properties: BaseRiskProps | None,
+    initial_balance: float,
+    magic_number: int,
+    cache_dir: str | None,
+    archive_dir: str | None
+) -> dict:
+    """Backtest one symbol in a worker. Its bars are loaded here, so only this symbol is ever in memory."""
+    data_source = MT5BacktestDataSource(
+        BacktestEventQueue(), [symbol], timeframe, start_date, end_date,
+        cache_dir=cache_dir, archive_dir=archive_dir
+    )
+    result = run_backtest(
+        strategy_properties, data_source, timeframe, sizing_properties, risk_properties,
+        initial_balance, magic_number, record_equity=True
+    )
+    return {
+        "symbol": symbol, "trade_log": result.trade_log,
+        "equity_time": result.equity_time, "equity": result.equity
+    }
+
+
+def _carry_forward(times: np.ndarray, values: np.ndarray, at: np.ndarray) -> np.ndarray:
+    """Value of a step series at the given times (the last value at or before each of them, 0 before the first)."""
+    if len(times) == 0:
+        return np.zeros(len(at))
+    index = np.searchsorted(times, at, side='right') - 1
+    return np.where(index >= 0, values[np.maximum(index, 0)], 0.0)
+
+
+@dataclass
+class UniverseBacktestResult:
+    """
+    Portfolio-level outcome of a universe backtest: the trades of all the symbols in closing
+    order, the portfolio equity after every bar time and the metrics of DataDisplayMT5 plus
+    the drawdown of that equity curve. Symbols whose backtest failed are in errors.
+    """
+    trade_log: list[dict]
+    equity: pd.Series
+    metrics: dict
+    initial_balance: float
+    errors: dict[str, str] = field(default_factory=dict)
+
+    def trade_log_df(self) -> pd.DataFrame:
+        """Trade log as the DataFrame consumed by DataDisplayMT5."""
+        return pd.DataFrame(self.trade_log)
+
+
+class UniverseBacktestRunner:
+    """
+    Backtests one strategy over many symbols with one event-driven backtest per symbol
+    (BacktestingDirector with BacktestOrderExecutor), spread over a pool of worker processes.
+    Each worker loads the bars of its symbol itself, from MT5 or from the bar cache / archive,
+    so its memory is bounded by one symbol's data.
+
+    Results are merged in the parent as each symbol finishes: trades are collected and the
+    PnL of the symbol, marked to market after every bar, is added to the portfolio equity
+    curve. Every symbol is sized and risk-checked on its own account of initial_balance;
+    the portfolio equity is initial_balance plus the PnL of all the symbols.
+    """
+
+    def __init__(
+        self,
+        symbols: list[str],
+        timeframe: str,
+        start_date: str,
+        end_date: str,
+        sizing_properties: BaseSizingProps | None = None,
+        risk_properties: BaseRiskProps | None = None,
+        initial_balance: float = 10000.0,
+        magic_number: int = 0,
+        cache_dir: str | None = None,
+        archive_dir: str | None = None,
+        max_workers: int | None = None
+    ):
+        self.symbols = symbols
+        self.timeframe = timeframe
+        self.start_date = start_date
+        self.end_date = end_date
+        self.sizing_properties = sizing_properties
+        self.risk_properties = risk_properties
+        self.initial_balance = initial_balance
+        self.magic_number = magic_number
+        self.cache_dir = cache_dir
+        self.archive_dir = archive_dir
+        self.max_workers = max_workers or os.cpu_count()
+
+    def run(self, strategy_properties: BaseStrategyProps) -> UniverseBacktestResult:
+        trades: dict[str, list[dict]] = {}
+        errors: dict[str, str] = {}
+        equity_time = np.array([], dtype=np.int64)
+        pnl = np.array([], dtype=np.float64)
+        start = time.perf_counter()
+
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(
+                    _run_shard, symbol, self.timeframe, self.start_date, self.end_date, strategy_properties,
+                    self.sizing_properties, self.risk_properties, self.initial_balance, self.magic_number,
+                    self.cache_dir, self.archive_dir
+                ): symbol
+                for symbol in self.symbols
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                symbol = futures[future]
+                try:
+                    shard = future.result()
+                except Exception as e:  # One failed shard, even a dead worker, must not lose the others
+                    logger.error("Universe backtest of %s failed: %s: %s", symbol, type(e).__name__, e)
+                    errors[symbol] = f"{type(e).__name__}: {e}"
+                    continue
+                trades[symbol] = shard["trade_log"]
+
+                # Add the PnL of the symbol to the portfolio, both carried forward between their bar times
+                symbol_time, keep = np.unique(shard["equity_time"][::-1], return_index=True)
+                symbol_pnl = shard["equity"][::-1][keep] - self.initial_balance
+                merged_time = np.union1d(equity_time, symbol_time)
+                pnl = _carry_forward(equity_time, pnl, merged_time) + _carry_forward(
+                    symbol_time, symbol_pnl, merged_time
+                )
+                equity_time = merged_time
+                logger.info(
+                    "Universe backtest progress",
+                    extra={"fields": {
+                        "symbol": symbol, "done": done, "total": len(self.symbols),
+                        "trades": len(shard["trade_log"]), "seconds": round(time.perf_counter() - start, 1)
+                    }}
+                )
+
+        # Same order as a multi-symbol backtest: by close time, then by symbol order
+        trade_log = [
+            trade for _, _, trade in sorted(
+                (
+                    (trade["exit_time"], order, trade)
+                    for order, symbol in enumerate(self.symbols) for trade in trades.get(symbol, [])
+                ),
+                key=lambda item: (item[0], item[1])
+            )
+        ]
+        equity = pd.Series(
+            self.initial_balance + pnl, index=pd.to_datetime(equity_time, unit='s'), name="equity"
+        )
+        return UniverseBacktestResult(
+            trade_log=trade_log, equity=equity, metrics=self._metrics(trade_log, equity),
+            initial_balance=self.initial_balance, errors=errors
+        )
+
+    def _metrics(self, trade_log: list[dict], equity: pd.Series) -> dict:
+        metrics = DataDisplayMT5(pd.DataFrame(trade_log), self.initial_balance).calculate_metrics() if trade_log else {}
+        if len(equity) > 0:
+            peak = equity.cummax()
+            metrics["Final Equity"] = float(equity.iloc[-1])
+            metrics["Max Equity Drawdown ($)"] = float((equity - peak).min())
+            metrics["Max Equity Drawdown (%)"] = float(((peak - equity) / peak).max() * 100)
+        return metrics
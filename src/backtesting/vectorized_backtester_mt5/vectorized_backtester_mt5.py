@@ -0,0 +1,273 @@
+import numpy as np
+import pandas as pd
+import MetaTrader5 as mt5
+from dataclasses import dataclass, field
+from numpy.lib.stride_tricks import sliding_window_view
+from bar_store.bar_store import BarStore
+from strategy_manager.properties.strategy_manager_properties import BaseStrategyProps, MACrossoverProps, RSIProps
+from strategy_manager.strategies.strategy_ma_crossover import StrategyMACrossover
+from strategy_manager.strategies.strategy_rsi_mr import StrategyRSI
+
+
+CONTRACT_SIZE = 100000  # Same PnL multiplier as BacktestOrderExecutor
+
+
+def signals_to_positions(signals: np.ndarray, anomalous: np.ndarray | None = None) -> np.ndarray:
+    """
+    Position held after every bar. Both strategies only act on a signal that points against
+    the current position, so the position is the last non-zero signal (0 before the first one).
+
+    `anomalous` flags the bars where the anomaly detector suppresses the signal. As in
+    StrategyMACrossover, the opposite position is still closed on those bars, but the new
+    one is not opened.
+    """
+    if anomalous is None or not anomalous.any():
+        last_signal_index = np.where(signals != 0, np.arange(len(signals)), 0)
+        np.maximum.accumulate(last_signal_index, out=last_signal_index)
+        positions = signals[last_signal_index]
+        if len(signals) > 0 and signals[0] == 0:
+            positions[last_signal_index == 0] = 0
+        return positions
+
+    nonzero = np.flatnonzero(signals != 0)
+    values = signals[nonzero]
+    flagged = anomalous[nonzero]
+    # Only crossings, anomalous bars and the bar right after an anomalous one can change the position
+    previous_flagged = np.concatenate(([True], flagged[:-1]))
+    previous_values = np.concatenate(([0], values[:-1]))
+    relevant = flagged | previous_flagged | (values != previous_values)
+
+    change_indices = []
+    change_positions = []
+    position = 0
+    for index, signal, is_anomalous in zip(nonzero[relevant], values[relevant], flagged[relevant]):
+        new_position = (0 if position == -signal else position) if is_anomalous else signal
+        if new_position != position:
+            change_indices.append(index)
+            change_positions.append(new_position)
+            position = new_position
+
+    positions = np.zeros(len(signals), dtype=signals.dtype)
+    if change_indices:
+        change_indices = np.array(change_indices)
+        segment = np.searchsorted(change_indices, np.arange(len(signals)), side='right') - 1
+        positions = np.where(segment >= 0, np.array(change_positions, dtype=signals.dtype)[segment], 0)
+        positions = positions.astype(signals.dtype)
+    return positions
+
+
+def anomaly_windows(anomaly_detector, bars: BarStore) -> np.ndarray:
+    """
+    Flattened feature windows of the anomaly detector, one per bar from the window_size-th on
+    (window i ends at bar i + window_size - 1), as its fit() builds them.
+    """
+    window_size = anomaly_detector.window_size
+    features = np.column_stack([bars.column(name).astype(np.float64) for name in anomaly_detector.features])
+    if len(bars) < window_size:
+        return np.empty((0, window_size * features.shape[1]), dtype=np.float32)
+    windows = sliding_window_view(features, (window_size, features.shape[1]))[:, 0]
+    return windows.reshape(len(windows), -1).astype(np.float32)
+
+
+def anomaly_mask(anomaly_detector, bars: BarStore) -> np.ndarray:
+    """
+    Flags the bars whose trailing window the trained anomaly detector considers anomalous,
+    scoring all windows in one batch. Bars without a full window are never flagged.
+    """
+    window_size = anomaly_detector.window_size
+    mask = np.zeros(len(bars), dtype=bool)
+    if len(bars) < window_size:
+        return mask
+    scores = -anomaly_detector.model.decision_function(anomaly_windows(anomaly_detector, bars))
+    mask[window_size - 1:] = scores > anomaly_detector.threshold
+    return mask
+
+
+def simulate_trades(
+    positions: np.ndarray, close: np.ndarray, volume: float
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Turn a position series into round trips filled at the bar close.
+    Returns (entry indices, exit indices, sides, profits) of the closed trades; a position
+    still open after the last bar is not included.
+    """
+    previous = np.concatenate(([0], positions[:-1]))
+    changes = np.flatnonzero(positions != previous)
+    entries = changes[positions[changes] != 0]
+    # A position is closed at the next position change (a reversal or a close), if there is one
+    next_change = np.searchsorted(changes, entries, side='right')
+    closed = next_change < len(changes)
+    closed_entries = entries[closed]
+    exits = changes[next_change[closed]]
+
+    sides = positions[closed_entries].astype(np.float64)
+    profits = sides * (close[exits] - close[closed_entries]) * volume * CONTRACT_SIZE
+    return closed_entries, exits, sides, profits
+
+
+@dataclass
+class VectorizedBacktestResult:
+    """
+    Outcome of a vectorized backtest. trade_log has the same records as
+    BacktestOrderExecutor.trade_log; equity is marked to market on every bar.
+    """
+    time: dict[str, np.ndarray]
+    positions: dict[str, np.ndarray]
+    equity: dict[str, np.ndarray]
+    trade_log: list[dict] = field(default_factory=list)
+    initial_balance: float = 0.0
+
+    def trade_log_df(self) -> pd.DataFrame:
+        """Trade log as the DataFrame consumed by DataDisplayMT5."""
+        return pd.DataFrame(self.trade_log)
+
+    @property
+    def final_balance(self) -> float:
+        return self.initial_balance + sum(trade["profit"] for trade in self.trade_log)
+
+
+class VectorizedBacktester:
+    """
+    Array-based backtest engine for the MA crossover and RSI strategies.
+    It computes the whole signal series of a symbol at once and turns it into positions,
+    fills, PnL and an equity curve with NumPy operations, following the same rules as the
+    event-driven backtest: signals are evaluated on every closed bar, the opposite position
+    is closed and the new one opened at that bar's close, and every order is filled.
+
+    Position sizing is a fixed volume and risk management is not applied. The sentiment
+    analyzer is not supported; use BacktestingDirector for it. A trained anomaly detector
+    can be applied through anomaly_mask().
+    """
+
+    def __init__(
+        self,
+        bars: dict[str, BarStore],
+        initial_balance: float = 10000.0,
+        volume: float = 0.1,
+        magic_number: int = 0
+    ):
+        self.bars = bars
+        self.symbols = list(bars)
+        self.initial_balance = initial_balance
+        self.volume = volume
+        self.magic_number = magic_number
+
+    def compute_signals(self, bars: BarStore, strategy_properties: BaseStrategyProps) -> np.ndarray:
+        # The strategy classes validate and adjust the parameters exactly as in the event-driven backtest
+        if isinstance(strategy_properties, MACrossoverProps):
+            return StrategyMACrossover(properties=strategy_properties).generate_signals(bars)
+        elif isinstance(strategy_properties, RSIProps):
+            return StrategyRSI(properties=strategy_properties).generate_signals(bars)
+        else:
+            raise ValueError(f"Unknown strategy generator properties: {strategy_properties}")
+
+    def _stop_levels(
+        self, symbol: str, strategy_properties: BaseStrategyProps, entry_prices: np.ndarray, sides: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """SL/TP recorded on the positions (they are never triggered, as in the event-driven backtest)."""
+        zeros = np.zeros(len(entry_prices))
+        if not isinstance(strategy_properties, RSIProps):
+            return zeros, zeros
+        strategy = StrategyRSI(properties=strategy_properties)
+        if strategy.sl_points <= 0 and strategy.tp_points <= 0:
+            return zeros, zeros
+        point = mt5.symbol_info(symbol).point
+        stop_loss = entry_prices - sides * strategy.sl_points * point if strategy.sl_points > 0 else zeros
+        take_profit = entry_prices + sides * strategy.tp_points * point if strategy.tp_points > 0 else zeros
+        return stop_loss, take_profit
+
+    def signals(self, strategy_properties: BaseStrategyProps) -> dict[str, np.ndarray]:
+        """Signal series of every symbol over all its bars (can be reused for several run() calls)."""
+        return {
+            symbol: self.compute_signals(bars, strategy_properties)
+            for symbol, bars in self.bars.items()
+        }
+
+    def _run_symbol(
+        self,
+        symbol: str,
+        strategy_properties: BaseStrategyProps,
+        signals: np.ndarray,
+        anomalous: np.ndarray | None,
+        start: int,
+        stop: int
+    ) -> tuple[np.ndarray, np.ndarray, list[dict], np.ndarray]:
+        bars = self.bars[symbol].slice(start, stop)
+        close = np.asarray(bars.close, dtype=np.float64)
+        positions = signals_to_positions(
+            signals[start:stop], anomalous[start:stop] if anomalous is not None else None
+        )
+        closed_entries, exits, sides, profits = simulate_trades(positions, close, self.volume)
+        entry_prices = close[closed_entries]
+        exit_prices = close[exits]
+
+        # Equity marked to market: realized PnL so far plus the PnL of the open position
+        realized = np.zeros(len(close))
+        np.add.at(realized, exits, profits)
+        realized = np.cumsum(realized)
+        open_pnl = np.zeros(len(close))
+        previous = np.concatenate(([0], positions[:-1]))
+        entries = np.flatnonzero((positions != previous) & (positions != 0))
+        if len(entries) > 0:
+            open_entry = entries[np.maximum(np.searchsorted(entries, np.arange(len(close)), side='right') - 1, 0)]
+            open_pnl = positions * (close - close[open_entry]) * self.volume * CONTRACT_SIZE
+        equity = self.initial_balance + realized + open_pnl
+
+        stop_loss, take_profit = self._stop_levels(symbol, strategy_properties, entry_prices, sides)
+        entry_times = pd.to_datetime(bars.time[closed_entries] * 1000, unit='ms')
+        exit_times = pd.to_datetime(bars.time[exits] * 1000, unit='ms')
+        trade_log = [
+            {
+                "ticket": f"{symbol}-{int(entry) + start}", "symbol": symbol,
+                "open_side": "buy" if side > 0 else "sell", "entry_price": float(entry_price),
+                "entry_time": entry_time, "volume": self.volume,
+                "close_side": "sell" if side > 0 else "buy",
+                "exit_price": float(exit_price), "exit_time": exit_time,
+                "profit": float(profit), "magic": self.magic_number,
+                "sl": float(sl), "tp": float(tp)
+            }
+            for entry, side, entry_price, entry_time, exit_price, exit_time, profit, sl, tp in zip(
+                closed_entries, sides, entry_prices, entry_times, exit_prices, exit_times,
+                profits, stop_loss, take_profit
+            )
+        ]
+        return positions, equity, trade_log, bars.time[exits]
+
+    def run(
+        self,
+        strategy_properties: BaseStrategyProps,
+        start_time: int | None = None,
+        end_time: int | None = None,
+        signals: dict[str, np.ndarray] | None = None,
+        anomaly_masks: dict[str, np.ndarray] | None = None
+    ) -> VectorizedBacktestResult:
+        """
+        Backtest the strategy, optionally only over the bars in [start_time, end_time] (epoch
+        seconds). The position is flat at start_time, while the indicators keep the history
+        before it. Precomputed signals (see signals()) and anomaly masks (see anomaly_mask(),
+        used by the MA crossover only) can be passed to avoid recomputing them.
+        """
+        if signals is None:
+            signals = self.signals(strategy_properties)
+        if not isinstance(strategy_properties, MACrossoverProps):
+            anomaly_masks = None  # StrategyRSI does not use the anomaly detector
+
+        result = VectorizedBacktestResult(time={}, positions={}, equity={}, initial_balance=self.initial_balance)
+        trades = []
+        for order, symbol in enumerate(self.symbols):
+            times = self.bars[symbol].time
+            start = int(np.searchsorted(times, start_time, side='left')) if start_time is not None else 0
+            stop = int(np.searchsorted(times, end_time, side='right')) if end_time is not None else len(times)
+            positions, equity, trade_log, exit_times = self._run_symbol(
+                symbol, strategy_properties, signals[symbol],
+                anomaly_masks.get(symbol) if anomaly_masks is not None else None, start, stop
+            )
+            result.time[symbol] = times[start:stop]
+            result.positions[symbol] = positions
+            result.equity[symbol] = equity
+            trades.extend((int(exit_time), order, trade) for exit_time, trade in zip(exit_times, trade_log))
+
+        # Same order as the event-driven backtest: by close time, then by symbol order
+        trades.sort(key=lambda item: (item[0], item[1]))
+        result.trade_log = [trade for _, _, trade in trades]
+        return result
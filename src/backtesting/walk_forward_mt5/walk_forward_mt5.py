@@ -0,0 +1,302 @@
+import io
+import os
+import contextlib
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Callable
+from concurrent.futures import ProcessPoolExecutor
+from bar_store.bar_store import BarStore
+from backtesting.anomaly_detector_mt5.anomaly_detector_mt5 import BacktestIsolationForestAnomalyDetector
+from backtesting.data_display_mt5.data_display_mt5 import DataDisplayMT5
+from backtesting.parameter_sweep_mt5.parameter_sweep_mt5 import ParameterSweep
+from backtesting.vectorized_backtester_mt5.vectorized_backtester_mt5 import (
+    VectorizedBacktester,
+    anomaly_windows,
+    signals_to_positions,
+    simulate_trades,
+)
+from strategy_manager.properties.strategy_manager_properties import BaseStrategyProps, MACrossoverProps
+from logger.logger import get_logger
+
+logger = get_logger("walk_forward")
+
+# (in-sample start, in-sample end, out-of-sample start, out-of-sample end), epoch seconds, ends included
+Fold = tuple[int, int, int, int]
+
+# State of the current worker process, set once by the pool initializer
+_worker_state: dict = {}
+
+
+@dataclass(frozen=True)
+class FoldAnomalyMask:
+    """Anomaly flags of one symbol in one fold, for its bars from index offset on; other bars are not flagged."""
+    offset: int
+    flags: np.ndarray
+
+    def between(self, start: int, stop: int) -> np.ndarray:
+        """Flags of the bars with index in [start, stop)."""
+        flags = np.zeros(stop - start, dtype=bool)
+        low = max(start, self.offset)
+        high = min(stop, self.offset + len(self.flags))
+        if high > low:
+            flags[low - start:high - start] = self.flags[low - self.offset:high - self.offset]
+        return flags
+
+
+def _anomaly_job(
+    anomaly_detector_factory: Callable[[], BacktestIsolationForestAnomalyDetector],
+    threshold_percentile: float,
+    bars: BarStore,
+    fold_start: int,
+    in_sample_stop: int
+) -> np.ndarray:
+    """
+    Train a detector on the in-sample bars [fold_start, in_sample_stop) of bars and flag the bars
+    of the fold, from fold_start on. The bars before fold_start only complete the first windows.
+    The in-sample windows keep the scores computed while training, so every window is scored once.
+    """
+    detector = anomaly_detector_factory()
+    window_size = detector.window_size
+    flags = np.zeros(len(bars) - fold_start, dtype=bool)
+    if in_sample_stop - fold_start < window_size:
+        return flags
+    # Window i ends at bar i + window_size - 1
+    windows = anomaly_windows(detector, bars)
+    with contextlib.redirect_stdout(io.StringIO()):  # fit() prints its progress
+        detector.fit_windows(windows[fold_start:in_sample_stop - window_size + 1])
+        detector.set_threshold_from_train_data(threshold_percentile)
+    flags[window_size - 1:in_sample_stop - fold_start] = detector.decision_scores_train > detector.threshold
+
+    # Windows reaching back before the fold, and the out-of-sample ones
+    first_bars = np.arange(max(fold_start, window_size - 1), fold_start + window_size - 1)
+    other_bars = np.concatenate((first_bars, np.arange(in_sample_stop, len(bars))))
+    if len(other_bars) > 0:
+        scores = -detector.model.decision_function(windows[other_bars - window_size + 1])
+        flags[other_bars - fold_start] = scores > detector.threshold
+    return flags
+
+
+def _init_worker(
+    bars: dict[str, BarStore],
+    folds: list[Fold],
+    anomaly_masks: list[dict[str, FoldAnomalyMask] | None],
+    volume: float,
+    objective: Callable[[np.ndarray], float]
+) -> None:
+    _worker_state.update(
+        backtester=VectorizedBacktester(bars, volume=volume), folds=folds,
+        anomaly_masks=anomaly_masks, volume=volume, objective=objective
+    )
+
+
+def fold_profits(
+    bars: dict[str, BarStore],
+    signals: dict[str, np.ndarray],
+    start_time: int,
+    end_time: int,
+    volume: float,
+    anomaly_masks: dict[str, FoldAnomalyMask] | None = None
+) -> np.ndarray:
+    """
+    Profits of the trades closed between start_time and end_time, in closing order. Same trades
+    as VectorizedBacktester.run() over that range, without building the trade log.
+    """
+    exit_times, profits = [], []
+    for symbol, symbol_bars in bars.items():
+        start = int(np.searchsorted(symbol_bars.time, start_time, side='left'))
+        stop = int(np.searchsorted(symbol_bars.time, end_time, side='right'))
+        anomalous = anomaly_masks.get(symbol) if anomaly_masks is not None else None
+        positions = signals_to_positions(
+            signals[symbol][start:stop], anomalous.between(start, stop) if anomalous is not None else None
+        )
+        _, exits, _, symbol_profits = simulate_trades(
+            positions, np.asarray(symbol_bars.close[start:stop], dtype=np.float64), volume
+        )
+        exit_times.append(symbol_bars.time[start:stop][exits])
+        profits.append(symbol_profits)
+    if not profits:
+        return np.array([])
+    order = np.argsort(np.concatenate(exit_times), kind='stable')
+    return np.concatenate(profits)[order]
+
+
+def _score_job(strategy_properties: BaseStrategyProps) -> list[float | None]:
+    """In-sample objective of one parameter combination in every fold (None if it does not trade)."""
+    backtester: VectorizedBacktester = _worker_state["backtester"]
+    folds = _worker_state["folds"]
+    try:
+        # Indicators are computed once over the whole history and shared by all the folds
+        signals = backtester.signals(strategy_properties)
+    except ValueError:  # Invalid combination, e.g. fast_period >= slow_period
+        return [None] * len(folds)
+    use_anomalies = isinstance(strategy_properties, MACrossoverProps)
+    scores = []
+    for fold, (in_start, in_end, _, _) in enumerate(folds):
+        profits = fold_profits(
+            backtester.bars, signals, in_start, in_end, _worker_state["volume"],
+            _worker_state["anomaly_masks"][fold] if use_anomalies else None
+        )
+        scores.append(float(_worker_state["objective"](profits)) if len(profits) > 0 else None)
+    return scores
+
+
+class WalkForwardOptimizer:
+    """
+    Walk-forward optimization: history is split into rolling windows of in_sample followed by
+    out_of_sample, moved forward by step (out_of_sample by default). In every fold the
+    parameter combination with the best in-sample objective is backtested out-of-sample.
+
+    All the folds are scored in one pass over the grid, in a pool of worker processes: the bars
+    are sent to every worker once, each job is one combination, and its indicators are computed
+    once over the whole history and reused by all the folds. Out-of-sample positions start flat
+    at the start of the window, with indicators already warmed up by the earlier bars.
+
+    objective maps the array of trade profits of a window to a score (higher is better); it must
+    be picklable, e.g. a module-level function. With an anomaly_detector_factory (also picklable),
+    a detector is trained in a worker on the in-sample bars of every fold and symbol and its flags
+    are used in-sample and out-of-sample by the MA crossover. Only the flags of the bars of each
+    fold are kept, so running the optimizer again over the same folds (e.g. with another grid)
+    does not retrain the detectors.
+    """
+
+    def __init__(
+        self,
+        bars: dict[str, BarStore],
+        in_sample: timedelta,
+        out_of_sample: timedelta,
+        step: timedelta | None = None,
+        objective: Callable[[np.ndarray], float] = np.sum,
+        initial_balance: float = 10000.0,
+        volume: float = 0.1,
+        magic_number: int = 0,
+        max_workers: int | None = None,
+        anomaly_detector_factory: Callable[[], BacktestIsolationForestAnomalyDetector] | None = None,
+        anomaly_threshold_percentile: float = 95
+    ):
+        self.bars = bars
+        self.in_sample = int(in_sample.total_seconds())
+        self.out_of_sample = int(out_of_sample.total_seconds())
+        self.step = int(step.total_seconds()) if step is not None else self.out_of_sample
+        self.objective = objective
+        self.initial_balance = initial_balance
+        self.volume = volume
+        self.magic_number = magic_number
+        self.max_workers = max_workers or os.cpu_count()
+        self.anomaly_detector_factory = anomaly_detector_factory
+        self.anomaly_threshold_percentile = anomaly_threshold_percentile
+        self.backtester = VectorizedBacktester(bars, initial_balance, volume, magic_number)
+        self._fold_anomaly_masks: dict[tuple[str, Fold], FoldAnomalyMask] = {}
+        self.out_of_sample_trade_log: list[dict] = []
+
+    def folds(self) -> list[Fold]:
+        """Windows that fit completely between the first and the last bar."""
+        first = min(int(bars.time[0]) for bars in self.bars.values() if len(bars) > 0)
+        last = max(int(bars.time[-1]) for bars in self.bars.values() if len(bars) > 0)
+        folds = []
+        in_start = first
+        while in_start + self.in_sample + self.out_of_sample - 1 <= last:
+            out_start = in_start + self.in_sample
+            folds.append((in_start, out_start - 1, out_start, out_start + self.out_of_sample - 1))
+            in_start += self.step
+        return folds
+
+    def _anomaly_masks(self, folds: list[Fold]) -> list[dict[str, FoldAnomalyMask] | None]:
+        """
+        Anomaly flags of every fold and symbol, over the in-sample and out-of-sample bars of the
+        fold. The detectors missing from earlier runs are trained and scored in worker processes.
+        """
+        if self.anomaly_detector_factory is None:
+            return [None] * len(folds)
+        window_size = self.anomaly_detector_factory().window_size
+        keys, jobs = [], []
+        for fold in folds:
+            in_start, in_end, _, out_end = fold
+            for symbol, bars in self.bars.items():
+                if (symbol, fold) in self._fold_anomaly_masks:
+                    continue
+                start = int(np.searchsorted(bars.time, in_start, side='left'))
+                in_stop = int(np.searchsorted(bars.time, in_end, side='right'))
+                stop = int(np.searchsorted(bars.time, out_end, side='right'))
+                # The first windows of the fold also use the bars right before it
+                window_start = max(start - window_size + 1, 0)
+                keys.append((symbol, fold, start))
+                jobs.append((bars.slice(window_start, stop), start - window_start, in_stop - window_start))
+
+        if jobs:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                flags = executor.map(
+                    _anomaly_job,
+                    [self.anomaly_detector_factory] * len(jobs),
+                    [self.anomaly_threshold_percentile] * len(jobs),
+                    *zip(*jobs)
+                )
+                for (symbol, fold, start), fold_flags in zip(keys, flags):
+                    self._fold_anomaly_masks[(symbol, fold)] = FoldAnomalyMask(start, fold_flags)
+        return [{symbol: self._fold_anomaly_masks[(symbol, fold)] for symbol in self.bars} for fold in folds]
+
+    def run(self, base_properties: BaseStrategyProps, grid: dict[str, list]) -> pd.DataFrame:
+        """
+        Run the walk-forward and return one row per fold: its windows, the best grid parameters,
+        their in-sample objective and their out-of-sample metrics. The out-of-sample trades of
+        all the folds are left in out_of_sample_trade_log.
+        """
+        folds = self.folds()
+        if not folds:
+            raise ValueError("The bars do not cover a single in-sample plus out-of-sample window.")
+        all_properties = ParameterSweep.expand_grid(base_properties, grid)
+        anomaly_masks = self._anomaly_masks(folds)
+        logger.info(
+            "Walk-forward started", extra={"fields": {"folds": len(folds), "combinations": len(all_properties)}}
+        )
+
+        with ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=_init_worker,
+            initargs=(self.bars, folds, anomaly_masks, self.volume, self.objective)
+        ) as executor:
+            chunksize = max(len(all_properties) // (4 * self.max_workers), 1)
+            scores = list(executor.map(_score_job, all_properties, chunksize=chunksize))
+
+        rows = []
+        self.out_of_sample_trade_log = []
+        for fold, (in_start, in_end, out_start, out_end) in enumerate(folds):
+            fold_scores = [(score[fold], index) for index, score in enumerate(scores) if score[fold] is not None]
+            row = {
+                "fold": fold,
+                "in_sample_start": pd.to_datetime(in_start, unit='s'),
+                "in_sample_end": pd.to_datetime(in_end, unit='s'),
+                "out_of_sample_start": pd.to_datetime(out_start, unit='s'),
+                "out_of_sample_end": pd.to_datetime(out_end, unit='s'),
+            }
+            if not fold_scores:
+                logger.warning("No parameter combination traded in-sample in fold %s", fold)
+                rows.append(row)
+                continue
+            # Ties go to the first combination of the grid
+            best_score, best_index = max(fold_scores, key=lambda item: (item[0], -item[1]))
+            best_properties = all_properties[best_index]
+            result = self.backtester.run(
+                best_properties, out_start, out_end,
+                anomaly_masks={
+                    symbol: mask.between(0, len(self.bars[symbol])) for symbol, mask in anomaly_masks[fold].items()
+                } if anomaly_masks[fold] is not None else None
+            )
+            self.out_of_sample_trade_log.extend(result.trade_log)
+            metrics = (
+                DataDisplayMT5(result.trade_log_df(), result.initial_balance).calculate_metrics()
+                if result.trade_log else {"Total Executed Trades": 0}
+            )
+            row.update({name: getattr(best_properties, name) for name in grid})
+            row["in_sample_objective"] = best_score
+            row.update({f"oos {name}": value for name, value in metrics.items()})
+            rows.append(row)
+            logger.info(
+                "Walk-forward fold done",
+                extra={"fields": {
+                    "fold": fold, "in_sample_objective": round(best_score, 2),
+                    "oos_trades": len(result.trade_log), **{name: getattr(best_properties, name) for name in grid}
+                }}
+            )
+        return pd.DataFrame(rows)
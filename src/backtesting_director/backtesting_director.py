@@ -1,5 +1,7 @@
 import queue
+import time
 from backtesting.data_source_mt5.data_source_mt5 import MT5BacktestDataSource
+from backtesting.event_queue_mt5.event_queue_mt5 import BacktestEventQueue
 from typing import Dict, Callable
 from events.events import (
     DataEvent,
@@ -8,24 +10,35 @@ from events.events import (
     OrderEvent,
     ExecutionEvent,
     PlacedPendingOrderEvent,
+    event_validation,
+    mark_trace,
 )
 from position_sizer.position_sizer import PositionSizer
 from strategy_manager.strategy_manager import StrategyManager
 from risk_manager.risk_manager import RiskManager
 from order_executor.order_executor import OrderExecutor
-from utils.utils import Utils
+from latency_tracker.latency_tracker import LatencyTracker
+from event_journal.event_journal import EventJournalWriter
+from logger.logger import get_logger, PER_BAR
+
+logger = get_logger("backtesting_director")
 
 
 class BacktestingDirector():
 
     def __init__(
         self,
-        events_queue: queue.Queue,
+        events_queue: queue.Queue | BacktestEventQueue,
         data_source: MT5BacktestDataSource,
         strategy_manager: StrategyManager,
         position_sizer: PositionSizer,
         risk_manager: RiskManager,
         order_executor: OrderExecutor,
+        validate_events: bool = False,
+        latency_tracker: LatencyTracker | None = None,
+        event_journal: EventJournalWriter | None = None,
+        record_equity: bool = False,
+        fast_forward: bool = False
     ) -> None:
         self.events_queue = events_queue
         self.DATA_SOURCE = data_source
@@ -34,6 +47,10 @@ class BacktestingDirector():
         self.RISK_MANAGER = risk_manager
         self.ORDER_EXECUTOR = order_executor
         self.contrinue_trading: bool = True
+        self.LATENCY_TRACKER = latency_tracker
+        self.EVENT_JOURNAL = event_journal
+        # Backtest producers build well-formed events, so the per-event type checks are skipped while run() lasts
+        self.validate_events = validate_events
         self.event_handler: Dict[str, Callable] = {
             "DATA": self._handle_data_event,
             "STRATEGY": self._handle_strategy_event,
@@ -42,47 +59,74 @@ class BacktestingDirector():
             "EXECUTION": self._handle_execution_event,
             "PENDING": self._handle_pending_order_event,
         }
+        # Exact-type lookup used by the run loop; event_handler stays as the fallback
+        self._handler_by_type: Dict[type, Callable] = {
+            DataEvent: self._handle_data_event,
+            StrategyEvent: self._handle_strategy_event,
+            SizingEvent: self._handle_sizing_event,
+            OrderEvent: self._handle_order_event,
+            ExecutionEvent: self._handle_execution_event,
+            PlacedPendingOrderEvent: self._handle_pending_order_event,
+        }
+        self.bars_processed: int = 0
+        self.run_stats: Dict[str, float] = {}
+        # Equity marked to market after every replayed bar, as (bar time, equity)
+        self.record_equity = record_equity
+        self.equity_curve: list[tuple[int, float]] = []
+        self.last_bar_time: int | None = None
+        # Fast-forward: bars on which the strategy declares it cannot signal are replayed without events
+        if fast_forward and not hasattr(data_source, "skip_to"):
+            raise ValueError(f"{type(data_source).__name__} does not support fast-forward.")
+        self.fast_forward = fast_forward
+        # Cross-sectional strategy manager: the bars of a bar time are replayed together, then flushed
+        self.cross_sectional = strategy_manager.cross_sectional
+        if fast_forward and self.cross_sectional:
+            raise ValueError("Fast-forward cannot be combined with a cross-sectional strategy manager.")
+        self.bars_skipped: int = 0
+        self.last_bar_symbol: str | None = None
+        # DATA events of the higher timeframes built from the replayed bars are not bars of their own
+        self.resampled_timeframes = frozenset(getattr(data_source, "resample_timeframes", ()))
+        if fast_forward and self.resampled_timeframes:
+            raise ValueError("Fast-forward cannot be combined with a data source that resamples its bars.")
 
     def _handle_data_event(self, event: DataEvent) -> None:
-        print(
-            f"{Utils.dateprint()} - Receiving DATA EVENT from: {event.symbol} "
-            f"- last close price: {event.data.close}"
+        if event.timeframe in self.resampled_timeframes:
+            self.STRATEGY_MANAGER.generate_strategy(event)
+            return
+        self.bars_processed += 1
+        self.last_bar_time = event.data.time
+        self.last_bar_symbol = event.symbol
+        logger.debug(
+            "Receiving DATA EVENT from: %s - last close price: %s", event.symbol, event.data.close,
+            extra=PER_BAR
         )
         self.STRATEGY_MANAGER.generate_strategy(event)
 
     def _handle_strategy_event(self, event: StrategyEvent) -> None:
-        print(
-            f"{Utils.dateprint()} - Receiving STRATEGY EVENT for: {event.strategy} from: {event.symbol} "
+        logger.info(
+            "Receiving STRATEGY EVENT",
+            extra={"fields": {"symbol": event.symbol, "strategy": event.strategy.value}}
         )
         self.POSITION_SIZER.size_strategy(event)
 
     def _handle_sizing_event(self, event: SizingEvent) -> None:
-        print(
-            f"{Utils.dateprint()} - Receiving SIZING EVENT with position size: {event.volume} "
-            f"for: {event.strategy} from: {event.symbol} "
+        logger.info(
+            "Receiving SIZING EVENT",
+            extra={"fields": {"symbol": event.symbol, "strategy": event.strategy.value, "volume": event.volume}}
         )
         self.RISK_MANAGER.assess_order(event)
 
     def _handle_order_event(self, event: OrderEvent) -> None:
-        print(
-            f"{Utils.dateprint()} - Receiving ORDER EVENT with position size: {event.volume} "
-            f"for: {event.strategy} from: {event.symbol} "
+        logger.info(
+            "Receiving ORDER EVENT",
+            extra={"fields": {"symbol": event.symbol, "strategy": event.strategy.value, "volume": event.volume}}
         )
         self.ORDER_EXECUTOR.execute_order(event)
 
     def _handle_execution_event(self, event: ExecutionEvent) -> None:
-        print(
-            f"{Utils.dateprint()} - Receiving EXECUTION EVENT for: {event.strategy} in {event.symbol} "
-            f"with volume: {event.volume} at price: {event.fill_price}  "
-        )
         self._process_execution_or_pending_events(event)
 
     def _handle_pending_order_event(self, event: PlacedPendingOrderEvent) -> None:
-        print(
-            f"{Utils.dateprint()} - Receiving PLACED PENDING ORDER EVENT for: {event.strategy} "
-            f"{event.target_order} "
-            f"in {event.symbol} with volume: {event.volume} at price: {event.target_price}  "
-        )
         self._process_execution_or_pending_events(event)
 
     def _process_execution_or_pending_events(self, event: ExecutionEvent | PlacedPendingOrderEvent) -> None:
@@ -90,49 +134,177 @@ class BacktestingDirector():
         Process execution or pending order events.
         This method is a placeholder for future implementation.
         """
+        if self.LATENCY_TRACKER is not None:
+            self.LATENCY_TRACKER.record(mark_trace(event.trace, "execution"))
+
         if isinstance(event, ExecutionEvent):
-            print(
-                (
-                    f"{event.symbol} - MARKET ORDER Execution event for {event.symbol} "
-                    f"with volume {event.volume} at price {event.fill_price}"
-                )
+            logger.info(
+                "MARKET ORDER execution",
+                extra={"fields": {
+                    "symbol": event.symbol, "strategy": event.strategy.value,
+                    "volume": event.volume, "price": event.fill_price, "time": event.fill_time
+                }}
             )
         elif isinstance(event, PlacedPendingOrderEvent):
-            print(
-                f"{event.symbol} - PENDING ORDER event for {event.symbol} "
-                f"with volume {event.volume} at price {event.target_price}"
+            logger.info(
+                "PENDING ORDER placed",
+                extra={"fields": {
+                    "symbol": event.symbol, "strategy": event.strategy.value, "order": event.target_order.value,
+                    "volume": event.volume, "price": event.target_price
+                }}
             )
         else:
-            print(f"Unknown event type: {type(event)}")
+            logger.warning("Unknown event type: %s", type(event))
 
     def _handle_none_event(self, event: None) -> None:
         """
         Handle None events. This method is a placeholder for future implementation.
         """
-        print("Received None event")
+        logger.warning("Received None event")
         self.contrinue_trading = False
 
+    def _fast_forward(self, symbol: str) -> None:
+        """After a bar of symbol, skip to the next bar of it that the strategy says could signal."""
+        self.last_bar_symbol = None
+        cursor = self.DATA_SOURCE.cursors[symbol]
+        index = self.STRATEGY_MANAGER.next_signal_index(symbol, self.DATA_SOURCE.bars[symbol], cursor)
+        if index is not None and index > cursor:
+            self.DATA_SOURCE.skip_to(symbol, index)
+
+    def _record_skipped_bars(self, symbol: str, start: int, stop: int) -> None:
+        """Bookkeeping of bars replayed without events, with the equity of a run of bars computed in one pass."""
+        bars = self.DATA_SOURCE.bars[symbol]
+        self.bars_processed += stop - start
+        self.bars_skipped += stop - start
+        self.last_bar_time = int(bars.time[stop - 1])
+        self.STRATEGY_MANAGER.skip_bars(symbol, bars.slice(start, stop))
+        if not self.record_equity:
+            return
+        if stop - start == 1:
+            self.equity_curve.append((self.last_bar_time, self.ORDER_EXECUTOR.mark_to_market()))
+        else:
+            equity = self.ORDER_EXECUTOR.mark_to_market_prices(symbol, bars.close[start:stop])
+            self.equity_curve.extend(zip(bars.time[start:stop].tolist(), equity.tolist()))
+
+    def _report_throughput(self, bars: int, events: int, elapsed: float, skipped: int = 0) -> None:
+        elapsed = max(elapsed, 1e-9)
+        self.run_stats = {
+            "bars": bars,
+            "bars_skipped": skipped,
+            "events": events,
+            "elapsed_seconds": elapsed,
+            "bars_per_second": bars / elapsed,
+            "events_per_second": events / elapsed,
+        }
+        logger.info(
+            "Backtest throughput",
+            extra={"fields": {
+                "bars": bars, "skipped": skipped, "events": events, "seconds": round(elapsed, 3),
+                "bars_per_sec": round(bars / elapsed, 1), "events_per_sec": round(events / elapsed, 1)
+            }}
+        )
+
+    def get_state(self) -> dict:
+        """
+        Everything needed to continue the backtest later from the current bar: replay position,
+        strategy state, account, open positions and trade log, and the recorded equity.
+        """
+        return {
+            "data_source": self.DATA_SOURCE.get_state(),
+            "strategy_manager": self.STRATEGY_MANAGER.get_state(),
+            "order_executor": self.ORDER_EXECUTOR.get_state(),
+            "bars_processed": self.bars_processed,
+            "last_bar_time": self.last_bar_time,
+            "equity_curve": list(self.equity_curve),
+        }
+
+    def restore_state(self, state: dict) -> None:
+        """Restore a state from get_state(); run() then replays only the bars after it."""
+        self.DATA_SOURCE.restore_state(state["data_source"])
+        self.STRATEGY_MANAGER.restore_state(state["strategy_manager"])
+        self.ORDER_EXECUTOR.restore_state(state["order_executor"])
+        self.bars_processed = state["bars_processed"]
+        self.last_bar_time = state["last_bar_time"]
+        self.equity_curve = list(state["equity_curve"])
+
     def _handle_unknown_event(self, event) -> None:
         """
         Handle unknown events. This method is a placeholder for future implementation.
         """
-        print(f"Unknown event type: {type(event)}")
+        logger.warning("Unknown event type: %s", type(event))
         self.contrinue_trading = False
 
     def run(self) -> None:
         """
         Run loop adaptado para backtesting.
         Recorre datos históricos paso a paso hasta agotarlos.
+        Para máxima velocidad, crear los componentes con un BacktestEventQueue en lugar de queue.Queue:
+        el orden de los eventos es el mismo.
+        Con fast_forward, las barras en las que la estrategia no puede generar señal se saltan sin
+        eventos (no llegan al journal); el equity de esas barras se calcula en bloque.
+        Con un StrategyManager cross_sectional, las barras con la misma hora se emiten juntas y el
+        equity se registra una vez por hora de barra.
         """
-        while self.DATA_SOURCE.has_data():
-            self.DATA_SOURCE.check_for_new_data()
-
-            while not self.events_queue.empty():
-                event = self.events_queue.get()
-                if event is not None:
-                    handler = self.event_handler.get(event.event_type, self._handle_unknown_event)
-                    handler(event)
-                else:
-                    self._handle_none_event(event)
-
-        print("Backtesting finalizado.")
+        with event_validation(self.validate_events):
+            try:
+                self._run()
+            finally:
+                self.STRATEGY_MANAGER.shutdown()
+
+    def _run(self) -> None:
+        data_source = self.DATA_SOURCE
+        events_queue = self.events_queue
+        handler_by_type = self._handler_by_type
+        journal = self.EVENT_JOURNAL
+        equity_curve = self.equity_curve if self.record_equity else None
+        fast_forward = self.fast_forward
+        cross_sectional = self.cross_sectional
+        events_processed = 0
+        bars_before = self.bars_processed
+        skipped_before = self.bars_skipped
+        start = time.perf_counter()
+
+        while data_source.has_data():
+            if fast_forward:
+                skipped = data_source.skip_quiet_bars()
+                if skipped is not None:
+                    self._record_skipped_bars(*skipped)
+                    continue
+
+            if cross_sectional:
+                data_source.check_for_new_bar_time()
+            else:
+                data_source.check_for_new_data()
+
+            while True:
+                while not events_queue.empty():
+                    event = events_queue.get()
+                    if event is not None:
+                        events_processed += 1
+                        if journal is not None:
+                            journal.write(event)
+                        handler = handler_by_type.get(type(event))
+                        if handler is None:
+                            handler = self.event_handler.get(event.event_type, self._handle_unknown_event)
+                        handler(event)
+                    else:
+                        self._handle_none_event(event)
+                # Cross-sectional: the signals of the bar time are produced once all its bars are handled
+                if not (cross_sectional and self.STRATEGY_MANAGER.flush_cross_section()):
+                    break
+
+            if equity_curve is not None:
+                equity_curve.append((self.last_bar_time, self.ORDER_EXECUTOR.mark_to_market()))
+
+            if fast_forward and self.last_bar_symbol is not None:
+                self._fast_forward(self.last_bar_symbol)
+
+        self._report_throughput(
+            self.bars_processed - bars_before, events_processed, time.perf_counter() - start,
+            self.bars_skipped - skipped_before
+        )
+        logger.info("Backtesting finalizado.")
+        if self.EVENT_JOURNAL is not None:
+            self.EVENT_JOURNAL.flush()
+        if self.LATENCY_TRACKER is not None:
+            logger.info("Bar-to-fill latency per stage:\n%s", self.LATENCY_TRACKER.report())
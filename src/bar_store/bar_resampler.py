@@ -0,0 +1,104 @@
+import numpy as np
+from bar_store.bar_store import Bar, BarStore
+from utils.utils import Utils
+
+
+def resample_period(timeframe: str, base_timeframe: str) -> int:
+    """Length in seconds of a bar of timeframe, checked to be a whole number of base_timeframe bars."""
+    period = Utils.timeframe_to_seconds(timeframe)
+    base_seconds = Utils.timeframe_to_seconds(base_timeframe)
+    # Weekly bars start on Monday, not on a multiple of their length since the epoch
+    if timeframe.upper() == 'W1' or period <= base_seconds or period % base_seconds != 0:
+        raise ValueError(f"{timeframe} bars cannot be built from {base_timeframe} bars.")
+    return period
+
+
+def resample_bars(bars: BarStore, timeframe: str, base_timeframe: str) -> tuple[BarStore, np.ndarray]:
+    """
+    Closed bars of timeframe built from a whole history of base_timeframe bars in one pass,
+    the same bars BarResampler builds one base bar at a time. Also returns, for each of them,
+    the number of base bars after which it is closed: its last base bar when that one ends the
+    period, else the next base bar (after a gap). The last bar is left out until it is closed.
+    """
+    period = resample_period(timeframe, base_timeframe)
+    base_seconds = Utils.timeframe_to_seconds(base_timeframe)
+    if len(bars) == 0:
+        return BarStore.empty(bars.close.dtype), np.empty(0, dtype=np.int64)
+
+    starts = bars.time - bars.time % period
+    first = np.flatnonzero(np.r_[True, starts[1:] != starts[:-1]])
+    last = np.r_[first[1:] - 1, len(bars) - 1]
+    complete = bars.time[last] + base_seconds >= starts[first] + period
+    closed_after = np.where(complete, last + 1, last + 2)
+    keep = closed_after <= len(bars)
+    resampled = BarStore(
+        time=starts[first][keep],
+        open=bars.open[first][keep],
+        high=np.maximum.reduceat(bars.high, first)[keep],
+        low=np.minimum.reduceat(bars.low, first)[keep],
+        close=bars.close[last][keep],
+        tickvol=np.add.reduceat(bars.tickvol, first)[keep],
+        vol=np.add.reduceat(bars.vol, first)[keep],
+        spread=bars.spread[last][keep],
+    )
+    return resampled, closed_after[keep].astype(np.int64)
+
+
+class BarResampler:
+    """
+    Builds the bars of higher timeframes (e.g. M5, M15, H1, H4, D1 from M1) incrementally
+    from the closed bars of a base timeframe, so they need no request of their own to the
+    terminal. A bar covers the period of its length since the epoch that contains its open
+    time; it takes the open of its first base bar, the highest high, the lowest low, the close
+    and spread of its last base bar and the summed volumes.
+
+    update() returns the bars closed by a new base bar: the current one when the base bar ends
+    its period, and the previous one when the base bar starts a later period (after a gap).
+    """
+
+    def __init__(self, base_timeframe: str, timeframes: list[str]):
+        self.base_timeframe = base_timeframe.upper()
+        self.base_seconds = Utils.timeframe_to_seconds(self.base_timeframe)
+        self.timeframes = [timeframe.upper() for timeframe in timeframes]
+        self.periods = {timeframe: resample_period(timeframe, self.base_timeframe) for timeframe in self.timeframes}
+        # Bar in progress per (symbol, timeframe): [time, open, high, low, close, tickvol, vol, spread]
+        self._partial: dict[tuple[str, str], list] = {}
+        self._last_times: dict[str, int] = {}
+
+    def update(self, symbol: str, bar: Bar) -> list[tuple[str, Bar]]:
+        """Add a closed base bar of symbol; returns the (timeframe, bar) closed by it. Bars already seen are ignored."""
+        last_time = self._last_times.get(symbol)
+        if last_time is not None and bar.time <= last_time:
+            return []
+        self._last_times[symbol] = bar.time
+
+        closed = []
+        bar_end = bar.time + self.base_seconds
+        for timeframe in self.timeframes:
+            period = self.periods[timeframe]
+            start = bar.time - bar.time % period
+            key = (symbol, timeframe)
+            partial = self._partial.get(key)
+            if partial is not None and partial[0] != start:
+                closed.append((timeframe, Bar(*partial)))
+                partial = None
+            if partial is None:
+                partial = [start, bar.open, bar.high, bar.low, bar.close, bar.tickvol, bar.vol, bar.spread]
+                self._partial[key] = partial
+            else:
+                partial[2] = max(partial[2], bar.high)
+                partial[3] = min(partial[3], bar.low)
+                partial[4] = bar.close
+                partial[5] += bar.tickvol
+                partial[6] += bar.vol
+                partial[7] = bar.spread
+            if bar_end >= start + period:
+                closed.append((timeframe, Bar(*self._partial.pop(key))))
+        return closed
+
+    def update_bars(self, symbol: str, bars: BarStore) -> list[tuple[str, Bar]]:
+        """update() for a run of consecutive base bars, e.g. several bars received after a reconnection."""
+        closed = []
+        for index in range(len(bars)):
+            closed.extend(self.update(symbol, bars.bar(index)))
+        return closed
@@ -0,0 +1,78 @@
+import numpy as np
+from bar_store.bar_store import Bar, BarStore
+
+
+class BarRingBuffer:
+    """
+    Fixed-capacity circular buffer with the most recent closed bars of one symbol/timeframe.
+    Every bar is written twice (at position p and p + capacity) so that the latest n bars
+    are always a contiguous slice: latest() returns a zero-copy BarStore view.
+    """
+
+    def __init__(self, capacity: int, price_dtype=np.float64):
+        if capacity <= 0:
+            raise ValueError(f"Ring buffer capacity must be greater than 0, got {capacity}.")
+        self.capacity = capacity
+        double_capacity = 2 * capacity
+        self._columns = {
+            'time': np.zeros(double_capacity, dtype=np.int64),
+            'open': np.zeros(double_capacity, dtype=price_dtype),
+            'high': np.zeros(double_capacity, dtype=price_dtype),
+            'low': np.zeros(double_capacity, dtype=price_dtype),
+            'close': np.zeros(double_capacity, dtype=price_dtype),
+            'tickvol': np.zeros(double_capacity, dtype=np.int64),
+            'vol': np.zeros(double_capacity, dtype=np.int64),
+            'spread': np.zeros(double_capacity, dtype=np.int32),
+        }
+        self._head = 0  # Next write position in [0, capacity)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def last_time(self) -> int | None:
+        """Open time (epoch seconds) of the newest bar, or None if the buffer is empty."""
+        if self._size == 0:
+            return None
+        return int(self._columns['time'][self._head + self.capacity - 1])
+
+    def append(self, bars: BarStore) -> int:
+        """
+        Append the bars that are newer than the last buffered bar, keeping the newest capacity of
+        them. Returns how many were added.
+        """
+        last_time = self.last_time
+        if last_time is not None:
+            bars = bars.slice(int(np.searchsorted(bars.time, last_time, side='right')), len(bars))
+        count = len(bars)
+        if count == 0:
+            return 0
+        if count > self.capacity:
+            bars = bars.slice(count - self.capacity, count)
+
+        positions = (self._head + np.arange(len(bars))) % self.capacity
+        for name, column in self._columns.items():
+            values = getattr(bars, name)
+            column[positions] = values
+            column[positions + self.capacity] = values
+
+        self._head = int((self._head + len(bars)) % self.capacity)
+        self._size = min(self.capacity, self._size + len(bars))
+        return len(bars)
+
+    def latest(self, num_bars: int) -> BarStore:
+        """Return a view of the newest num_bars bars (fewer if the buffer holds less), oldest first."""
+        num_bars = min(num_bars, self._size)
+        stop = self._head + self.capacity
+        start = stop - num_bars
+        return BarStore(**{name: column[start:stop] for name, column in self._columns.items()})
+
+    def last_bar(self) -> Bar:
+        if self._size == 0:
+            raise IndexError("The ring buffer is empty.")
+        return self.latest(1).bar(0)
+
+    def to_bar_store(self) -> BarStore:
+        return self.latest(self._size)
+
@@ -0,0 +1,207 @@
+import numpy as np
+import pandas as pd
+
+
+BAR_COLUMNS = ('open', 'high', 'low', 'close', 'tickvol', 'vol', 'spread')
+
+
+class Bar:
+    """
+    Lightweight, read-only view of a single bar.
+    Exposes the same attribute access used on the pd.Series bars (bar.close, bar.name,
+    bar['close'], bar.get('vol', 0)) without building a pandas object per bar.
+    """
+    __slots__ = ('time', 'open', 'high', 'low', 'close', 'tickvol', 'vol', 'spread')
+
+    def __init__(
+        self,
+        time: int,
+        open: float,
+        high: float,
+        low: float,
+        close: float,
+        tickvol: int,
+        vol: int,
+        spread: int
+    ) -> None:
+        self.time = time
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.tickvol = tickvol
+        self.vol = vol
+        self.spread = spread
+
+    @property
+    def name(self) -> pd.Timestamp:
+        """Bar open time, mirroring the index label of a pd.Series bar."""
+        return pd.Timestamp(self.time, unit='s')
+
+    def __getitem__(self, key: str):
+        if key not in BAR_COLUMNS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default=None):
+        return getattr(self, key) if key in BAR_COLUMNS else default
+
+    def __reduce__(self):
+        # Positional form keeps pickled bars (e.g. in event journals) small
+        return Bar, (self.time, self.open, self.high, self.low, self.close, self.tickvol, self.vol, self.spread)
+
+    def __repr__(self) -> str:
+        return (
+            f"Bar(time={self.name}, open={self.open}, high={self.high}, low={self.low}, "
+            f"close={self.close}, tickvol={self.tickvol}, vol={self.vol}, spread={self.spread})"
+        )
+
+
+class BarStore:
+    """
+    Contiguous, column-oriented storage for a sequence of bars.
+    Times are stored as int64 epoch seconds, prices as float64 (or float32 to halve memory),
+    volumes as int64 and spread as int32. Slicing returns views over the same arrays.
+    """
+
+    def __init__(
+        self,
+        time: np.ndarray,
+        open: np.ndarray,
+        high: np.ndarray,
+        low: np.ndarray,
+        close: np.ndarray,
+        tickvol: np.ndarray,
+        vol: np.ndarray,
+        spread: np.ndarray
+    ) -> None:
+        self.time = time
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.tickvol = tickvol
+        self.vol = vol
+        self.spread = spread
+
+    @classmethod
+    def from_rates(cls, rates: np.ndarray, price_dtype=np.float64) -> "BarStore":
+        """Build a store from the structured array returned by mt5.copy_rates_*."""
+        names = rates.dtype.names
+        length = len(rates)
+
+        def _column(field: str, dtype) -> np.ndarray:
+            if field in names:
+                return np.ascontiguousarray(rates[field], dtype=dtype)
+            return np.zeros(length, dtype=dtype)
+
+        return cls(
+            time=_column('time', np.int64),
+            open=_column('open', price_dtype),
+            high=_column('high', price_dtype),
+            low=_column('low', price_dtype),
+            close=_column('close', price_dtype),
+            tickvol=_column('tick_volume', np.int64),
+            vol=_column('real_volume', np.int64),
+            spread=_column('spread', np.int32),
+        )
+
+    @classmethod
+    def from_bars(cls, bars: list[Bar], price_dtype=np.float64) -> "BarStore":
+        """Build a store from a sequence of Bar records (e.g. the bars of recorded data events)."""
+        return cls(
+            time=np.fromiter((bar.time for bar in bars), dtype=np.int64, count=len(bars)),
+            open=np.fromiter((bar.open for bar in bars), dtype=price_dtype, count=len(bars)),
+            high=np.fromiter((bar.high for bar in bars), dtype=price_dtype, count=len(bars)),
+            low=np.fromiter((bar.low for bar in bars), dtype=price_dtype, count=len(bars)),
+            close=np.fromiter((bar.close for bar in bars), dtype=price_dtype, count=len(bars)),
+            tickvol=np.fromiter((bar.tickvol for bar in bars), dtype=np.int64, count=len(bars)),
+            vol=np.fromiter((bar.vol for bar in bars), dtype=np.int64, count=len(bars)),
+            spread=np.fromiter((bar.spread for bar in bars), dtype=np.int32, count=len(bars)),
+        )
+
+    @classmethod
+    def empty(cls, price_dtype=np.float64) -> "BarStore":
+        return cls(
+            time=np.empty(0, dtype=np.int64),
+            open=np.empty(0, dtype=price_dtype),
+            high=np.empty(0, dtype=price_dtype),
+            low=np.empty(0, dtype=price_dtype),
+            close=np.empty(0, dtype=price_dtype),
+            tickvol=np.empty(0, dtype=np.int64),
+            vol=np.empty(0, dtype=np.int64),
+            spread=np.empty(0, dtype=np.int32),
+        )
+
+    @classmethod
+    def concatenate(cls, stores: list["BarStore"]) -> "BarStore":
+        """
+        Merge several stores into one sorted by time. When the same bar time appears
+        more than once, the occurrence from the last store in the list wins.
+        """
+        columns = ('time',) + BAR_COLUMNS
+        merged = {col: np.concatenate([getattr(store, col) for store in stores]) for col in columns}
+        # Reverse so that np.unique keeps the first occurrence of the latest store
+        reversed_time = merged['time'][::-1]
+        _, first_positions = np.unique(reversed_time, return_index=True)
+        keep = len(reversed_time) - 1 - first_positions
+        return cls(**{col: np.ascontiguousarray(merged[col][keep]) for col in columns})
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+    def bar(self, index: int) -> Bar:
+        """Return the bar at the given position as a lightweight Bar record."""
+        return Bar(
+            int(self.time[index]),
+            float(self.open[index]),
+            float(self.high[index]),
+            float(self.low[index]),
+            float(self.close[index]),
+            int(self.tickvol[index]),
+            int(self.vol[index]),
+            int(self.spread[index]),
+        )
+
+    def slice(self, start: int, stop: int) -> "BarStore":
+        """Return a zero-copy view of the bars in [start, stop)."""
+        return BarStore(
+            time=self.time[start:stop],
+            open=self.open[start:stop],
+            high=self.high[start:stop],
+            low=self.low[start:stop],
+            close=self.close[start:stop],
+            tickvol=self.tickvol[start:stop],
+            vol=self.vol[start:stop],
+            spread=self.spread[start:stop],
+        )
+
+    def between(self, start_time: int, end_time: int) -> "BarStore":
+        """Return a view of the bars whose open time lies in [start_time, end_time] (epoch seconds)."""
+        start = int(np.searchsorted(self.time, start_time, side='left'))
+        stop = int(np.searchsorted(self.time, end_time, side='right'))
+        return self.slice(start, stop)
+
+    def as_dtype(self, price_dtype) -> "BarStore":
+        """Return the store with prices cast to price_dtype (no copy when it already matches)."""
+        return BarStore(
+            time=self.time,
+            open=self.open.astype(price_dtype, copy=False),
+            high=self.high.astype(price_dtype, copy=False),
+            low=self.low.astype(price_dtype, copy=False),
+            close=self.close.astype(price_dtype, copy=False),
+            tickvol=self.tickvol,
+            vol=self.vol,
+            spread=self.spread,
+        )
+
+    def column(self, name: str) -> np.ndarray:
+        if name != 'time' and name not in BAR_COLUMNS:
+            raise KeyError(name)
+        return getattr(self, name)
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """Materialize the bars as the DataFrame layout used across the framework."""
+        df = pd.DataFrame({col: getattr(self, col) for col in BAR_COLUMNS})
+        df.index = pd.DatetimeIndex(pd.to_datetime(self.time, unit='s'), name='time')
+        return df
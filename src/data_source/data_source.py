@@ -1,22 +1,55 @@
 import MetaTrader5 as mt5
 import pandas as pd
-from typing import Dict
-from datetime import datetime
-from events.events import DataEvent
+from typing import Dict, Tuple
+from bar_store.bar_store import BarStore
+from bar_store.bar_resampler import BarResampler
+from bar_store.bar_ring_buffer import BarRingBuffer
+from events.events import DataEvent, EventTrace
+from utils.utils import Utils
+from logger.logger import get_logger, PER_BAR
 from queue import Queue
 
+logger = get_logger("data_source")
+
 
 class DataSource():
     """Data source class to manage data loading and preprocessing."""
 
-    def __init__(self, events_queue: Queue, symbol_list: list, timeframe: str):
+    def __init__(
+        self,
+        events_queue: Queue,
+        symbol_list: list,
+        timeframe: str,
+        history_capacity: int = 500,
+        latency_tracing: bool = False,
+        resample_timeframes: list[str] | None = None
+    ):
 
         self.events_queue: Queue = events_queue
 
         self.symbols: list = symbol_list
         self.timeframe: str = timeframe
+        self.history_capacity: int = history_capacity
+        # When enabled, data events carry an EventTrace that the downstream components extend
+        self.latency_tracing: bool = latency_tracing
+
+        # Open time (epoch seconds) of the last bar notified for each symbol
+        self.last_bar_time: Dict[str, int] = {symbol: -1 for symbol in self.symbols}
+
+        # Higher timeframes built from the bars of the base timeframe as they close, with a DATA
+        # event of their own, instead of being polled from the terminal
+        self.resampler = BarResampler(timeframe, resample_timeframes) if resample_timeframes else None
+        self.resample_timeframes: list = self.resampler.timeframes if self.resampler is not None else []
 
-        self.last_bar_datetime: Dict[str, datetime] = {symbol: datetime.min for symbol in self.symbols}
+        # Closed bar history of the base and resample timeframes, kept in memory so strategies
+        # can read it without a round trip to the terminal
+        self.bar_history: Dict[Tuple[str, str], BarRingBuffer] = {}
+        for symbol in self.symbols:
+            self._warm_up_bar_history(symbol)
+            for resample_timeframe in self.resample_timeframes:
+                self._warm_up_bar_history(symbol, resample_timeframe)
+            if self.resampler is not None:
+                self._seed_resampler(symbol)
 
     def _map_timeframes(self, timeframe: str) -> int:
         """Map the string representation of timeframes to MetaTrader5
@@ -40,6 +73,60 @@ class DataSource():
                 f"Valid options are: {list(timeframe_mapping.keys())}"
             )
 
+    def _fetch_closed_rates(self, symbol: str, timeframe: str, num_bars: int) -> BarStore:
+        """Fetch the last num_bars closed bars from MT5 as a BarStore (empty if none are returned)."""
+        rates = mt5.copy_rates_from_pos(symbol, self._map_timeframes(timeframe), 1, num_bars)
+        if rates is None or len(rates) == 0:
+            return BarStore.empty()
+        return BarStore.from_rates(rates)
+
+    def _warm_up_bar_history(self, symbol: str, timeframe: str | None = None) -> None:
+        """Fill the bar history of a symbol (base timeframe by default) with a single bulk request."""
+        timeframe = timeframe or self.timeframe
+        buffer = BarRingBuffer(self.history_capacity)
+        bars = self._fetch_closed_rates(symbol, timeframe, self.history_capacity)
+        if len(bars) == 0:
+            logger.warning(
+                "Could not warm up the %s bar history for symbol: %s. MT5 Error: %s",
+                timeframe, symbol, mt5.last_error()
+            )
+        buffer.append(bars)
+        self.bar_history[(symbol, timeframe)] = buffer
+
+    def _seed_resampler(self, symbol: str) -> None:
+        """
+        Feed the base bar history to the resampler, so the bars in progress of the resample
+        timeframes include the base bars closed before the start. Bars it closes that are not
+        newer than the warmed-up history of their timeframe are dropped by the ring buffer.
+        """
+        base_bars = self.bar_history[(symbol, self.timeframe)].to_bar_store()
+        self._append_resampled(symbol, self.resampler.update_bars(symbol, base_bars))
+
+    def _append_resampled(self, symbol: str, closed: list) -> None:
+        for timeframe, bar in closed:
+            self.bar_history[(symbol, timeframe)].append(BarStore.from_bars([bar]))
+
+    def _update_bar_history(self, symbol: str) -> tuple[BarRingBuffer, int]:
+        """
+        Append the bars closed since the last update to the bar history of a symbol, and return
+        it with the number of bars added. Usually this costs a single one-bar request; a
+        multi-bar request is only made to backfill after a gap (e.g. after a reconnection).
+        """
+        buffer = self.bar_history[(symbol, self.timeframe)]
+        latest = self._fetch_closed_rates(symbol, self.timeframe, 1)
+        if len(latest) == 0:
+            raise ValueError(f"No data received for symbol: {symbol}, timeframe: {self.timeframe}.")
+
+        last_time = buffer.last_time
+        latest_time = int(latest.time[-1])
+        if last_time is not None and latest_time > last_time:
+            missing_bars = (latest_time - last_time) // Utils.timeframe_to_seconds(self.timeframe)
+            if missing_bars > 1:
+                latest = self._fetch_closed_rates(symbol, self.timeframe, min(missing_bars, buffer.capacity))
+
+        added = buffer.append(latest)
+        return buffer, added
+
     def get_latest_closed_bar(self, symbol: str, timeframe: str) -> pd.Series:
         """Get the latest closed bar for a given symbol and timeframe.
         Args:
@@ -88,8 +175,22 @@ class DataSource():
             else:
                 return bars_df.iloc[-1]  # Return the last row as a Series
 
+    def get_latest_closed_bars_array(self, symbol: str, timeframe: str, num_bars: int = 1) -> BarStore:
+        """
+        Get the latest closed bars as a BarStore. Served from the in-memory bar history
+        when it holds enough bars, otherwise fetched from MT5.
+        """
+        buffer = self.bar_history.get((symbol, timeframe))
+        if buffer is not None and len(buffer) >= num_bars:
+            return buffer.latest(num_bars)
+        return self._fetch_closed_rates(symbol, timeframe, num_bars if num_bars > 0 else 1)
+
     def get_latest_closed_bars(self, symbol: str, timeframe: str, num_bars: int = 1) -> pd.DataFrame:
 
+        buffer = self.bar_history.get((symbol, timeframe))
+        if buffer is not None and len(buffer) >= num_bars:
+            return buffer.latest(num_bars).to_dataframe()
+
         tf = self._map_timeframes(timeframe)
         from_position = 1
         bars_count = num_bars if num_bars > 0 else 1
@@ -155,19 +256,36 @@ class DataSource():
 
         for symbol in self.symbols:
             try:
-                latest_bar = self.get_latest_closed_bar(symbol, self.timeframe)
+                trace = EventTrace.start("poll") if self.latency_tracing else None
+                buffer, added = self._update_bar_history(symbol)
 
-                if latest_bar is None:
-                    print(f"No data received for symbol: {symbol}.")
+                if len(buffer) == 0:
+                    logger.warning("No data received for symbol: %s.", symbol)
                     continue
 
-                if not latest_bar.empty and latest_bar.name > self.last_bar_datetime[symbol]:
-                    print(f"New data available for symbol: {symbol}.")
-                    self.last_bar_datetime[symbol] = latest_bar.name
+                if buffer.last_time > self.last_bar_time[symbol]:
+                    logger.debug("New data available for symbol: %s.", symbol, extra=PER_BAR)
+                    self.last_bar_time[symbol] = buffer.last_time
 
-                    data_event = DataEvent(symbol=symbol, data=latest_bar)
+                    data_event = DataEvent(
+                        symbol=symbol,
+                        data=buffer.last_bar(),
+                        timeframe=self.timeframe,
+                        trace=trace.mark("data") if trace else None
+                    )
 
                     self.events_queue.put(data_event)
 
+                    if self.resampler is not None:
+                        closed = self.resampler.update_bars(symbol, buffer.latest(added))
+                        self._append_resampled(symbol, closed)
+                        for timeframe, bar in closed:
+                            self.events_queue.put(DataEvent(
+                                symbol=symbol,
+                                data=bar,
+                                timeframe=timeframe,
+                                trace=trace.mark("data") if trace else None
+                            ))
+
             except Exception as e:
-                print(f"Error checking for new data for symbol: {symbol}. Error: {str(e)}")
+                logger.error("Error checking for new data for symbol: %s. Error: %s", symbol, e)
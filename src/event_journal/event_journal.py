@@ -0,0 +1,118 @@
+import os
+import pickle
+import struct
+from dataclasses import dataclass
+from typing import Iterator
+from bar_store.bar_store import BarStore
+from events.events import BaseEvent
+
+
+JOURNAL_MAGIC = b"EVJ1"
+_LENGTH = struct.Struct("<I")
+
+
+def _complete_length(path: str) -> int:
+    """Size of the journal up to its last complete record, 0 if not even the magic was written."""
+    size = os.path.getsize(path)
+    with open(path, "rb") as journal:
+        magic = journal.read(len(JOURNAL_MAGIC))
+        if len(magic) < len(JOURNAL_MAGIC):
+            return 0
+        if magic != JOURNAL_MAGIC:
+            raise ValueError(f"{path} is not an event journal.")
+        end = journal.tell()
+        while True:
+            header = journal.read(_LENGTH.size)
+            if len(header) < _LENGTH.size:
+                return end
+            (length,) = _LENGTH.unpack(header)
+            if end + _LENGTH.size + length > size:
+                return end
+            end = journal.seek(length, os.SEEK_CUR)
+
+
+@dataclass(frozen=True, slots=True)
+class BarHistoryRecord:
+    """Closed bars a data source already held when the session started (its warm-up history)."""
+    symbol: str
+    timeframe: str
+    bars: BarStore
+
+
+class EventJournalWriter:
+    """
+    Append-only binary journal of the events dispatched by a director.
+    Each record is a little-endian uint32 length followed by the pickled event, so
+    writing is a single buffered append and the file can be read back sequentially.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        end = _complete_length(path) if os.path.exists(path) else 0
+        self._file = open(path, "ab")
+        # Drop a record left partly written by an interrupted session, so new records stay readable
+        self._file.truncate(end)
+        if end == 0:
+            self._file.write(JOURNAL_MAGIC)
+
+    def _write_record(self, record) -> None:
+        payload = pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)
+        self._file.write(_LENGTH.pack(len(payload)))
+        self._file.write(payload)
+
+    def write(self, event: BaseEvent) -> None:
+        self._write_record(event)
+
+    def write_history(self, symbol: str, timeframe: str, bars: BarStore) -> None:
+        self._write_record(BarHistoryRecord(symbol, timeframe, bars))
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self) -> "EventJournalWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class EventJournalReader:
+    """
+    Sequential reader of an event journal. A record truncated by an interrupted write
+    (e.g. the live session crashed) ends the iteration instead of raising.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def records(self) -> Iterator[BaseEvent | BarHistoryRecord]:
+        with open(self.path, "rb") as journal:
+            if journal.read(len(JOURNAL_MAGIC)) != JOURNAL_MAGIC:
+                raise ValueError(f"{self.path} is not an event journal.")
+            while True:
+                header = journal.read(_LENGTH.size)
+                if len(header) < _LENGTH.size:
+                    return
+                (length,) = _LENGTH.unpack(header)
+                payload = journal.read(length)
+                if len(payload) < length:
+                    return
+                yield pickle.loads(payload)
+
+    def events(self, event_type: str | None = None) -> Iterator[BaseEvent]:
+        """Iterate over the journaled events, optionally only those of one event type."""
+        for record in self.records():
+            if isinstance(record, BarHistoryRecord):
+                continue
+            if event_type is None or record.event_type == event_type:
+                yield record
+
+    def bar_histories(self) -> list[BarHistoryRecord]:
+        return [record for record in self.records() if isinstance(record, BarHistoryRecord)]
@@ -1,7 +1,12 @@
+import time
+from contextlib import contextmanager
 from enum import Enum
-from pydantic import BaseModel
+from dataclasses import dataclass, fields
+import numpy as np
 import pandas as pd
 from datetime import datetime
+from typing import Iterator
+from bar_store.bar_store import Bar
 
 
 class EventType(str, Enum):
@@ -24,19 +29,168 @@ class OrderType(str, Enum):
     STOP = "STOP"
 
 
-class BaseEvent(BaseModel):
-    event_type: EventType
+class EventTrace:
+    """
+    Monotonic timestamps (nanoseconds) of the pipeline stages an event chain has gone through,
+    e.g. data -> strategy -> sizing -> risk -> executor -> order_send -> deal_confirm.
+    Traces are immutable: each component appends its stage to a copy and passes it on.
+    """
+
+    __slots__ = ('stages', 'timestamps')
+
+    def __init__(self, stages: tuple[str, ...] = (), timestamps: tuple[int, ...] = ()):
+        self.stages = stages
+        self.timestamps = timestamps
+
+    @classmethod
+    def start(cls, stage: str, timestamp_ns: int | None = None) -> 'EventTrace':
+        return cls((stage,), (time.monotonic_ns() if timestamp_ns is None else timestamp_ns,))
+
+    def mark(self, stage: str, timestamp_ns: int | None = None) -> 'EventTrace':
+        """Return a copy of the trace with the stage appended."""
+        timestamp_ns = time.monotonic_ns() if timestamp_ns is None else timestamp_ns
+        return EventTrace(self.stages + (stage,), self.timestamps + (timestamp_ns,))
+
+    def durations(self) -> list[tuple[str, int]]:
+        """Elapsed nanoseconds between consecutive stages, named 'previous->stage'."""
+        return [
+            (f"{self.stages[i - 1]}->{self.stages[i]}", self.timestamps[i] - self.timestamps[i - 1])
+            for i in range(1, len(self.stages))
+        ]
+
+    def total(self) -> int:
+        return self.timestamps[-1] - self.timestamps[0] if self.timestamps else 0
+
+    def __repr__(self) -> str:
+        return f"EventTrace({' -> '.join(self.stages)})"
+
+
+def mark_trace(trace: EventTrace | None, stage: str) -> EventTrace | None:
+    """Append a stage to a trace, or do nothing when latency tracing is disabled (trace is None)."""
+    return trace.mark(stage) if trace is not None else None
+
+
+# Strict validation is meant for live trading. Backtests and benchmarks can turn it off to skip
+# the per-event type checks once their producers are known to build well-formed events.
+_STRICT_VALIDATION: bool = True
+
+
+def set_event_validation(strict: bool) -> None:
+    """Turn strict validation of event fields on (live trading) or off (backtests, benchmarks)."""
+    global _STRICT_VALIDATION
+    _STRICT_VALIDATION = strict
+
+
+def is_event_validation_strict() -> bool:
+    return _STRICT_VALIDATION
+
 
-    class Config:
-        arbitrary_types_allowed = True
+@contextmanager
+def event_validation(strict: bool) -> Iterator[None]:
+    """
+    Set the validation for a block, e.g. the run loop of a director, and restore the previous
+    setting after it, so a backtest run does not turn it off for a live director in the same process.
+    """
+    previous = _STRICT_VALIDATION
+    set_event_validation(strict)
+    try:
+        yield
+    finally:
+        set_event_validation(previous)
 
 
+def _to_enum(enum_type: type[Enum]):
+    def coerce(value):
+        return value if isinstance(value, enum_type) else enum_type(value)
+    return coerce
+
+
+def _to_str(value):
+    if not isinstance(value, str):
+        raise TypeError(f"expected str, got {type(value).__name__}")
+    return value
+
+
+def _to_int(value):
+    if isinstance(value, bool) or not isinstance(value, (int, np.integer)):
+        raise TypeError(f"expected int, got {type(value).__name__}")
+    return int(value)
+
+
+def _to_optional_str(value):
+    return None if value is None else _to_str(value)
+
+
+def _to_float(value):
+    if isinstance(value, bool) or not isinstance(value, (int, float, np.integer, np.floating)):
+        raise TypeError(f"expected float, got {type(value).__name__}")
+    return float(value)
+
+
+def _to_datetime(value):
+    if not isinstance(value, datetime):
+        raise TypeError(f"expected datetime, got {type(value).__name__}")
+    return value
+
+
+def _to_bar(value):
+    if not isinstance(value, (pd.Series, Bar)):
+        raise TypeError(f"expected pd.Series or Bar, got {type(value).__name__}")
+    return value
+
+
+_FIELD_VALIDATORS = {
+    'event_type': _to_enum(EventType),
+    'symbol': _to_str,
+    'data': _to_bar,
+    'timeframe': _to_optional_str,
+    'strategy': _to_enum(StrategyType),
+    'target_order': _to_enum(OrderType),
+    'target_price': _to_float,
+    'magic_number': _to_int,
+    'stop_loss': _to_float,
+    'take_profit': _to_float,
+    'volume': _to_float,
+    'fill_price': _to_float,
+    'fill_time': _to_datetime,
+}
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class BaseEvent:
+    event_type: EventType
+    trace: EventTrace | None = None
+
+    def __post_init__(self) -> None:
+        if _STRICT_VALIDATION:
+            self._validate()
+
+    def _validate(self) -> None:
+        """Check the field types, coercing enum values given as strings and numbers to float."""
+        for field in fields(self):
+            validator = _FIELD_VALIDATORS.get(field.name)
+            if validator is None:
+                continue
+            value = getattr(self, field.name)
+            try:
+                coerced = validator(value)
+            except (TypeError, ValueError) as e:
+                raise ValueError(
+                    f"Invalid value for {type(self).__name__}.{field.name}: {value!r} ({e})"
+                ) from None
+            if coerced is not value:
+                object.__setattr__(self, field.name, coerced)
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
 class DataEvent(BaseEvent):
     event_type: EventType = EventType.DATA
     symbol: str
-    data: pd.Series
+    data: pd.Series | Bar
+    timeframe: str | None = None  # Timeframe of the bar, e.g. a higher one built by a BarResampler
 
 
+@dataclass(frozen=True, slots=True, kw_only=True)
 class StrategyEvent(BaseEvent):
     event_type: EventType = EventType.STRATEGY
     symbol: str
@@ -48,6 +202,7 @@ class StrategyEvent(BaseEvent):
     take_profit: float
 
 
+@dataclass(frozen=True, slots=True, kw_only=True)
 class SizingEvent(BaseEvent):
     event_type: EventType = EventType.SIZING
     symbol: str
@@ -60,6 +215,7 @@ class SizingEvent(BaseEvent):
     volume: float
 
 
+@dataclass(frozen=True, slots=True, kw_only=True)
 class OrderEvent(BaseEvent):
     event_type: EventType = EventType.ORDER
     symbol: str
@@ -72,6 +228,7 @@ class OrderEvent(BaseEvent):
     volume: float
 
 
+@dataclass(frozen=True, slots=True, kw_only=True)
 class ExecutionEvent(BaseEvent):
     event_type: EventType = EventType.EXECUTION
     symbol: str
@@ -81,6 +238,7 @@ class ExecutionEvent(BaseEvent):
     volume: float
 
 
+@dataclass(frozen=True, slots=True, kw_only=True)
 class PlacedPendingOrderEvent(BaseEvent):
     event_type: EventType = EventType.PENDING
     symbol: str
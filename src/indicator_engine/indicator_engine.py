@@ -0,0 +1,342 @@
+import copy
+import threading
+import numpy as np
+from collections import deque
+from numpy.lib.stride_tricks import sliding_window_view
+from bar_store.bar_store import Bar, BarStore
+from data_source.data_source import DataSource
+from utils.utils import Utils
+from logger.logger import get_logger
+
+logger = get_logger("indicator_engine")
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Mean of every full window of `window` values, aligned to the last value of the window
+    (NaN before the first full window), in one pass over the whole history. Each window is
+    reduced like a plain np.mean over the slice; the running sums of SMA agree with it up to
+    rounding.
+    """
+    means = np.full(len(values), np.nan)
+    if len(values) >= window:
+        means[window - 1:] = sliding_window_view(values, window).mean(axis=1)
+    return means
+
+
+def rsi_values(close: np.ndarray, rsi_period: int) -> np.ndarray:
+    """
+    Simple-average RSI (RSI with smoothing="simple") of every bar: the mean of the last
+    rsi_period gains and losses (fewer at the start of the data), and 0 when there are no
+    losses in the window.
+    """
+    deltas = np.diff(close)
+    gains = np.where(deltas > 0, deltas, 0)
+    losses = np.where(deltas < 0, -deltas, 0)
+
+    average_gain = np.zeros(len(close))
+    average_loss = np.zeros(len(close))
+    # Warm-up bars see only the deltas available so far (bar 0 has none)
+    for i in range(1, min(rsi_period, len(close))):
+        average_gain[i] = np.mean(gains[:i])
+        average_loss[i] = np.mean(losses[:i])
+    if len(deltas) >= rsi_period:
+        average_gain[rsi_period:] = sliding_window_view(gains, rsi_period).mean(axis=1)
+        average_loss[rsi_period:] = sliding_window_view(losses, rsi_period).mean(axis=1)
+
+    rs = np.divide(average_gain, average_loss, out=np.zeros(len(close)), where=average_loss > 0)
+    return 100 - (100 / (1 + rs))
+
+
+class SMA:
+    """Simple moving average of the close, kept as a running sum over the last period closes."""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.warmup = period
+        self._window: deque = deque()
+        self._sum = 0.0
+        self._updates = 0
+        self.value: float | None = None
+
+    def update(self, high: float, low: float, close: float) -> None:
+        window = self._window
+        window.append(close)
+        self._sum += close
+        if len(window) > self.period:
+            self._sum -= window.popleft()
+        self._updates += 1
+        if self._updates % self.period == 0:
+            self._sum = sum(window)  # Resynchronize, so rounding errors do not build up
+        self.value = self._sum / self.period if len(window) == self.period else None
+
+
+class EMA:
+    """Exponential moving average of the close, seeded with the SMA of the first period closes."""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.warmup = 10 * period
+        self.alpha = 2.0 / (period + 1)
+        self._seed: list[float] = []
+        self.value: float | None = None
+
+    def update(self, high: float, low: float, close: float) -> None:
+        if self.value is None:
+            self._seed.append(close)
+            if len(self._seed) == self.period:
+                self.value = sum(self._seed) / self.period
+                self._seed = []
+        else:
+            self.value += self.alpha * (close - self.value)
+
+
+class RSI:
+    """
+    Relative strength index of the close. With "wilder" smoothing the average gain and loss
+    start as the mean of the first period changes and are then Wilder-smoothed (100 when there
+    are no losses). With "simple" smoothing they are the mean of the last period changes, fewer
+    at the start, and the RSI is 0 when there are no losses, as StrategyRSI always computed it.
+    """
+
+    def __init__(self, period: int, smoothing: str = "wilder"):
+        if smoothing not in ("wilder", "simple"):
+            raise ValueError(f"Unknown RSI smoothing: {smoothing}")
+        self.period = period
+        self.smoothing = smoothing
+        self.warmup = period + 1 if smoothing == "simple" else 10 * period
+        self._previous_close: float | None = None
+        self._changes: deque = deque()
+        self._gain_sum = 0.0
+        self._loss_sum = 0.0
+        self._updates = 0
+        self._average_gain: float | None = None
+        self._average_loss: float | None = None
+        self.value: float | None = None
+
+    def update(self, high: float, low: float, close: float) -> None:
+        previous_close = self._previous_close
+        self._previous_close = close
+        if self.smoothing == "simple":
+            if previous_close is not None:
+                self._add_change(close - previous_close)
+            count = len(self._changes)
+            average_gain = self._gain_sum / count if count else 0.0
+            average_loss = self._loss_sum / count if count else 0.0
+            rs = average_gain / average_loss if average_loss > 0 else 0
+            self.value = 100 - (100 / (1 + rs))
+            return
+
+        if previous_close is None:
+            return
+        change = close - previous_close
+        gain = change if change > 0 else 0.0
+        loss = -change if change < 0 else 0.0
+        if self._average_gain is None:
+            self._add_change(change)
+            if len(self._changes) < self.period:
+                return
+            self._average_gain = self._gain_sum / self.period
+            self._average_loss = self._loss_sum / self.period
+            self._changes.clear()
+        else:
+            self._average_gain = (self._average_gain * (self.period - 1) + gain) / self.period
+            self._average_loss = (self._average_loss * (self.period - 1) + loss) / self.period
+        if self._average_loss == 0:
+            self.value = 100.0
+        else:
+            self.value = 100 - (100 / (1 + self._average_gain / self._average_loss))
+
+    def _add_change(self, change: float) -> None:
+        changes = self._changes
+        changes.append(change)
+        if change > 0:
+            self._gain_sum += change
+        elif change < 0:
+            self._loss_sum -= change
+        if len(changes) > self.period:
+            removed = changes.popleft()
+            if removed > 0:
+                self._gain_sum -= removed
+            elif removed < 0:
+                self._loss_sum += removed
+        self._updates += 1
+        if self._updates % self.period == 0:  # Resynchronize, so rounding errors do not build up
+            self._gain_sum = sum(change for change in changes if change > 0)
+            self._loss_sum = -sum(change for change in changes if change < 0)
+
+
+class ATR:
+    """Average true range, the mean of the first period true ranges and then Wilder-smoothed."""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.warmup = 10 * period
+        self._previous_close: float | None = None
+        self._seed: list[float] = []
+        self.value: float | None = None
+
+    def update(self, high: float, low: float, close: float) -> None:
+        previous_close = self._previous_close
+        self._previous_close = close
+        true_range = high - low
+        if previous_close is not None:
+            true_range = max(true_range, abs(high - previous_close), abs(low - previous_close))
+        if self.value is None:
+            self._seed.append(true_range)
+            if len(self._seed) == self.period:
+                self.value = sum(self._seed) / self.period
+                self._seed = []
+        else:
+            self.value = (self.value * (self.period - 1) + true_range) / self.period
+
+
+class IndicatorEngine:
+    """
+    Incremental indicators per (symbol, timeframe, parameters), each updated in O(1) with every
+    new bar instead of being recomputed over a window of bars fetched again on every bar.
+    Identical requests share one instance, so several strategies asking for the same SMA
+    use a single computation.
+
+    An indicator is created on the first request and warmed up once from the closed bars of
+    the data source, the current bar included; update() must be called with every new bar
+    before the indicators are read for it. The indicators of a timeframe without DATA events
+    of its own are kept up to date with refresh() instead.
+    """
+
+    def __init__(self, data_source: DataSource):
+        self.DATA_SOURCE = data_source
+        self.indicators: dict[tuple, SMA | EMA | RSI | ATR] = {}
+        self._by_series: dict[tuple[str, str], list] = {}
+        self._last_times: dict[tuple[str, str], int] = {}
+        self._next_refresh: dict[tuple[str, str], int] = {}
+        # Strategies run in a thread pool (see StrategyManager) may request a new indicator at once
+        self._lock = threading.Lock()
+
+    def _get(self, symbol: str, timeframe: str, key: tuple, factory) -> SMA | EMA | RSI | ATR:
+        indicator = self.indicators.get((symbol, timeframe) + key)
+        if indicator is None:
+            with self._lock:
+                return self._create(symbol, timeframe, key, factory)
+        return indicator
+
+    def _create(self, symbol: str, timeframe: str, key: tuple, factory) -> SMA | EMA | RSI | ATR:
+        indicator = self.indicators.get((symbol, timeframe) + key)
+        if indicator is None:
+            indicator = factory()
+            history = self.DATA_SOURCE.get_latest_closed_bars_array(symbol, timeframe, indicator.warmup)
+            for high, low, close in zip(history.high.tolist(), history.low.tolist(), history.close.tolist()):
+                indicator.update(high, low, close)
+            if len(history) > 0:
+                series = (symbol, timeframe)
+                self._last_times[series] = max(self._last_times.get(series, 0), int(history.time[-1]))
+            self.indicators[(symbol, timeframe) + key] = indicator
+            self._by_series.setdefault((symbol, timeframe), []).append(indicator)
+            logger.debug("Indicator %s created for %s %s", key, symbol, timeframe)
+        return indicator
+
+    def sma(self, symbol: str, timeframe: str, period: int) -> float | None:
+        return self._get(symbol, timeframe, ("sma", period), lambda: SMA(period)).value
+
+    def ema(self, symbol: str, timeframe: str, period: int) -> float | None:
+        return self._get(symbol, timeframe, ("ema", period), lambda: EMA(period)).value
+
+    def rsi(self, symbol: str, timeframe: str, period: int, smoothing: str = "wilder") -> float | None:
+        return self._get(symbol, timeframe, ("rsi", period, smoothing), lambda: RSI(period, smoothing)).value
+
+    def atr(self, symbol: str, timeframe: str, period: int) -> float | None:
+        return self._get(symbol, timeframe, ("atr", period), lambda: ATR(period)).value
+
+    def update(self, symbol: str, timeframe: str, bar: Bar) -> None:
+        """Feed a new closed bar to the indicators of symbol and timeframe; bars already seen are ignored."""
+        self._update((symbol, timeframe), bar.time, bar.high, bar.low, bar.close)
+
+    def update_bars(self, symbol: str, timeframe: str, bars: BarStore) -> None:
+        """update() for a run of consecutive bars, e.g. the bars skipped by a fast-forward backtest."""
+        series = (symbol, timeframe)
+        for bar_time, high, low, close in zip(
+            bars.time.tolist(), bars.high.tolist(), bars.low.tolist(), bars.close.tolist()
+        ):
+            self._update(series, bar_time, high, low, close)
+
+    def refresh(self, symbol: str, timeframe: str, until: int) -> None:
+        """
+        Feed the indicators of symbol and timeframe the bars of that timeframe closed by the epoch
+        time until, fetched from the data source, for a timeframe the DATA events are not about
+        (e.g. an H1 strategy on an M1 data source). The data source is only asked at the first
+        call after a day or period boundary, and once the bar after the last one seen can be closed.
+        """
+        series = (symbol, timeframe)
+        if series not in self._by_series or until < self._next_refresh.get(series, 0):
+            return
+        period = Utils.timeframe_to_seconds(timeframe)
+        step = min(period, 86400)  # Weekly bars do not start on a multiple of their length
+        self._next_refresh[series] = until - until % step + step
+        last_time = self._last_times.get(series)
+        if last_time is not None and until < last_time + 2 * period:
+            return
+        num_bars = max((until - last_time) // period - 1, 1) if last_time is not None else 1
+        self.update_bars(symbol, timeframe, self.DATA_SOURCE.get_latest_closed_bars_array(symbol, timeframe, num_bars))
+
+    def _update(self, series: tuple[str, str], bar_time: int, high: float, low: float, close: float) -> None:
+        last_time = self._last_times.get(series)
+        if last_time is not None and bar_time <= last_time:
+            return
+        self._last_times[series] = bar_time
+        for indicator in self._by_series.get(series, ()):
+            indicator.update(high, low, close)
+
+    def get_state(self) -> dict:
+        return {"indicators": copy.deepcopy(self.indicators), "last_times": dict(self._last_times)}
+
+    def restore_state(self, state: dict) -> None:
+        self.indicators = copy.deepcopy(state["indicators"])
+        self._last_times = dict(state["last_times"])
+        self._next_refresh = {}
+        self._by_series = {}
+        for key, indicator in self.indicators.items():
+            self._by_series.setdefault(key[:2], []).append(indicator)
+
+
+class CrossSectionWindow:
+    """
+    Latest `window` closes of many symbols as one (symbols x window) matrix, NaN where a
+    symbol has fewer bars. Every value is written twice (at p and p + window), so the window
+    of a symbol is a contiguous slice and a new bar costs O(1) per symbol.
+    """
+
+    def __init__(self, window: int):
+        self.window = window
+        self.rows: dict[str, int] = {}
+        self._values = np.full((0, 2 * window), np.nan)
+        self._heads = np.zeros(0, dtype=np.int64)  # Next write position of every row, in [0, window)
+
+    def add(self, symbol: str, history: np.ndarray) -> int:
+        """Add a row for symbol, filled with the last values of its history. Returns the row."""
+        row = len(self.rows)
+        self.rows[symbol] = row
+        self._values = np.vstack([self._values, np.full((1, 2 * self.window), np.nan)])
+        self._heads = np.append(self._heads, 0)
+        for value in history[-self.window:]:
+            self.update(np.array([row]), np.array([value], dtype=np.float64))
+        return row
+
+    def update(self, rows: np.ndarray, values: np.ndarray) -> None:
+        """Append one new value to each of the given rows."""
+        heads = self._heads[rows]
+        self._values[rows, heads] = values
+        self._values[rows, heads + self.window] = values
+        self._heads[rows] = (heads + 1) % self.window
+
+    def matrix(self, rows: np.ndarray) -> np.ndarray:
+        """Windows of the given rows, oldest value first."""
+        columns = self._heads[rows][:, None] + np.arange(self.window)
+        return self._values[rows[:, None], columns]
+
+    def get_state(self) -> dict:
+        return {"rows": dict(self.rows), "values": self._values.copy(), "heads": self._heads.copy()}
+
+    def restore_state(self, state: dict) -> None:
+        self.rows = dict(state["rows"])
+        self._values = state["values"].copy()
+        self._heads = state["heads"].copy()
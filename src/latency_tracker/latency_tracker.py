@@ -0,0 +1,65 @@
+from collections import deque
+import numpy as np
+from events.events import EventTrace
+
+
+class LatencyTracker:
+    """
+    Collects the per-stage latencies of traced event chains (see EventTrace) and summarizes
+    them as p50/p99/max. Each stage keeps a rolling window of its most recent samples,
+    so the tracker can be queried while the system runs without growing unbounded.
+    """
+
+    def __init__(self, max_samples: int = 10000):
+        self.max_samples = max_samples
+        self._samples: dict[str, deque] = {}
+        self._counts: dict[str, int] = {}
+
+    def record_duration(self, stage: str, duration_ns: int) -> None:
+        samples = self._samples.get(stage)
+        if samples is None:
+            samples = self._samples[stage] = deque(maxlen=self.max_samples)
+            self._counts[stage] = 0
+        samples.append(duration_ns)
+        self._counts[stage] += 1
+
+    def record(self, trace: EventTrace | None) -> None:
+        """Record every stage of a finished trace, plus the end-to-end latency as 'total'."""
+        if trace is None or len(trace.stages) < 2:
+            return
+        for stage, duration_ns in trace.durations():
+            self.record_duration(stage, duration_ns)
+        self.record_duration("total", trace.total())
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """
+        Latency statistics per stage in milliseconds, in the order the stages were first seen.
+        'count' is the total number of samples recorded, the percentiles use the rolling window.
+        """
+        summary = {}
+        for stage, samples in self._samples.items():
+            values_ms = np.fromiter(samples, dtype=np.float64, count=len(samples)) / 1e6
+            summary[stage] = {
+                "count": self._counts[stage],
+                "p50": float(np.percentile(values_ms, 50)),
+                "p99": float(np.percentile(values_ms, 99)),
+                "max": float(values_ms.max()),
+            }
+        return summary
+
+    def report(self) -> str:
+        summary = self.summary()
+        if not summary:
+            return "No latency samples recorded."
+        width = max(len(stage) for stage in summary)
+        lines = [f"{'stage':<{width}}  {'count':>8}  {'p50 ms':>10}  {'p99 ms':>10}  {'max ms':>10}"]
+        for stage, stats in summary.items():
+            lines.append(
+                f"{stage:<{width}}  {stats['count']:>8}  {stats['p50']:>10.3f}  "
+                f"{stats['p99']:>10.3f}  {stats['max']:>10.3f}"
+            )
+        return "\n".join(lines)
+
+    def reset(self) -> None:
+        self._samples.clear()
+        self._counts.clear()
@@ -0,0 +1,130 @@
+import atexit
+import copy
+import logging
+import logging.handlers
+import queue
+import sys
+
+
+ROOT_LOGGER_NAME = "trading"
+
+# Pass as `extra` on messages emitted once per bar so that backtests can drop or sample them
+PER_BAR = {"per_bar": True}
+
+_listener: logging.handlers.QueueListener | None = None
+
+logging.getLogger(ROOT_LOGGER_NAME).addHandler(logging.NullHandler())
+
+
+class StructuredFormatter(logging.Formatter):
+    """
+    Formats records as `time level logger message key=value ...`.
+    Structured fields are passed through `extra={"fields": {...}}` and are only rendered
+    when the record is actually written, in the background logging thread.
+    """
+
+    def __init__(self):
+        super().__init__(fmt="%(asctime)s %(levelname)s %(name)s - %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
+
+    def format(self, record: logging.LogRecord) -> str:
+        message = super().format(record)
+        fields = getattr(record, "fields", None)
+        if fields:
+            message += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        return message
+
+
+class BarSamplingFilter(logging.Filter):
+    """
+    Keeps one out of every `sample_every` per-bar records (0 drops them all).
+    Records not flagged as per-bar, such as trades, always pass.
+    """
+
+    def __init__(self, sample_every: int = 1):
+        super().__init__()
+        self.sample_every = sample_every
+        self._seen = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not getattr(record, "per_bar", False):
+            return True
+        if self.sample_every <= 0:
+            return False
+        self._seen += 1
+        return (self._seen - 1) % self.sample_every == 0
+
+
+class DeferredFormattingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that leaves the line layout and the structured fields to the listener thread.
+    Only what may change after the call is frozen when the record is enqueued: the message is
+    merged with its arguments, the exception is rendered to text and the fields are copied.
+    """
+
+    _exception_formatter = logging.Formatter()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = self._exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        fields = getattr(record, "fields", None)
+        if fields:
+            record.fields = dict(fields)
+        return record
+
+
+def configure_logging(level: int = logging.INFO, per_bar_sample_every: int = 1, stream=None) -> None:
+    """
+    Configure the framework loggers.
+    Records are put on a queue by the calling thread and formatted and written by a
+    background listener, so logging never blocks the event loop on console or file I/O.
+
+    Per-bar messages are logged at DEBUG level:
+    - level=INFO (default) drops them entirely while keeping per-trade records (quiet mode).
+    - level=DEBUG with per_bar_sample_every=N writes one out of every N per-bar messages.
+
+    Only entry points call it: until then the framework loggers write nothing, so a backtest
+    opts into quiet or sampled output by calling it with the level it wants.
+    """
+    global _listener
+
+    root = logging.getLogger(ROOT_LOGGER_NAME)
+    if _listener is not None:
+        _listener.stop()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = DeferredFormattingQueueHandler(log_queue)
+    queue_handler.addFilter(BarSamplingFilter(per_bar_sample_every))
+
+    output_handler = logging.StreamHandler(stream or sys.stdout)
+    output_handler.setFormatter(StructuredFormatter())
+
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, output_handler)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Flush the pending records and stop the background listener."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    Return a framework logger. Nothing is written until an entry point calls configure_logging.
+    """
+    return logging.getLogger(f"{ROOT_LOGGER_NAME}.{name}")
+
+
+atexit.register(shutdown_logging)
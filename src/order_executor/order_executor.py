@@ -1,12 +1,14 @@
 from portfolio.portfolio import Portfolio
 from queue import Queue
-from events.events import OrderEvent, ExecutionEvent, PlacedPendingOrderEvent, StrategyType
+from events.events import OrderEvent, ExecutionEvent, PlacedPendingOrderEvent, StrategyType, EventTrace, mark_trace
 from datetime import datetime
-from utils.utils import Utils
+from logger.logger import get_logger
 import pandas as pd
 import time
 import MetaTrader5 as mt5
 
+logger = get_logger("order_executor")
+
 
 class OrderExecutor():
 
@@ -18,13 +20,14 @@ class OrderExecutor():
         """
         Execute the order by sending it to the broker.
         """
+        trace = mark_trace(order_event.trace, "executor")
 
         if order_event.target_order == "MARKET":
-            self._execute_market_order(order_event)
+            self._execute_market_order(order_event, trace)
         else:
-            self._send_pending_order(order_event)
+            self._send_pending_order(order_event, trace)
 
-    def _execute_market_order(self, order_event: OrderEvent) -> None:
+    def _execute_market_order(self, order_event: OrderEvent, trace: EventTrace | None = None) -> None:
         """
         Execute the market order by sending it to the broker.
         """
@@ -50,21 +53,21 @@ class OrderExecutor():
             }
 
         result = mt5.order_send(market_order_request)
+        trace = mark_trace(trace, "order_send")  # Broker round trip
 
         if self._check_execution_status(result):
-            print(
-                f"Market order executed successfully. {order_event.strategy} for {order_event.symbol} "
-                f"at {result.price} with {result.volume} volume"
+            logger.info(
+                "Market order executed successfully. %s for %s at %s with %s volume",
+                order_event.strategy, order_event.symbol, result.price, result.volume
             )
-            self._create_and_put_execution_event(result)
+            self._create_and_put_execution_event(result, trace)
 
         else:
-            print(
-                f"Market order execution failed. {order_event.strategy} for "
-                f"{order_event.symbol}: {result.comment}"
+            logger.error(
+                "Market order execution failed. %s for %s: %s", order_event.strategy, order_event.symbol, result.comment
             )
 
-    def _send_pending_order(self, order_event: OrderEvent) -> None:
+    def _send_pending_order(self, order_event: OrderEvent, trace: EventTrace | None = None) -> None:
         """
         Send a pending order to the broker.
         """
@@ -91,18 +94,20 @@ class OrderExecutor():
         }
 
         result = mt5.order_send(pending_order_request)
+        trace = mark_trace(trace, "order_send")  # Broker round trip
 
         if self._check_execution_status(result):
-            print(
-                f"Pending order executed successfully. {order_event.strategy} {order_event.target_order} "
-                f"for {order_event.symbol} at {order_event.target_price} with {order_event.volume} volume"
+            logger.info(
+                "Pending order executed successfully. %s %s for %s at %s with %s volume",
+                order_event.strategy, order_event.target_order, order_event.symbol, order_event.target_price,
+                order_event.volume
             )
-            self._create_and_put_placed_pending_order_event(order_event)
+            self._create_and_put_placed_pending_order_event(order_event, trace)
 
         else:
-            print(
-                f"Pending order execution failed. {order_event.strategy} for "
-                f"{order_event.symbol}: {result.comment}"
+            logger.error(
+                "Pending order execution failed. %s for %s: %s",
+                order_event.strategy, order_event.symbol, result.comment
             )
 
     def cancel_pending_order_by_ticket(self, ticket: int) -> None:
@@ -119,7 +124,7 @@ class OrderExecutor():
         pending_order = mt5.orders_get(ticket=ticket)[0]
 
         if pending_order is None:
-            print(f"ORD EXEC: Pending order with ticket {ticket} not found.")
+            logger.warning("ORD EXEC: Pending order with ticket %s not found.", ticket)
             return
 
         cancel_request = {
@@ -132,12 +137,12 @@ class OrderExecutor():
         result = mt5.order_send(cancel_request)
 
         if self._check_execution_status(result):
-            print(
-                f"Pending order with ticket {ticket} in {pending_order.symbol} "
-                f"and volume {pending_order.volume_initial} cancelled successfully."
+            logger.info(
+                "Pending order with ticket %s in %s and volume %s cancelled successfully.",
+                ticket, pending_order.symbol, pending_order.volume_initial
             )
         else:
-            print(f"Failed to cancel pending order {ticket} in {pending_order.symbol}: {result.comment}")
+            logger.error("Failed to cancel pending order %s in %s: %s", ticket, pending_order.symbol, result.comment)
 
     def close_position_by_ticket(self, ticket: int) -> None:
         """
@@ -153,7 +158,7 @@ class OrderExecutor():
         position = mt5.positions_get(ticket=ticket)[0]
 
         if position is None:
-            print(f"ORD EXEC: Position with ticket {ticket} not found.")
+            logger.warning("ORD EXEC: Position with ticket %s not found.", ticket)
             return
 
         close_request = {
@@ -169,61 +174,71 @@ class OrderExecutor():
         result = mt5.order_send(close_request)
 
         if self._check_execution_status(result):
-            print(
-                f"Position with ticket {ticket} in {position.symbol} "
-                f"and volume {position.volume} closed successfully."
+            logger.info(
+                "Position with ticket %s in %s and volume %s closed successfully.",
+                ticket, position.symbol, position.volume
             )
         else:
-            print(f"Failed to close position {ticket} in {position.symbol}: {result.comment}")
+            logger.error("Failed to close position %s in %s: %s", ticket, position.symbol, result.comment)
+
+    def _strategy_open_positions(self, magic_number: int | None) -> tuple:
+        if magic_number is None:
+            return self.PORTFOLIO.get_strategy_open_positions()
+        return tuple(position for position in self.PORTFOLIO.get_open_positions() if position.magic == magic_number)
 
-    def close_strategy_long_positions_by_symbol(self, symbol: str) -> None:
+    def close_strategy_long_positions_by_symbol(self, symbol: str, magic_number: int | None = None) -> None:
         """
         Close all long positions for a given symbol.
 
         Args:
             symbol (str): The symbol for which to close long positions.
+            magic_number (int | None): Magic number of the positions to close, the portfolio's if None.
 
         Returns:
             None
         """
 
-        positions = self.PORTFOLIO.get_strategy_open_positions()
+        positions = self._strategy_open_positions(magic_number)
 
         if positions is None:
-            print(f"ORD EXEC: No positions found for symbol {symbol}.")
+            logger.warning("ORD EXEC: No positions found for symbol %s.", symbol)
             return
 
         for position in positions:
             if position.symbol == symbol and position.type == mt5.ORDER_TYPE_BUY:
                 self.close_position_by_ticket(position.ticket)
 
-    def close_strategy_short_positions_by_symbol(self, symbol: str) -> None:
+    def close_strategy_short_positions_by_symbol(self, symbol: str, magic_number: int | None = None) -> None:
         """
         Close all short positions for a given symbol.
 
         Args:
             symbol (str): The symbol for which to close short positions.
+            magic_number (int | None): Magic number of the positions to close, the portfolio's if None.
 
         Returns:
             None
         """
 
-        positions = self.PORTFOLIO.get_strategy_open_positions()
+        positions = self._strategy_open_positions(magic_number)
 
         if positions is None:
-            print(f"ORD EXEC: No positions found for symbol {symbol}.")
+            logger.warning("ORD EXEC: No positions found for symbol %s.", symbol)
             return
 
         for position in positions:
             if position.symbol == symbol and position.type == mt5.ORDER_TYPE_SELL:
                 self.close_position_by_ticket(position.ticket)
 
-    def _create_and_put_placed_pending_order_event(self, order_event: OrderEvent) -> None:
+    def _create_and_put_placed_pending_order_event(
+        self, order_event: OrderEvent, trace: EventTrace | None = None
+    ) -> None:
         """
         Creates a pending order event based on the order event and puts it into the events queue.
 
         Args:
             order_event (OrderEvent): The order event to be processed.
+            trace (EventTrace | None): The latency trace of the order, if tracing is enabled.
 
         Returns:
             None
@@ -236,18 +251,20 @@ class OrderExecutor():
             magic_number=order_event.magic_number,
             stop_loss=order_event.stop_loss,
             take_profit=order_event.take_profit,
-            volume=order_event.volume
+            volume=order_event.volume,
+            trace=trace
         )
 
         # Place the pending order event into the events queue
         self.events_queue.put(placed_pending_order_event)
 
-    def _create_and_put_execution_event(self, order_result) -> None:
+    def _create_and_put_execution_event(self, order_result, trace: EventTrace | None = None) -> None:
         """
         Creates an execution event based on the order result and puts it into the events queue.
 
         Args:
             order_result (OrderResult): The result of the order execution.
+            trace (EventTrace | None): The latency trace of the order, if tracing is enabled.
 
         Returns:
             None
@@ -284,11 +301,15 @@ class OrderExecutor():
 
         # If after the loop we have not obtained the deal, display an error message
         if not deal:
-            print(
-                f"{Utils.dateprint()} - ORD EXEC: Unable to obtain the deal for the execution of the order"
-                f"{order_result.order}, although it was probably executed."
+            logger.warning(
+                "ORD EXEC: Unable to obtain the deal for the execution of the order %s, "
+                "although it was probably executed.",
+                order_result.order
             )
 
+        # The deal confirmation polling is reported as its own latency stage
+        trace = mark_trace(trace, "deal_confirm")
+
         # Create the execution event
         execution_event = ExecutionEvent(
             symbol=order_result.request.symbol,
@@ -299,7 +320,8 @@ class OrderExecutor():
             ),
             fill_price=order_result.price,
             fill_time=fill_time if not deal else pd.to_datetime(deal.time_msc, unit='ms'),
-            volume=order_result.request.volume
+            volume=order_result.request.volume,
+            trace=trace
         )
 
         # Place the execution event into the events queue
@@ -310,11 +332,11 @@ class OrderExecutor():
         Check the execution status of the order.
         """
         if order_result.retcode == mt5.TRADE_RETCODE_DONE:
-            print(f"Order executed successfully: {order_result.retcode}")
+            logger.debug("Order executed successfully: %s", order_result.retcode)
             return True
         elif order_result.retcode == mt5.TRADE_RETCODE_DONE_PARTIAL:
-            print(f"Order executed successfully: {order_result.retcode}")
+            logger.debug("Order executed successfully: %s", order_result.retcode)
             return True
         else:
-            print(f"Order execution failed: {order_result.retcode}")
+            logger.warning("Order execution failed: %s", order_result.retcode)
             return False
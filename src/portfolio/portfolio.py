@@ -79,3 +79,19 @@ class Portfolio():
                     shorts += 1
 
         return {'LONG': longs, 'SHORT': shorts, "TOTAL": longs + shorts}
+
+    def get_number_of_strategy_open_positions_by_symbols(self) -> dict[str, dict[str, int]]:
+        """
+        Number of open positions with the magic number of every symbol that has any, in one pass.
+        """
+        counts: dict[str, dict[str, int]] = {}
+        for position in self._get_raw_positions():
+            if position.magic != self.magic:
+                continue
+            symbol_counts = counts.setdefault(position.symbol, {'LONG': 0, 'SHORT': 0, "TOTAL": 0})
+            if position.type == mt5.ORDER_TYPE_BUY:
+                symbol_counts['LONG'] += 1
+            elif position.type == mt5.ORDER_TYPE_SELL:
+                symbol_counts['SHORT'] += 1
+            symbol_counts['TOTAL'] = symbol_counts['LONG'] + symbol_counts['SHORT']
+        return counts
@@ -1,5 +1,5 @@
 
-from events.events import StrategyEvent, SizingEvent
+from events.events import StrategyEvent, SizingEvent, mark_trace
 from data_source.data_source import DataSource
 from .properties.position_sizer_properties import (
     BaseSizingProps,
@@ -48,6 +48,7 @@ class PositionSizer(IPositionSizer):
             stop_loss=strategy_event.stop_loss,
             take_profit=strategy_event.take_profit,
             volume=volume,
+            trace=mark_trace(strategy_event.trace, "sizing"),
         )
         self.events_queue.put(sizing_event)
 
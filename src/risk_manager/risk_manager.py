@@ -3,12 +3,15 @@ from data_source.data_source import DataSource
 from portfolio.portfolio import Portfolio
 from .properties.risk_manager_properties import BaseRiskProps, MaxLeverageFactorRiskProps
 from .risk_managers.max_leverage_factor_risk_manager import MaxLeverageFactorRiskManager
-from events.events import SizingEvent, OrderEvent
+from events.events import SizingEvent, OrderEvent, mark_trace
 from utils.utils import Utils
 import MetaTrader5 as mt5
 
+from logger.logger import get_logger
 from queue import Queue
 
+logger = get_logger("risk_manager")
+
 
 class RiskManager(IRiskManager):
     """
@@ -20,14 +23,17 @@ class RiskManager(IRiskManager):
         events_queue: Queue,
         data_source: DataSource,
         portfolio: Portfolio,
-        risk_properties: BaseRiskProps
+        risk_properties: BaseRiskProps,
+        magic_numbers: list[int] | None = None
     ):
         """
-        Initialize the RiskManager with the given configuration.
+        Initialize the RiskManager with the given configuration. The current exposure is that of the
+        positions of magic_numbers (e.g. every strategy of a StrategyManager), by default of the portfolio.
         """
         self.events_queue = events_queue
         self.DATA_SOURCE = data_source
         self.PORTFOLIO = portfolio
+        self.magic_numbers = frozenset(magic_numbers) if magic_numbers is not None else frozenset([portfolio.magic])
         self.risk_management_method = self._get_risk_management_method(risk_properties)
 
     def _get_risk_management_method(self, risk_props: BaseRiskProps) -> IRiskManager:
@@ -44,11 +50,13 @@ class RiskManager(IRiskManager):
         """
         Compute the current value of the position in the account currency.
         """
-        current_positions = self.PORTFOLIO.get_strategy_open_positions()
+        current_positions = [
+            position for position in self.PORTFOLIO.get_open_positions() if position.magic in self.magic_numbers
+        ]
 
         total_value = 0.0
 
-        print(current_positions)
+        logger.debug("Current strategy positions: %s", current_positions)
 
         for position in current_positions:
             total_value += self._compute_value_of_position_in_account_currency(
@@ -94,6 +102,7 @@ class RiskManager(IRiskManager):
             stop_loss=sizing_event.stop_loss,
             take_profit=sizing_event.take_profit,
             volume=volume,
+            trace=mark_trace(sizing_event.trace, "risk"),
         )
         self.events_queue.put(order_event)
 
@@ -116,4 +125,7 @@ class RiskManager(IRiskManager):
         if new_volume > 0.0:
             self._create_and_put_order_event(sizing_event, new_volume)
         else:
-            print(f"Risk management rejected the order for {sizing_event.symbol} with volume {new_volume}.")
+            logger.warning(
+                "Risk management rejected the order",
+                extra={"fields": {"symbol": sizing_event.symbol, "volume": new_volume}}
+            )
@@ -3,6 +3,9 @@ from ..interfaces.risk_manager_interface import IRiskManager
 from ..properties.risk_manager_properties import MaxLeverageFactorRiskProps
 import MetaTrader5 as mt5
 import sys
+from logger.logger import get_logger
+
+logger = get_logger("max_leverage_factor_risk_manager")
 
 
 class MaxLeverageFactorRiskManager(IRiskManager):
@@ -37,12 +40,9 @@ class MaxLeverageFactorRiskManager(IRiskManager):
         if abs(new_leverage_factor) <= self.max_leverage_factor:
             return True
         else:
-            print(
-                (
-                    f"The objetive position {sizing_event.strategy} {sizing_event.volume}",
-                    f"New leverage factor {abs(new_leverage_factor)} exceeds "
-                    f"max leverage factor {self.max_leverage_factor}."
-                )
+            logger.warning(
+                "The objetive position %s %s. New leverage factor %s exceeds max leverage factor %s.",
+                sizing_event.strategy, sizing_event.volume, abs(new_leverage_factor), self.max_leverage_factor
             )
             return False
 
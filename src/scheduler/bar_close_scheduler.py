@@ -0,0 +1,159 @@
+import time
+from typing import Callable
+from utils.utils import Utils
+
+
+SECONDS_PER_DAY = 86400
+SECONDS_PER_WEEK = 7 * SECONDS_PER_DAY
+EPOCH_WEEKDAY = 3  # 1970-01-01 was a Thursday (Monday == 0)
+MAX_SERVER_TIME_OFFSET = 14 * 3600
+
+
+class BarCloseScheduler:
+    """
+    Decides when the trading loop has to poll the data source.
+    Bars can only close on known boundaries, so instead of polling on a fixed interval the
+    scheduler computes the next close of every tracked (symbol, timeframe) pair and waits
+    until then. Right after a boundary it keeps retrying until every pair has published its
+    new bar, because the terminal can take a moment to do so, and it skips the FX weekend
+    when the market is closed.
+    Bar boundaries follow the broker server time (MT5 bar times are server time), so the
+    offset of the server clock from UTC has to be given; weekly bars open on `week_start`.
+    """
+
+    def __init__(
+        self,
+        symbol_timeframes: list[tuple[str, str]],
+        close_delay: float = 0.5,
+        retry_interval: float = 1.0,
+        server_time_offset: int = 0,
+        week_start: int = 6,
+        skip_weekends: bool = True,
+        weekend_close: tuple[int, int] = (4, 21),
+        weekend_open: tuple[int, int] = (6, 21),
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Args:
+            symbol_timeframes: (symbol, timeframe) pairs used by the strategies.
+            close_delay: seconds to wait after a boundary before polling.
+            retry_interval: seconds between polls while a new bar is not available yet.
+            server_time_offset: seconds the broker server clock is ahead of UTC.
+            week_start: weekday (Monday == 0) on which the broker opens the weekly bars, in server time.
+            skip_weekends: do not poll while the FX market is closed.
+            weekend_close: (weekday, UTC hour) when the market closes, Monday == 0.
+            weekend_open: (weekday, UTC hour) when the market opens again.
+            clock: returns the current UTC epoch time in seconds.
+        """
+        if not symbol_timeframes:
+            raise ValueError("At least one (symbol, timeframe) pair is required.")
+
+        self.symbol_timeframes = symbol_timeframes
+        self.server_time_offset = server_time_offset
+        self.week_anchor = ((week_start - EPOCH_WEEKDAY) % 7) * SECONDS_PER_DAY
+        self.periods = {(symbol, tf.upper()): self._period(tf) for symbol, tf in symbol_timeframes}
+        self.close_delay = close_delay
+        self.retry_interval = retry_interval
+        self.skip_weekends = skip_weekends
+        self.weekend_close_offset = self._week_offset(*weekend_close)
+        self.weekend_open_offset = self._week_offset(*weekend_open)
+        self.clock = clock
+
+        self.pending: list[tuple[str, str]] = []
+        self._next_poll_time = self.clock()  # Poll once on startup
+
+    @staticmethod
+    def server_time_offset_from_tick(tick_time: float, now: float | None = None) -> int:
+        """
+        Estimate the server time offset from the time of a fresh tick, rounded to half an hour.
+        The tick has to be recent: over the weekend the last tick is days old and gives no answer.
+        """
+        now = time.time() if now is None else now
+        offset = round((tick_time - now) / 1800) * 1800
+        if abs(offset) > MAX_SERVER_TIME_OFFSET:
+            raise ValueError(f"Tick time {tick_time} is too far from {now} to derive the server time offset.")
+        return offset
+
+    def _period(self, timeframe: str) -> tuple[int, int]:
+        """(bar length, server epoch of a bar open) of a timeframe."""
+        seconds = Utils.timeframe_to_seconds(timeframe)
+        return seconds, self.week_anchor if seconds == SECONDS_PER_WEEK else 0
+
+    @staticmethod
+    def _week_offset(weekday: int, hour: int) -> int:
+        """Seconds since Monday 00:00 UTC."""
+        return weekday * SECONDS_PER_DAY + hour * 3600
+
+    def _seconds_into_week(self, timestamp: float) -> float:
+        return (timestamp + EPOCH_WEEKDAY * SECONDS_PER_DAY) % SECONDS_PER_WEEK
+
+    def _bar_open(self, timestamp: float, period: tuple[int, int]) -> float:
+        """Server time at which the bar containing the UTC `timestamp` opened."""
+        seconds, anchor = period
+        return (timestamp + self.server_time_offset - anchor) // seconds * seconds + anchor
+
+    def _next_boundary(self, timestamp: float) -> float:
+        """First bar close of any tracked timeframe after the UTC `timestamp`, in UTC."""
+        return min(
+            self._bar_open(timestamp, period) + period[0] - self.server_time_offset
+            for period in set(self.periods.values())
+        )
+
+    def _market_open_after(self, boundary: float) -> float | None:
+        """
+        If a bar closing at `boundary` falls in the weekend, return the time the market opens
+        again. Bars closing exactly at the weekend close are still delivered.
+        """
+        if not self.skip_weekends:
+            return None
+        offset = self._seconds_into_week(boundary)
+        if self.weekend_close_offset < self.weekend_open_offset:
+            closed = self.weekend_close_offset < offset <= self.weekend_open_offset
+            wait = self.weekend_open_offset - offset
+        else:  # The closed window wraps around Monday 00:00
+            closed = offset > self.weekend_close_offset or offset <= self.weekend_open_offset
+            wait = (self.weekend_open_offset - offset) % SECONDS_PER_WEEK
+        return boundary + wait if closed else None
+
+    def _last_trading_time(self, now: float) -> float:
+        """`now`, or the weekend close while the market is closed."""
+        market_open = self._market_open_after(now)
+        if market_open is None:
+            return now
+        return market_open - (self.weekend_open_offset - self.weekend_close_offset) % SECONDS_PER_WEEK
+
+    def expected_bar_time(self, symbol: str, timeframe: str, now: float | None = None) -> float:
+        """Server open time of the newest bar of the pair that should be closed at `now`."""
+        now = self.clock() if now is None else now
+        period = self.periods[(symbol, timeframe.upper())]
+        return self._bar_open(self._last_trading_time(now), period) - period[0]
+
+    def next_bar_close(self, now: float | None = None) -> float:
+        """Return the next time (UTC epoch seconds) a bar of any tracked timeframe closes."""
+        now = self.clock() if now is None else now
+        boundary = self._next_boundary(now)
+        market_open = self._market_open_after(boundary)
+        # A bar closing over the weekend is published when the market opens again
+        return boundary if market_open is None else market_open
+
+    def seconds_until_next_poll(self) -> float:
+        return max(0.0, self._next_poll_time - self.clock())
+
+    def on_poll(self, last_bar_times: dict[tuple[str, str], float]) -> None:
+        """
+        Report the outcome of a poll with the open time of the newest bar of every polled
+        (symbol, timeframe) pair. While a tracked pair still lacks its new bar the poll is
+        retried; once all of them have it the next poll is scheduled on the next bar close.
+        Pairs that are not reported are not waited for.
+        """
+        now = self.clock()
+        self.pending = [
+            (symbol, timeframe)
+            for (symbol, timeframe), bar_time in last_bar_times.items()
+            if (symbol, timeframe.upper()) in self.periods
+            and bar_time < self.expected_bar_time(symbol, timeframe, now)
+        ]
+        if self.pending:
+            self._next_poll_time = now + self.retry_interval
+        else:
+            self._next_poll_time = self.next_bar_close(now) + self.close_delay
@@ -1,11 +1,16 @@
+import numpy as np
 from typing import Protocol
+from anomaly_detector.anomaly_detector import IsolationForestAnomalyDetector
+from backtesting.anomaly_detector_mt5.anomaly_detector_mt5 import BacktestIsolationForestAnomalyDetector
 from backtesting.sentiment_analyzer_mt5.sentiment_analyzer_mt5 import BacktestSentimentAnalyzer
+from bar_store.bar_store import BarStore
 from events.events import DataEvent
 from data_source.data_source import DataSource
 from portfolio.portfolio import Portfolio
 from sentiment_analyzer.sentiment_analyzer import SentimentAnalyzer
 from order_executor.order_executor import OrderExecutor
 from events.events import StrategyEvent
+from indicator_engine.indicator_engine import IndicatorEngine
 
 
 class IStrategyManager(Protocol):
@@ -19,6 +24,21 @@ class IStrategyManager(Protocol):
         data_source: DataSource,
         portfolio: Portfolio,
         order_executor: OrderExecutor,
-        sentiment_analyzer: SentimentAnalyzer | BacktestSentimentAnalyzer | None = None
+        sentiment_analyzer: SentimentAnalyzer | BacktestSentimentAnalyzer | None = None,
+        anomaly_detector: (
+            IsolationForestAnomalyDetector
+            | BacktestIsolationForestAnomalyDetector
+            | None
+        ) = None,
+        indicator_engine: IndicatorEngine | None = None,
+        signal: int | None = None
     ) -> StrategyEvent | None:
         ...
+
+    def generate_signals(self, bars: BarStore) -> np.ndarray:
+        """Signal of every bar of a whole history (1 BUY, -1 SELL, 0 none), in one vectorized pass."""
+        ...
+
+    def generate_cross_section(self, closes: np.ndarray) -> np.ndarray:
+        """Signal of the current bar of many symbols from a (symbols x window) matrix of their latest closes."""
+        ...
@@ -1,16 +1,22 @@
 from backtesting.anomaly_detector_mt5.anomaly_detector_mt5 import BacktestIsolationForestAnomalyDetector
 from backtesting.sentiment_analyzer_mt5.sentiment_analyzer_mt5 import BacktestSentimentAnalyzer
 from portfolio.portfolio import Portfolio
+from bar_store.bar_store import BarStore
 from anomaly_detector.anomaly_detector import IsolationForestAnomalyDetector
 from ..interfaces.strategy_manager_interface import IStrategyManager
 from data_source.data_source import DataSource
-from events.events import DataEvent, StrategyEvent
+from events.events import DataEvent, StrategyEvent, StrategyType, OrderType
+from indicator_engine.indicator_engine import IndicatorEngine, rolling_mean
 from order_executor.order_executor import OrderExecutor
 from sentiment_analyzer.sentiment_analyzer import SentimentAnalyzer
 from datetime import datetime, timedelta
 from ..properties.strategy_manager_properties import MACrossoverProps
+from logger.logger import get_logger, PER_BAR
+import numpy as np
 import pandas as pd
 
+logger = get_logger("strategy_ma_crossover")
+
 
 class StrategyMACrossover(IStrategyManager):
 
@@ -27,6 +33,86 @@ class StrategyMACrossover(IStrategyManager):
                 f"Slow MA period ({self.slow_ma_period})."
             )
         self.last_sentiment_check_time: dict[str, datetime] = {}
+        # Per symbol: close array, next bar that may BUY and next bar that may SELL (for next_signal_index)
+        self._signal_tables: dict[str, tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+        self._own_indicator_engine: IndicatorEngine | None = None
+
+    def _indicator_engine(self, data_source: DataSource, data_event: DataEvent) -> IndicatorEngine:
+        """Engine of the strategy itself, when it is called without a shared one."""
+        if self._own_indicator_engine is None:
+            self._own_indicator_engine = IndicatorEngine(data_source)
+        self._own_indicator_engine.update(data_event.symbol, self.timeframe, data_event.data)
+        return self._own_indicator_engine
+
+    def generate_signals(self, bars: BarStore) -> np.ndarray:
+        """
+        Signal of every bar of a whole history in one pass, without the event stack: 1 (BUY) when
+        the fast MA is above the slow MA, -1 (SELL) when below, 0 when they are equal or there are
+        fewer than slow_ma_period bars. generate_strategy acts on the same signal when the
+        positions allow it (BUY only without longs, SELL only without shorts).
+        """
+        close = np.asarray(bars.close, dtype=np.float64)
+        fast_ma = rolling_mean(close, self.fast_ma_period)
+        slow_ma = rolling_mean(close, self.slow_ma_period)
+        signals = np.zeros(len(close), dtype=np.int8)
+        signals[fast_ma > slow_ma] = 1
+        signals[fast_ma < slow_ma] = -1
+        return signals
+
+    @property
+    def cross_section_window(self) -> int:
+        """Number of latest closes generate_cross_section needs per symbol."""
+        return self.slow_ma_period
+
+    def generate_cross_section(self, closes: np.ndarray) -> np.ndarray:
+        """
+        Signal of the current bar of many symbols at once, from a (symbols x cross_section_window)
+        matrix of their latest closes, NaN where a symbol has fewer bars (no signal then).
+        Same signal as the last bar of generate_signals.
+        """
+        fast_ma = closes[:, -self.fast_ma_period:].mean(axis=1)
+        slow_ma = closes.mean(axis=1)
+        signals = np.zeros(len(closes), dtype=np.int8)
+        signals[fast_ma > slow_ma] = 1
+        signals[fast_ma < slow_ma] = -1
+        return signals
+
+    def _next_signal_tables(self, symbol: str, close: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        cached = self._signal_tables.get(symbol)
+        if cached is not None and cached[0] is close:
+            return cached[1], cached[2]
+
+        n = len(close)
+        fast_ma = rolling_mean(close, self.fast_ma_period)
+        slow_ma = rolling_mean(close, self.slow_ma_period)
+        # Near-equal MAs count as both sides: the running sums of the per-bar path may round differently
+        tolerance = np.abs(slow_ma) * 1e-9
+        can_buy = fast_ma - slow_ma > -tolerance
+        can_sell = fast_ma - slow_ma < tolerance
+
+        def next_true(mask: np.ndarray) -> np.ndarray:
+            index = np.where(mask, np.arange(n), n)
+            return np.append(np.minimum.accumulate(index[::-1])[::-1], n)
+
+        next_buy, next_sell = next_true(can_buy), next_true(can_sell)
+        self._signal_tables[symbol] = (close, next_buy, next_sell)
+        return next_buy, next_sell
+
+    def next_signal_index(self, symbol: str, bars: BarStore, start: int, open_positions: dict[str, int]) -> int:
+        """
+        First bar at or after start on which generate_strategy could return a signal while the
+        open positions stay as given, len(bars) if there is none. Flat, any side of the crossover
+        can signal; long, only a fast MA below the slow one; short, only above. The anomaly
+        filter only removes signals, so it is ignored here.
+        """
+        if open_positions['LONG'] > 0 and open_positions['SHORT'] > 0:
+            return len(bars)
+        next_buy, next_sell = self._next_signal_tables(symbol, bars.close)
+        if open_positions['LONG'] > 0:
+            return int(next_sell[start])
+        if open_positions['SHORT'] > 0:
+            return int(next_buy[start])
+        return int(min(next_buy[start], next_sell[start]))
 
     def generate_strategy(
         self,
@@ -39,29 +125,23 @@ class StrategyMACrossover(IStrategyManager):
             IsolationForestAnomalyDetector
             | BacktestIsolationForestAnomalyDetector
             | None
-        ) = None
+        ) = None,
+        indicator_engine: IndicatorEngine | None = None,
+        signal: int | None = None  # Given when computed for many symbols at once (generate_cross_section)
     ) -> StrategyEvent | None:  # The strategy may not return anything
         symbol = data_event.symbol
+        if signal is None:
+            if indicator_engine is None:
+                indicator_engine = self._indicator_engine(data_source, data_event)
 
-        # Determine how many bars are needed: the maximum between slow_ma_period and
-        # anomaly_detector.window_size
-        bars_to_fetch = self.slow_ma_period
-        if anomaly_detector and anomaly_detector.trained:
-            bars_to_fetch = max(self.slow_ma_period, anomaly_detector.window_size)
-
-        bars = data_source.get_latest_closed_bars(symbol, self.timeframe, bars_to_fetch)
-
-        if len(bars) < self.slow_ma_period:  # Not enough bars for MA calculation
-            # print(
-            #     f"MA Crossover: Not enough bars ({len(bars)}) for MA calculation "
-            #     f"(slow_ma_period: {self.slow_ma_period}) for {symbol}."
-            # )
-            return None
+            # Running moving averages, updated once per bar; None until there are slow_ma_period bars
+            fast_ma = indicator_engine.sma(symbol, self.timeframe, self.fast_ma_period)
+            slow_ma = indicator_engine.sma(symbol, self.timeframe, self.slow_ma_period)
+            if slow_ma is None:  # Not enough bars for MA calculation
+                return None
+            signal = 1 if fast_ma > slow_ma else -1 if fast_ma < slow_ma else 0
 
         open_positions = portfolio.get_number_of_strategy_open_positions_by_symbol(symbol)
-        ma_bars = bars.iloc[-self.slow_ma_period:]  # Use only the necessary bars for MA
-        fast_ma = ma_bars['close'][-self.fast_ma_period:].mean()
-        slow_ma = ma_bars['close'].mean()
 
         # Variables for aggregated sentiment
         avg_sentiment_score = 0.0
@@ -85,16 +165,16 @@ class StrategyMACrossover(IStrategyManager):
             if last_check_time_for_symbol and (
                 current_time - last_check_time_for_symbol < timedelta(days=14)
             ):
-                print(
-                    f"MA Crossover: Sentiment analysis for {symbol} skipped, last check was on "
-                    f"{last_check_time_for_symbol.strftime('%Y-%m-%d %H:%M:%S')}."
+                logger.debug(
+                    "MA Crossover: Sentiment analysis for %s skipped, last check was on %s.",
+                    symbol, last_check_time_for_symbol, extra=PER_BAR
                 )
                 perform_sentiment_analysis_now = False
 
             if perform_sentiment_analysis_now:
                 sentiment_analysis_attempted_this_tick = True  # Mark that it was attempted
                 try:
-                    print(f"MA Crossover: Performing sentiment analysis for {symbol}.")
+                    logger.info("MA Crossover: Performing sentiment analysis for %s.", symbol)
                     if isinstance(sentiment_analyzer, SentimentAnalyzer):
                         sentiment_info = sentiment_analyzer.analyze_sentiment_last_week(
                             query=symbol, page_size=20
@@ -102,7 +182,7 @@ class StrategyMACrossover(IStrategyManager):
                     elif isinstance(sentiment_analyzer, BacktestSentimentAnalyzer):
                         sentiment_info = sentiment_analyzer.get_sentiment_for_bar_date(
                             query_ticker=symbol,
-                            bar_date=bars.index[-1],
+                            bar_date=data_event.data.name,
                             lookback_days=7,
                             articles_to_analyze=50
                         )
@@ -113,23 +193,23 @@ class StrategyMACrossover(IStrategyManager):
                         avg_sentiment_score = sentiment_info.get("average_sentiment_score", 0.0)
                         total_analyzed = sentiment_info.get("total_analyzed", 0)
                         sufficient_news_for_decision = total_analyzed >= 3
-                        print(
-                            f"MA Crossover: Aggregated sentiment for {symbol} (last week): "
-                            f"Avg Score={avg_sentiment_score:.2f}, Analyzed={total_analyzed}"
+                        logger.info(
+                            "MA Crossover: Aggregated sentiment for %s (last week): Avg Score=%.2f, Analyzed=%s",
+                            symbol, avg_sentiment_score, total_analyzed
                         )
                 except Exception as e:
-                    print(f"Error getting sentiment for {symbol}: {e}")
+                    logger.error("Error getting sentiment for %s: %s", symbol, e)
 
-        if open_positions['LONG'] == 0 and fast_ma > slow_ma:
+        if open_positions['LONG'] == 0 and signal > 0:
             if open_positions['SHORT'] > 0:
                 # The logic for closing the opposite position is already in OrderExecutor
-                order_executor.close_strategy_short_positions_by_symbol(symbol)
+                order_executor.close_strategy_short_positions_by_symbol(symbol, magic_number=portfolio.magic)
             strategy = 'BUY'
 
-        elif open_positions['SHORT'] == 0 and fast_ma < slow_ma:
+        elif open_positions['SHORT'] == 0 and signal < 0:
             if open_positions['LONG'] > 0:
                 # The logic for closing the opposite position is already in OrderExecutor
-                order_executor.close_strategy_long_positions_by_symbol(symbol)
+                order_executor.close_strategy_long_positions_by_symbol(symbol, magic_number=portfolio.magic)
             strategy = 'SELL'
 
         else:
@@ -139,6 +219,8 @@ class StrategyMACrossover(IStrategyManager):
         # Only act on sentiment if there is enough news analyzed
         # --- Anomaly Detection Logic ---
         if strategy != '' and anomaly_detector and anomaly_detector.trained:
+            # The window of bars is only fetched for the bars that have a signal to check
+            bars = data_source.get_latest_closed_bars(symbol, self.timeframe, anomaly_detector.window_size)
             if len(bars) >= anomaly_detector.window_size:
                 # Get the DataFrame slice for the anomaly window
                 # The anomaly detector expects a DataFrame slice, not just the closing prices
@@ -148,72 +230,72 @@ class StrategyMACrossover(IStrategyManager):
                 # Check if all required features are present in window_df_slice
                 missing_features = [f for f in anomaly_detector.features if f not in window_df_slice.columns]
                 if missing_features:
-                    print(
-                        f"MA Crossover: Anomaly detection for {symbol} skipped. "
-                        f"Missing features in data: {missing_features}"
+                    logger.warning(
+                        "MA Crossover: Anomaly detection for %s skipped. Missing features in data: %s",
+                        symbol, missing_features
                     )
                 else:
                     # The threshold is configured within the anomaly_detector instance
                     if anomaly_detector.is_window_anomalous(window_df_slice, threshold=None):
-                        print(
-                            (
-                                f"MA Crossover: Anomalous market condition detected for {symbol} "
-                                f"at {data_event.data.name}. Suppressing {strategy} signal."
-                            )
+                        logger.info(
+                            "MA Crossover: Anomalous market condition detected for %s at %s. "
+                            "Suppressing %s signal.",
+                            symbol, data_event.data.name, strategy
                         )
                         strategy = ''  # Suppress signal
                     else:
-                        print(
-                            f"MA Crossover: Market condition for {symbol} at {data_event.data.name} " +
-                            "considered normal by the anomaly detector."
+                        logger.debug(
+                            "MA Crossover: Market condition for %s at %s considered normal by the anomaly detector.",
+                            symbol, data_event.data.name, extra=PER_BAR
                         )
             else:
-                print(
-                    f"MA Crossover: Not enough bars ({len(bars)}) for anomaly detection " +
-                    f"(window_size: {anomaly_detector.window_size}) para {symbol}. " +
-                    "The signal proceeds without anomaly check."
+                logger.debug(
+                    "MA Crossover: Not enough bars (%s) for anomaly detection (window_size: %s) para %s. "
+                    "The signal proceeds without anomaly check.",
+                    len(bars), anomaly_detector.window_size, symbol, extra=PER_BAR
                 )
         # --- End of Anomaly Detection Logic ---
 
         # Apply sentiment logic only if the strategy was not suppressed by anomaly
         if strategy != '' and sentiment_analysis_attempted_this_tick:
-            print(
-                f"MA Crossover: Evaluating sentiment for {symbol} for {strategy} signal. " +
-                f"Sufficient news: {sufficient_news_for_decision}, " +
-                f"Average score: {avg_sentiment_score:.2f}, " +
-                f"Analyzed: {total_analyzed}"
+            logger.info(
+                "MA Crossover: Evaluating sentiment for %s for %s signal. "
+                "Sufficient news: %s, Average score: %.2f, Analyzed: %s",
+                symbol, strategy, sufficient_news_for_decision, avg_sentiment_score, total_analyzed
             )
             if sufficient_news_for_decision:
                 if (
                     strategy == 'BUY'
                     and avg_sentiment_score < -0.1
                 ):  # Strong negative sentiment, ignore BUY
-                    print(
-                        f"MA Crossover: BUY signal for {symbol} ignored due to overall "
-                        f"negative sentiment (Average Score: {avg_sentiment_score:.2f})"
+                    logger.info(
+                        "MA Crossover: BUY signal for %s ignored due to overall "
+                        "negative sentiment (Average Score: %.2f)",
+                        symbol, avg_sentiment_score
                     )
                     strategy = ''
                 elif (
                     strategy == 'SELL'
                     and avg_sentiment_score > 0.1
                 ):  # Strong positive sentiment, ignore SELL
-                    print(
-                        f"MA Crossover: SELL signal for {symbol} ignored due to overall "
-                        f"positive sentiment (Average Score: {avg_sentiment_score:.2f})"
+                    logger.info(
+                        "MA Crossover: SELL signal for %s ignored due to overall "
+                        "positive sentiment (Average Score: %.2f)",
+                        symbol, avg_sentiment_score
                     )
                     strategy = ''
             else:  # sufficient_news_for_decision is False, but analysis was attempted
-                print(
-                    f"MA Crossover: Not enough news analyzed ({total_analyzed}) for {symbol} "
-                    f"to modify strategy based on sentiment, or analysis did not yield sufficient data."
+                logger.info(
+                    "MA Crossover: Not enough news analyzed (%s) for %s "
+                    "to modify strategy based on sentiment, or analysis did not yield sufficient data.",
+                    total_analyzed, symbol
                 )
 
         if strategy != '':
-            print(f"Signal generated: StrategyType.{strategy} for {symbol}")
             strategy_event = StrategyEvent(
                 symbol=symbol,
-                strategy=strategy,
-                target_order='MARKET',
+                strategy=StrategyType(strategy),
+                target_order=OrderType.MARKET,
                 target_price=0.0,
                 magic_number=portfolio.magic,
                 stop_loss=0.0,
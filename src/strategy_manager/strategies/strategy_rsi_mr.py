@@ -1,8 +1,12 @@
+from anomaly_detector.anomaly_detector import IsolationForestAnomalyDetector
+from backtesting.anomaly_detector_mt5.anomaly_detector_mt5 import BacktestIsolationForestAnomalyDetector
 from backtesting.sentiment_analyzer_mt5.sentiment_analyzer_mt5 import BacktestSentimentAnalyzer
 from portfolio.portfolio import Portfolio
 from ..interfaces.strategy_manager_interface import IStrategyManager
 from data_source.data_source import DataSource
-from events.events import DataEvent, StrategyEvent
+from events.events import DataEvent, StrategyEvent, StrategyType, OrderType
+from indicator_engine.indicator_engine import IndicatorEngine, rsi_values
+from bar_store.bar_store import BarStore
 from order_executor.order_executor import OrderExecutor
 from sentiment_analyzer.sentiment_analyzer import SentimentAnalyzer
 from datetime import datetime, timedelta
@@ -10,6 +14,9 @@ from ..properties.strategy_manager_properties import RSIProps
 import pandas as pd
 import numpy as np
 import MetaTrader5 as mt5
+from logger.logger import get_logger, PER_BAR
+
+logger = get_logger("strategy_rsi_mr")
 
 
 class StrategyRSI(IStrategyManager):
@@ -47,6 +54,7 @@ class StrategyRSI(IStrategyManager):
         else:
             self.tp_points = 0.0
         self.last_sentiment_check_time: dict[str, datetime] = {}
+        self._own_indicator_engine: IndicatorEngine | None = None
 
     def comput_rsi(self, prices: pd.Series) -> float:
 
@@ -60,19 +68,72 @@ class StrategyRSI(IStrategyManager):
 
         return rsi
 
+    def generate_signals(self, bars: BarStore) -> np.ndarray:
+        """
+        Signal of every bar of a whole history in one pass, without the event stack: 1 (BUY) when
+        the RSI is below rsi_lower, -1 (SELL) above rsi_upper, else 0. generate_strategy acts on
+        the same signal when the positions allow it (BUY only without longs, SELL only without shorts).
+        """
+        rsi = rsi_values(np.asarray(bars.close, dtype=np.float64), self.rsi_period)
+        signals = np.zeros(len(rsi), dtype=np.int8)
+        signals[rsi < self.rsi_lower] = 1
+        signals[rsi > self.rsi_upper] = -1
+        return signals
+
+    @property
+    def cross_section_window(self) -> int:
+        """Number of latest closes generate_cross_section needs per symbol."""
+        return self.rsi_period + 1
+
+    def generate_cross_section(self, closes: np.ndarray) -> np.ndarray:
+        """
+        Signal of the current bar of many symbols at once, from a (symbols x cross_section_window)
+        matrix of their latest closes, NaN where a symbol has fewer bars (the RSI then uses the
+        changes available, as comput_rsi). Same signal as the last bar of generate_signals.
+        """
+        deltas = np.diff(closes, axis=1)
+        gains = np.where(deltas > 0, deltas, 0)
+        losses = np.where(deltas < 0, -deltas, 0)
+        count = np.count_nonzero(~np.isnan(deltas), axis=1)
+        average_gain = np.divide(gains.sum(axis=1), count, out=np.zeros(len(closes)), where=count > 0)
+        average_loss = np.divide(losses.sum(axis=1), count, out=np.zeros(len(closes)), where=count > 0)
+        rs = np.divide(average_gain, average_loss, out=np.zeros(len(closes)), where=average_loss > 0)
+        rsi = 100 - (100 / (1 + rs))
+        signals = np.zeros(len(closes), dtype=np.int8)
+        signals[rsi < self.rsi_lower] = 1
+        signals[rsi > self.rsi_upper] = -1
+        return signals
+
+    def _indicator_engine(self, data_source: DataSource, data_event: DataEvent) -> IndicatorEngine:
+        """Engine of the strategy itself, when it is called without a shared one."""
+        if self._own_indicator_engine is None:
+            self._own_indicator_engine = IndicatorEngine(data_source)
+        self._own_indicator_engine.update(data_event.symbol, self.timeframe, data_event.data)
+        return self._own_indicator_engine
+
     def generate_strategy(
         self,
         data_event: DataEvent,
         data_source: DataSource,
         portfolio: Portfolio,
         order_executor: OrderExecutor,
-        sentiment_analyzer: SentimentAnalyzer | BacktestSentimentAnalyzer | None = None
+        sentiment_analyzer: SentimentAnalyzer | BacktestSentimentAnalyzer | None = None,
+        anomaly_detector: (
+            IsolationForestAnomalyDetector
+            | BacktestIsolationForestAnomalyDetector
+            | None
+        ) = None,  # Not used by this strategy
+        indicator_engine: IndicatorEngine | None = None,
+        signal: int | None = None  # Given when computed for many symbols at once (generate_cross_section)
     ) -> StrategyEvent:
         symbol = data_event.symbol
+        if signal is None:
+            if indicator_engine is None:
+                indicator_engine = self._indicator_engine(data_source, data_event)
 
-        bars = data_source.get_latest_closed_bars(symbol, self.timeframe, self.rsi_period + 1)
-
-        rsi = self.comput_rsi(bars['close'])
+            # Same values as comput_rsi() over the last rsi_period + 1 closes, kept as running sums
+            rsi = indicator_engine.rsi(symbol, self.timeframe, self.rsi_period, smoothing="simple")
+            signal = 1 if rsi < self.rsi_lower else -1 if rsi > self.rsi_upper else 0
 
         open_positions = portfolio.get_number_of_strategy_open_positions_by_symbol(symbol)
 
@@ -93,15 +154,15 @@ class StrategyRSI(IStrategyManager):
             if last_check_time_for_symbol and (
                 current_time - last_check_time_for_symbol < timedelta(days=14)
             ):
-                print(
-                    f"RSI: Sentiment analysis for {symbol} skipped, last check was on "
-                    f"{last_check_time_for_symbol.strftime('%Y-%m-%d %H:%M:%S')}."
+                logger.debug(
+                    "RSI: Sentiment analysis for %s skipped, last check was on %s.",
+                    symbol, last_check_time_for_symbol, extra=PER_BAR
                 )
                 perform_sentiment_analysis = False
 
             if perform_sentiment_analysis:
                 try:
-                    print(f"RSI: Performing sentiment analysis for {symbol}.")
+                    logger.info("RSI: Performing sentiment analysis for %s.", symbol)
                     sentiment_info = sentiment_analyzer.analyze_sentiment_last_week(
                         query=symbol, page_size=10
                     )
@@ -110,23 +171,23 @@ class StrategyRSI(IStrategyManager):
                         avg_sentiment_score = sentiment_info.get("average_sentiment_score", 0.0)
                         total_analyzed = sentiment_info.get("total_analyzed", 0)
                         sufficient_news_for_decision = total_analyzed >= 3
-                        print(
-                            f"RSI: Aggregated sentiment for {symbol} (last week): "
-                            f"Avg Score={avg_sentiment_score:.2f}, Analyzed={total_analyzed}"
+                        logger.info(
+                            "RSI: Aggregated sentiment for %s (last week): Avg Score=%.2f, Analyzed=%s",
+                            symbol, avg_sentiment_score, total_analyzed
                         )
                 except Exception as e:
-                    print(f"Error getting sentiment for {symbol}: {e}")
+                    logger.error("Error getting sentiment for %s: %s", symbol, e)
 
-        if open_positions['LONG'] == 0 and rsi < self.rsi_lower:
+        if open_positions['LONG'] == 0 and signal > 0:
             if open_positions['SHORT'] > 0:
-                order_executor.close_strategy_short_positions_by_symbol(symbol)
+                order_executor.close_strategy_short_positions_by_symbol(symbol, magic_number=portfolio.magic)
             strategy = 'BUY'
             stop_loss = last_tick['ask'] - self.sl_points * points if self.sl_points > 0 else 0
             take_profit = last_tick['ask'] + self.tp_points * points if self.tp_points > 0 else 0
 
-        elif open_positions['SHORT'] == 0 and rsi > self.rsi_upper:
+        elif open_positions['SHORT'] == 0 and signal < 0:
             if open_positions['LONG'] > 0:
-                order_executor.close_strategy_long_positions_by_symbol(symbol)
+                order_executor.close_strategy_long_positions_by_symbol(symbol, magic_number=portfolio.magic)
             strategy = 'SELL'
             stop_loss = last_tick['bid'] + self.sl_points * points if self.sl_points > 0 else 0
             take_profit = last_tick['bid'] - self.tp_points * points if self.tp_points > 0 else 0
@@ -138,16 +199,16 @@ class StrategyRSI(IStrategyManager):
         if sufficient_news_for_decision:
             # Example: if the average sentiment is markedly negative, do not buy.
             if strategy == 'BUY' and avg_sentiment_score < -0.15:  # Stricter threshold for RSI
-                print(
-                    f"RSI: BUY signal for {symbol} ignored due to strong overall NEGATIVE "
-                    f"sentiment (Avg Score: {avg_sentiment_score:.2f})"
+                logger.info(
+                    "RSI: BUY signal for %s ignored due to strong overall NEGATIVE sentiment (Avg Score: %.2f)",
+                    symbol, avg_sentiment_score
                 )
                 strategy = ''
             # Example: if the average sentiment is markedly positive, do not short sell.
             elif strategy == 'SELL' and avg_sentiment_score > 0.15:  # Stricter threshold for RSI
-                print(
-                    f"RSI: SELL signal for {symbol} ignored due to strong overall POSITIVE "
-                    f"sentiment (Avg Score: {avg_sentiment_score:.2f})"
+                logger.info(
+                    "RSI: SELL signal for %s ignored due to strong overall POSITIVE sentiment (Avg Score: %.2f)",
+                    symbol, avg_sentiment_score
                 )
                 strategy = ''
 
@@ -155,11 +216,11 @@ class StrategyRSI(IStrategyManager):
 
             strategy_event = StrategyEvent(
                 symbol=symbol,
-                strategy=strategy,
-                target_order='MARKET',
+                strategy=StrategyType(strategy),
+                target_order=OrderType.MARKET,
                 target_price=0.0,
                 magic_number=portfolio.magic,
-                stop_loss=stop_loss,
-                take_profit=take_profit
+                stop_loss=float(stop_loss),
+                take_profit=float(take_profit)
             )
             return strategy_event
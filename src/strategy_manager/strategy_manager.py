@@ -1,3 +1,8 @@
+import copy
+import threading
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
 from anomaly_detector.anomaly_detector import IsolationForestAnomalyDetector
 from backtesting.anomaly_detector_mt5.anomaly_detector_mt5 import BacktestIsolationForestAnomalyDetector
 from backtesting.sentiment_analyzer_mt5.sentiment_analyzer_mt5 import BacktestSentimentAnalyzer
@@ -8,25 +13,132 @@ from order_executor.order_executor import OrderExecutor
 from .properties.strategy_manager_properties import BaseStrategyProps, MACrossoverProps, RSIProps
 from .strategies.strategy_rsi_mr import StrategyRSI
 from .strategies.strategy_ma_crossover import StrategyMACrossover
-from events.events import DataEvent
+from bar_store.bar_store import BarStore
+from indicator_engine.indicator_engine import CrossSectionWindow, IndicatorEngine
+from events.events import DataEvent, StrategyEvent
 from sentiment_analyzer.sentiment_analyzer import SentimentAnalyzer
+from utils.utils import Utils
+from logger.logger import get_logger
 from queue import Queue
 
+logger = get_logger("strategy_manager")
+
+
+@dataclass
+class HostedStrategy:
+    """A strategy run by a StrategyManager, with the portfolio of its own magic number."""
+    magic_number: int
+    properties: BaseStrategyProps
+    strategy: IStrategyManager
+    portfolio: Portfolio
+    cross_section: CrossSectionWindow | None = None
+
+
+class _EventDataSnapshot:
+    """
+    Data source seen by the strategies for one event: the closed bars and ticks they request
+    are fetched once and shared, and every strategy sees the same values. A request for fewer
+    bars than already fetched is served from the fetched ones.
+    """
+
+    def __init__(self, data_source: DataSource):
+        self.DATA_SOURCE = data_source
+        self._bar_arrays: dict[tuple[str, str], tuple[int, BarStore]] = {}
+        self._bar_frames: dict[tuple[str, str], tuple[int, object]] = {}
+        self._ticks: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def get_latest_closed_bars_array(self, symbol: str, timeframe: str, num_bars: int = 1) -> BarStore:
+        with self._lock:
+            fetched, bars = self._bar_arrays.get((symbol, timeframe), (0, None))
+            if fetched < num_bars:
+                fetched, bars = num_bars, self.DATA_SOURCE.get_latest_closed_bars_array(symbol, timeframe, num_bars)
+                self._bar_arrays[(symbol, timeframe)] = (fetched, bars)
+        return bars.slice(max(0, len(bars) - num_bars), len(bars))
+
+    def get_latest_closed_bars(self, symbol: str, timeframe: str, num_bars: int = 1):
+        with self._lock:
+            fetched, bars = self._bar_frames.get((symbol, timeframe), (0, None))
+            if fetched < num_bars:
+                fetched, bars = num_bars, self.DATA_SOURCE.get_latest_closed_bars(symbol, timeframe, num_bars)
+                self._bar_frames[(symbol, timeframe)] = (fetched, bars)
+        return bars.iloc[-num_bars:]
+
+    def get_latest_tick(self, symbol: str) -> dict:
+        with self._lock:
+            tick = self._ticks.get(symbol)
+            if tick is None:
+                tick = self._ticks[symbol] = self.DATA_SOURCE.get_latest_tick(symbol)
+        return dict(tick)
+
+    def __getattr__(self, name: str):
+        return getattr(self.DATA_SOURCE, name)
+
+
+class _DeferredOrderExecutor:
+    """
+    Order executor given to a strategy run in a worker thread: its calls (closing the opposite
+    positions) are recorded and replayed later on the calling thread, in the order of the strategies.
+    Only the closing methods can be deferred; anything else is not available to the strategy there.
+    """
+
+    DEFERRABLE_METHODS = frozenset({
+        "close_position_by_ticket",
+        "close_strategy_positions_by_symbol",
+        "close_strategy_long_positions_by_symbol",
+        "close_strategy_short_positions_by_symbol",
+    })
+
+    def __init__(self, order_executor: OrderExecutor):
+        self.ORDER_EXECUTOR = order_executor
+        self.calls: list[tuple[str, tuple, dict]] = []
+
+    def __getattr__(self, name: str):
+        if name not in self.DEFERRABLE_METHODS:
+            raise AttributeError(f"{name} cannot be called on the order executor from a strategy worker thread.")
+
+        def record(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+        return record
+
+    def take_calls(self) -> list[tuple[str, tuple, dict]]:
+        calls, self.calls = self.calls, []
+        return calls
+
+    def replay(self, calls: list[tuple[str, tuple, dict]]) -> None:
+        for name, args, kwargs in calls:
+            getattr(self.ORDER_EXECUTOR, name)(*args, **kwargs)
+
 
 class StrategyManager(IStrategyManager):
+    """
+    Runs one or several strategies on every DATA event. Several strategies are given as a dict
+    of properties by magic number: each one trades with its own magic number (positions, signals
+    and closes), and all of them read one snapshot of the bars and ticks of the event, fetched
+    once. With max_workers > 1 the strategies are evaluated in a thread pool, which pays off when
+    they release the GIL (NumPy, model inference, network calls); their order closes and signals
+    are still applied in the order of the strategies, so the result is the same as sequentially.
+
+    A strategy whose timeframe is one of the resample_timeframes of the data source runs on the
+    DATA events of that timeframe, built from the bars of the data source without other requests.
+    """
+
     def __init__(
         self,
         events_queue: Queue,
         data_source: DataSource,
         portfolio: Portfolio,
         order_executor: OrderExecutor,
-        strategy_properties: BaseStrategyProps,
+        strategy_properties: BaseStrategyProps | dict[int, BaseStrategyProps],
         sentiment_analyzer: SentimentAnalyzer | BacktestSentimentAnalyzer | None = None,
         anomaly_detector: (
             IsolationForestAnomalyDetector
             | BacktestIsolationForestAnomalyDetector
             | None
-        ) = None
+        ) = None,
+        indicator_engine: IndicatorEngine | None = None,
+        cross_sectional: bool = False,
+        max_workers: int | None = None
     ):
         self.events_queue = events_queue
         self.DATA_SOURCE = data_source
@@ -34,7 +146,51 @@ class StrategyManager(IStrategyManager):
         self.ORDER_EXECUTOR = order_executor
         self.SENTIMENT_ANALYZER = sentiment_analyzer
         self.ANOMALY_DETECTOR = anomaly_detector
-        self.strategy_manager_method = self._get_strategy_manager_method(strategy_properties)
+        # Shared with other strategy managers when given, so identical indicators are computed once
+        self.INDICATOR_ENGINE = indicator_engine or IndicatorEngine(data_source)
+        # Cross-sectional mode: the DATA events of a bar time are gathered and their signals
+        # computed for all the symbols at once in flush_cross_section()
+        if cross_sectional and sentiment_analyzer is not None:
+            raise ValueError("The cross-sectional mode does not support a sentiment analyzer.")
+        self.cross_sectional = cross_sectional
+
+        if isinstance(strategy_properties, BaseStrategyProps):
+            strategy_properties = {portfolio.magic: strategy_properties}
+        if not strategy_properties:
+            raise ValueError("StrategyManager needs at least one strategy.")
+        self.strategies: list[HostedStrategy] = []
+        for magic_number, properties in strategy_properties.items():
+            strategy = self._get_strategy_manager_method(properties)
+            self.strategies.append(HostedStrategy(
+                magic_number=magic_number,
+                properties=properties,
+                strategy=strategy,
+                portfolio=(
+                    portfolio if magic_number == portfolio.magic
+                    else Portfolio(magic_number, platform_connector=portfolio.platform_connector)
+                ),
+                cross_section=CrossSectionWindow(strategy.cross_section_window) if cross_sectional else None
+            ))
+        # DATA events of a timeframe the data source builds from its own bars (see BarResampler) go
+        # to the strategies of that timeframe, the bars of the data source to the other strategies
+        self.resampled_timeframes = frozenset(getattr(data_source, "resample_timeframes", ()))
+        self._routes: dict[str | None, tuple[list[HostedStrategy], list[str]]] = {}
+        self.thread_pool = (
+            ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="strategy")
+            if max_workers is not None and max_workers > 1 and len(self.strategies) > 1 else None
+        )
+        self._pending_events: list[DataEvent] = []
+
+    @property
+    def magic_numbers(self) -> list[int]:
+        """Magic numbers of the hosted strategies, e.g. for the exposure checked by RiskManager."""
+        return [hosted.magic_number for hosted in self.strategies]
+
+    def shutdown(self) -> None:
+        """Stop the worker threads of the strategies, if any; later events are handled on the calling thread."""
+        if self.thread_pool is not None:
+            self.thread_pool.shutdown()
+            self.thread_pool = None
 
     def _get_strategy_manager_method(self, strategy_properties: BaseStrategyProps) -> IStrategyManager:
         if isinstance(strategy_properties, MACrossoverProps):
@@ -48,15 +204,225 @@ class StrategyManager(IStrategyManager):
         self,
         data_event: DataEvent,
     ) -> None:
-        strategy_event = self.strategy_manager_method.generate_strategy(
+        if self.cross_sectional:
+            self._pending_events.append(data_event)
+            return
+        strategies, timeframes = self._route(data_event.timeframe)
+        # The indicators are fed once per timeframe used by the strategies: the bar goes to the
+        # series of its own timeframe, the others fetch their bars closed by the end of it
+        for timeframe in timeframes:
+            if data_event.timeframe is None or timeframe.upper() == data_event.timeframe.upper():
+                self.INDICATOR_ENGINE.update(data_event.symbol, timeframe, data_event.data)
+            else:
+                bar_end = data_event.data.time + Utils.timeframe_to_seconds(data_event.timeframe)
+                self.INDICATOR_ENGINE.refresh(data_event.symbol, timeframe, bar_end)
+        if strategies:
+            self._run_strategies([(hosted, [(data_event, None)]) for hosted in strategies])
+
+    def _route(self, timeframe: str | None) -> tuple[list[HostedStrategy], list[str]]:
+        """Strategies that handle the DATA events of timeframe, and the timeframes of their indicators."""
+        route = self._routes.get(timeframe)
+        if route is None:
+            if timeframe in self.resampled_timeframes:
+                strategies = [hosted for hosted in self.strategies if hosted.properties.timeframe.upper() == timeframe]
+            else:
+                strategies = [
+                    hosted for hosted in self.strategies
+                    if hosted.properties.timeframe.upper() not in self.resampled_timeframes
+                ]
+            route = (strategies, list(dict.fromkeys(hosted.properties.timeframe for hosted in strategies)))
+            self._routes[timeframe] = route
+        return route
+
+    def _run_strategies(self, work: list[tuple[HostedStrategy, list[tuple[DataEvent, int | None]]]]) -> None:
+        """
+        Call every strategy on its (event, signal) pairs and put the resulting StrategyEvents,
+        strategy after strategy. A single strategy reads the data source directly.
+        """
+        data_source = self.DATA_SOURCE if len(self.strategies) == 1 else _EventDataSnapshot(self.DATA_SOURCE)
+        if self.thread_pool is None:
+            for hosted, calls in work:
+                for data_event, signal in calls:
+                    strategy_event = self._call_strategy(hosted, data_event, signal, data_source, self.ORDER_EXECUTOR)
+                    self._put_strategy_event(data_event, strategy_event)
+            return
+
+        def run(hosted: HostedStrategy, calls: list[tuple[DataEvent, int | None]], order_executor):
+            results = []
+            for data_event, signal in calls:
+                strategy_event = self._call_strategy(hosted, data_event, signal, data_source, order_executor)
+                results.append((data_event, strategy_event, order_executor.take_calls()))
+            return results
+
+        executors = [_DeferredOrderExecutor(self.ORDER_EXECUTOR) for _ in work]
+        futures = [
+            self.thread_pool.submit(run, hosted, calls, executor)
+            for (hosted, calls), executor in zip(work, executors)
+        ]
+        for executor, future in zip(executors, futures):
+            for data_event, strategy_event, order_calls in future.result():
+                executor.replay(order_calls)
+                self._put_strategy_event(data_event, strategy_event)
+
+    def _call_strategy(
+        self,
+        hosted: HostedStrategy,
+        data_event: DataEvent,
+        signal: int | None,
+        data_source: DataSource,
+        order_executor: OrderExecutor
+    ) -> StrategyEvent | None:
+        arguments = (
             data_event,
-            self.DATA_SOURCE,
-            self.PORTFOLIO,
-            self.ORDER_EXECUTOR,
+            data_source,
+            hosted.portfolio,
+            order_executor,
             self.SENTIMENT_ANALYZER,
-            self.ANOMALY_DETECTOR
+            self.ANOMALY_DETECTOR,
+            self.INDICATOR_ENGINE
         )
+        if signal is None:
+            return hosted.strategy.generate_strategy(*arguments)
+        return hosted.strategy.generate_strategy(*arguments, signal=signal)
+
+    def flush_cross_section(self) -> bool:
+        """
+        Cross-sectional mode: compute the signals of every symbol gathered since the last flush
+        with one vectorized call over a (symbols x window) matrix of their latest closes, then let
+        the strategy act, one StrategyEvent per symbol as in the per-bar mode, only for the symbols
+        whose positions allow their signal. Called by the directors once the DATA events of a bar
+        time are handled. Returns whether there was anything to flush.
+        """
+        if not self._pending_events:
+            return False
+        pending_events, self._pending_events = self._pending_events, []
+        work = []
+        for hosted in self.strategies:
+            events = [event for event in pending_events if hosted in self._route(event.timeframe)[0]]
+            if not events:
+                continue
+            cross_section = hosted.cross_section
+            rows = np.empty(len(events), dtype=np.int64)
+            updated = []
+            for position, event in enumerate(events):
+                row = cross_section.rows.get(event.symbol)
+                if row is None:
+                    # The history of a new symbol already ends with the current bar
+                    history = self.DATA_SOURCE.get_latest_closed_bars_array(
+                        event.symbol, hosted.properties.timeframe, cross_section.window
+                    )
+                    row = cross_section.add(event.symbol, np.asarray(history.close, dtype=np.float64))
+                else:
+                    updated.append(position)
+                rows[position] = row
+            if updated:
+                cross_section.update(rows[updated], np.array([events[position].data.close for position in updated]))
 
+            signals = hosted.strategy.generate_cross_section(cross_section.matrix(rows))
+            open_positions = hosted.portfolio.get_number_of_strategy_open_positions_by_symbols()
+            calls = []
+            for event, signal in zip(events, signals.tolist()):
+                counts = open_positions.get(event.symbol)
+                if signal == 0 or (counts is not None and counts['LONG' if signal > 0 else 'SHORT'] > 0):
+                    continue  # Same outcome as generate_strategy: nothing to do
+                calls.append((event, signal))
+            work.append((hosted, calls))
+        self._run_strategies(work)
+        return True
+
+    def _put_strategy_event(self, data_event: DataEvent, strategy_event: StrategyEvent | None) -> None:
         if strategy_event is not None:
+            if data_event.trace is not None:
+                strategy_event = replace(strategy_event, trace=data_event.trace.mark("strategy"))
             self.events_queue.put(strategy_event)
-            print(f"Signal generated: {strategy_event.strategy} for {strategy_event.symbol}")
+            logger.info(
+                "Signal generated",
+                extra={"fields": {
+                    "symbol": strategy_event.symbol,
+                    "strategy": strategy_event.strategy.value,
+                    "magic": strategy_event.magic_number
+                }}
+            )
+
+    def generate_signals(self, bars: BarStore) -> np.ndarray:
+        """Signals of the strategy over a whole history, see the generate_signals of the strategies."""
+        if len(self.strategies) > 1:
+            raise ValueError("generate_signals is only available with a single strategy.")
+        return self.strategies[0].strategy.generate_signals(bars)
+
+    def next_signal_index(self, symbol: str, bars: BarStore, start: int) -> int | None:
+        """
+        First bar of symbol at or after start that could produce a signal with the current open
+        positions, as declared by the strategies (the earliest of them); None when any strategy
+        does not declare it or a sentiment analyzer is used (its checks depend on every bar being
+        evaluated).
+        """
+        if self.SENTIMENT_ANALYZER is not None:
+            return None
+        indices = []
+        for hosted in self.strategies:
+            next_signal_index = getattr(hosted.strategy, "next_signal_index", None)
+            if next_signal_index is None:
+                return None
+            open_positions = hosted.portfolio.get_number_of_strategy_open_positions_by_symbol(symbol)
+            indices.append(next_signal_index(symbol, bars, start, open_positions))
+        return min(indices)
+
+    def skip_bars(self, symbol: str, bars: BarStore) -> None:
+        """Bars replayed without DATA events (fast-forward backtests) still update the indicators."""
+        bar_timeframe = self.DATA_SOURCE.timeframe_name
+        for timeframe in self._route(None)[1]:
+            if timeframe.upper() == bar_timeframe:
+                self.INDICATOR_ENGINE.update_bars(symbol, timeframe, bars)
+            else:
+                bar_end = int(bars.time[-1]) + Utils.timeframe_to_seconds(bar_timeframe)
+                self.INDICATOR_ENGINE.refresh(symbol, timeframe, bar_end)
+
+    def _strategies_key(self) -> list[dict]:
+        return [
+            {
+                "magic_number": hosted.magic_number,
+                "strategy": type(hosted.strategy).__name__,
+                "properties": hosted.properties.model_dump()
+            }
+            for hosted in self.strategies
+        ]
+
+    def get_state(self) -> dict:
+        """
+        State kept across bars for backtest snapshots: the attributes of every strategy (e.g. the
+        last sentiment check per symbol; private caches are left out), the indicators, the backtest
+        sentiment cache and the trained backtest anomaly model.
+        """
+        strategies = self._strategies_key()
+        for entry, hosted in zip(strategies, self.strategies):
+            entry["strategy_state"] = copy.deepcopy({
+                name: value for name, value in vars(hosted.strategy).items() if not name.startswith("_")
+            })
+            if hosted.cross_section is not None:
+                entry["cross_section"] = hosted.cross_section.get_state()
+        state = {"strategies": strategies, "indicator_engine": self.INDICATOR_ENGINE.get_state()}
+        if isinstance(self.SENTIMENT_ANALYZER, BacktestSentimentAnalyzer):
+            state["sentiment_analyzer"] = self.SENTIMENT_ANALYZER.get_state()
+        if isinstance(self.ANOMALY_DETECTOR, BacktestIsolationForestAnomalyDetector):
+            state["anomaly_detector"] = self.ANOMALY_DETECTOR.get_state()
+        return state
+
+    def restore_state(self, state: dict) -> None:
+        strategies = self._strategies_key()
+        snapshot_strategies = [
+            {name: entry[name] for name in ("magic_number", "strategy", "properties")} for entry in state["strategies"]
+        ]
+        if snapshot_strategies != strategies:
+            raise ValueError(f"Snapshot of {snapshot_strategies} cannot be restored on {strategies}.")
+        for entry, hosted in zip(state["strategies"], self.strategies):
+            vars(hosted.strategy).update(copy.deepcopy(entry["strategy_state"]))
+            if hosted.cross_section is not None:
+                if "cross_section" not in entry:
+                    raise ValueError("The snapshot was not taken in cross-sectional mode.")
+                hosted.cross_section.restore_state(entry["cross_section"])
+        self.INDICATOR_ENGINE.restore_state(state["indicator_engine"])
+        if "sentiment_analyzer" in state and isinstance(self.SENTIMENT_ANALYZER, BacktestSentimentAnalyzer):
+            self.SENTIMENT_ANALYZER.restore_state(state["sentiment_analyzer"])
+        if "anomaly_detector" in state and isinstance(self.ANOMALY_DETECTOR, BacktestIsolationForestAnomalyDetector):
+            self.ANOMALY_DETECTOR.restore_state(state["anomaly_detector"])
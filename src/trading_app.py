@@ -11,13 +11,17 @@ from risk_manager.risk_manager import RiskManager
 from risk_manager.properties.risk_manager_properties import MaxLeverageFactorRiskProps
 from order_executor.order_executor import OrderExecutor
 from notifications.notifications import NotificationService, TelegramNotificationProperties
+from scheduler.bar_close_scheduler import BarCloseScheduler
 from sentiment_analyzer.sentiment_analyzer import SentimentAnalyzer
+from latency_tracker.latency_tracker import LatencyTracker
+from logger.logger import configure_logging
 from dotenv import load_dotenv, find_dotenv
 
 from queue import Queue
 
 if __name__ == "__main__":
     load_dotenv(find_dotenv())
+    configure_logging()
     symbols = ["EURUSD"]
     timeframe = "M1"
     USE_SENTIMENT_ANALYZER = True
@@ -60,7 +64,12 @@ if __name__ == "__main__":
 
     CONNECT = PlatformConnector(symbol_list=symbols)
 
-    DATA_SOURCE = DataSource(events_queue=events_queue, symbol_list=symbols, timeframe=timeframe)
+    DATA_SOURCE = DataSource(
+        events_queue=events_queue,
+        symbol_list=symbols,
+        timeframe=timeframe,
+        latency_tracing=True
+    )
 
     PORTFOLIO = Portfolio(magic_number=magic_number)
 
@@ -96,6 +105,19 @@ if __name__ == "__main__":
         chat_id=os.getenv("CHAT_ID"),
     ))
 
+    try:
+        server_time_offset = BarCloseScheduler.server_time_offset_from_tick(
+            DATA_SOURCE.get_latest_tick(symbols[0])["time"]
+        )
+    except ValueError:
+        print("WARN: Could not derive the server time offset from the last tick, assuming UTC.")
+        server_time_offset = 0
+
+    SCHEDULER = BarCloseScheduler(
+        symbol_timeframes=[(symbol, timeframe) for symbol in symbols],
+        server_time_offset=server_time_offset
+    )
+
     TRADING_DIRECTOR = TradingDirector(
         events_queue=events_queue,
         data_source=DATA_SOURCE,
@@ -103,7 +125,9 @@ if __name__ == "__main__":
         position_sizer=POSITION_SIZER,
         risk_manager=RISK_MANAGER,
         order_executor=ORDER_EXECUTOR,
-        notification_service=NOTIFICATION
+        notification_service=NOTIFICATION,
+        scheduler=SCHEDULER,
+        latency_tracker=LatencyTracker()
     )
 
     TRADING_DIRECTOR.run()
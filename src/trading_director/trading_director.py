@@ -9,13 +9,20 @@ from events.events import (
     OrderEvent,
     ExecutionEvent,
     PlacedPendingOrderEvent,
+    event_validation,
+    mark_trace,
 )
 from position_sizer.position_sizer import PositionSizer
 from strategy_manager.strategy_manager import StrategyManager
 from risk_manager.risk_manager import RiskManager
 from order_executor.order_executor import OrderExecutor
 from notifications.notifications import NotificationService
-from utils.utils import Utils
+from scheduler.bar_close_scheduler import BarCloseScheduler
+from latency_tracker.latency_tracker import LatencyTracker
+from event_journal.event_journal import EventJournalWriter
+from logger.logger import get_logger, PER_BAR
+
+logger = get_logger("trading_director")
 
 
 class TradingDirector():
@@ -28,7 +35,11 @@ class TradingDirector():
         position_sizer: PositionSizer,
         risk_manager: RiskManager,
         order_executor: OrderExecutor,
-        notification_service: NotificationService
+        notification_service: NotificationService,
+        scheduler: BarCloseScheduler | None = None,
+        validate_events: bool = True,
+        latency_tracker: LatencyTracker | None = None,
+        event_journal: EventJournalWriter | None = None
     ) -> None:
         self.events_queue = events_queue
         self.DATA_SOURCE = data_source
@@ -37,7 +48,12 @@ class TradingDirector():
         self.RISK_MANAGER = risk_manager
         self.ORDER_EXECUTOR = order_executor
         self.NOTIFICATION = notification_service
+        self.SCHEDULER = scheduler
         self.contrinue_trading: bool = True
+        self.LATENCY_TRACKER = latency_tracker
+        self.EVENT_JOURNAL = event_journal
+        self.validate_events = validate_events  # Applied while run() lasts
+        self._next_poll_time: float = 0.0  # Used for fixed-interval polling when no scheduler is set
         self.event_handler: Dict[str, Callable] = {
             "DATA": self._handle_data_event,
             "STRATEGY": self._handle_strategy_event,
@@ -48,44 +64,50 @@ class TradingDirector():
         }
 
     def _handle_data_event(self, event: DataEvent) -> None:
-        print(
-            f"{Utils.dateprint()} - Receiving DATA EVENT from: {event.symbol} "
-            f"- last close price: {event.data.close}"
+        logger.debug(
+            "Receiving DATA EVENT from: %s - last close price: %s", event.symbol, event.data.close,
+            extra=PER_BAR
         )
         self.STRATEGY_MANAGER.generate_strategy(event)
 
     def _handle_strategy_event(self, event: StrategyEvent) -> None:
-        print(
-            f"{Utils.dateprint()} - Receiving STRATEGY EVENT for: {event.strategy} from: {event.symbol} "
+        logger.info(
+            "Receiving STRATEGY EVENT",
+            extra={"fields": {"symbol": event.symbol, "strategy": event.strategy.value}}
         )
         self.POSITION_SIZER.size_strategy(event)
 
     def _handle_sizing_event(self, event: SizingEvent) -> None:
-        print(
-            f"{Utils.dateprint()} - Receiving SIZING EVENT with position size: {event.volume} "
-            f"for: {event.strategy} from: {event.symbol} "
+        logger.info(
+            "Receiving SIZING EVENT",
+            extra={"fields": {"symbol": event.symbol, "strategy": event.strategy.value, "volume": event.volume}}
         )
         self.RISK_MANAGER.assess_order(event)
 
     def _handle_order_event(self, event: OrderEvent) -> None:
-        print(
-            f"{Utils.dateprint()} - Receiving ORDER EVENT with position size: {event.volume} "
-            f"for: {event.strategy} from: {event.symbol} "
+        logger.info(
+            "Receiving ORDER EVENT",
+            extra={"fields": {"symbol": event.symbol, "strategy": event.strategy.value, "volume": event.volume}}
         )
         self.ORDER_EXECUTOR.execute_order(event)
 
     def _handle_execution_event(self, event: ExecutionEvent) -> None:
-        print(
-            f"{Utils.dateprint()} - Receiving EXECUTION EVENT for: {event.strategy} in {event.symbol} "
-            f"with volume: {event.volume} at price: {event.fill_price}  "
+        logger.info(
+            "Receiving EXECUTION EVENT",
+            extra={"fields": {
+                "symbol": event.symbol, "strategy": event.strategy.value,
+                "volume": event.volume, "price": event.fill_price
+            }}
         )
         self._process_execution_or_pending_events(event)
 
     def _handle_pending_order_event(self, event: PlacedPendingOrderEvent) -> None:
-        print(
-            f"{Utils.dateprint()} - Receiving PLACED PENDING ORDER EVENT for: {event.strategy} "
-            f"{event.target_order} "
-            f"in {event.symbol} with volume: {event.volume} at price: {event.fill_price}  "
+        logger.info(
+            "Receiving PLACED PENDING ORDER EVENT",
+            extra={"fields": {
+                "symbol": event.symbol, "strategy": event.strategy.value, "order": event.target_order.value,
+                "volume": event.volume, "price": event.target_price
+            }}
         )
         self._process_execution_or_pending_events(event)
 
@@ -94,6 +116,9 @@ class TradingDirector():
         Process execution or pending order events.
         This method is a placeholder for future implementation.
         """
+        if self.LATENCY_TRACKER is not None:
+            self.LATENCY_TRACKER.record(mark_trace(event.trace, "execution"))
+
         if isinstance(event, ExecutionEvent):
             self.NOTIFICATION.send_notification(
                 title=f"{event.symbol} - MARKET ORDER",
@@ -111,44 +136,87 @@ class TradingDirector():
                 )
             )
         else:
-            print(f"Unknown event type: {type(event)}")
+            logger.warning("Unknown event type: %s", type(event))
 
     def _handle_none_event(self, event: None) -> None:
         """
         Handle None events. This method is a placeholder for future implementation.
         """
-        print("Received None event")
+        logger.warning("Received None event")
         self.contrinue_trading = False
 
     def _handle_unknown_event(self, event) -> None:
         """
         Handle unknown events. This method is a placeholder for future implementation.
         """
-        print(f"Unknown event type: {type(event)}")
+        logger.warning("Unknown event type: %s", type(event))
         self.contrinue_trading = False
 
+    def _seconds_until_next_poll(self) -> float:
+        if self.SCHEDULER is not None:
+            return self.SCHEDULER.seconds_until_next_poll()
+        return max(0.0, self._next_poll_time - time.monotonic())
+
+    def _journal_bar_history(self) -> None:
+        """Journal the bars the data source already holds, so a replay starts from the same history."""
+        for (symbol, timeframe), buffer in self.DATA_SOURCE.bar_history.items():
+            self.EVENT_JOURNAL.write_history(symbol, timeframe, buffer.to_bar_store())
+
+    def _poll_data_source(self) -> None:
+        if self.EVENT_JOURNAL is not None:
+            self.EVENT_JOURNAL.flush()  # The loop is idle, persist what was journaled so far
+        self.DATA_SOURCE.check_for_new_data()
+        if self.SCHEDULER is not None:
+            timeframe = self.DATA_SOURCE.timeframe
+            self.SCHEDULER.on_poll({
+                (symbol, timeframe): bar_time for symbol, bar_time in self.DATA_SOURCE.last_bar_time.items()
+            })
+        else:
+            self._next_poll_time = time.monotonic() + 1  # Poll once per second
+
+    def _dispatch_event(self, event) -> None:
+        if event is not None:
+            if self.EVENT_JOURNAL is not None:
+                self.EVENT_JOURNAL.write(event)
+            handler = self.event_handler.get(event.event_type, self._handle_unknown_event)
+            if handler is not None:
+                handler(event)
+            else:
+                logger.warning("Unhandled event type: %s", event.event_type)
+        else:
+            self._handle_none_event(event)
+
     def run(self) -> None:
         """
         Main loop for the trading director. It will run until the continue_trading flag is set to False.
-        It will get the next event from the queue and process it.
+        Queued events are processed back-to-back. When the queue is empty, the loop waits until the
+        next poll of the data source is due, waking up early if an event is queued meanwhile.
         """
+        with event_validation(self.validate_events):
+            try:
+                self._run()
+            finally:
+                self.STRATEGY_MANAGER.shutdown()
+
+    def _run(self) -> None:
+        if self.EVENT_JOURNAL is not None:
+            self._journal_bar_history()
+
         while self.contrinue_trading:
             try:
-                event = self.events_queue.get(block=False)
+                event = self.events_queue.get(timeout=self._seconds_until_next_poll())
 
             except queue.Empty:
-                self.DATA_SOURCE.check_for_new_data()
+                self._poll_data_source()
 
             else:
-                if event is not None:
-                    handler = self.event_handler.get(event.event_type, self._handle_unknown_event)
-                    if handler is not None:
-                        handler(event)
-                    else:
-                        print(f"Unhandled event type: {event.event_type}")
-                else:
-                    self._handle_none_event(event)
-
-            time.sleep(1)  # Sleep for a short time to avoid busy waiting
-
-        print("Exiting trading director run loop")
+                self._dispatch_event(event)
+                # Cross-sectional: the DATA events of a poll are all queued together, flush once they are handled
+                if self.STRATEGY_MANAGER.cross_sectional and self.events_queue.empty():
+                    self.STRATEGY_MANAGER.flush_cross_section()
+
+        logger.info("Exiting trading director run loop")
+        if self.EVENT_JOURNAL is not None:
+            self.EVENT_JOURNAL.flush()
+        if self.LATENCY_TRACKER is not None:
+            logger.info("Bar-to-fill latency per stage:\n%s", self.LATENCY_TRACKER.report())
@@ -14,6 +14,29 @@ class Utils():
         """
         return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
+    @staticmethod
+    def timeframe_to_seconds(timeframe: str) -> int:
+        """
+        Returns the duration in seconds of a bar of the given timeframe (e.g. 'M15' -> 900).
+        """
+        timeframe_seconds = {
+            'M1': 60,
+            'M5': 300,
+            'M15': 900,
+            'M30': 1800,
+            'H1': 3600,
+            'H4': 14400,
+            'D1': 86400,
+            'W1': 604800,
+        }
+        try:
+            return timeframe_seconds[timeframe.upper()]
+        except KeyError:
+            raise ValueError(
+                f"Invalid timeframe: {timeframe}. "
+                f"Valid options are: {list(timeframe_seconds.keys())}"
+            )
+
     @staticmethod
     def convert_currency_amount_to_another_currency(
         amount: float, from_currency: str, to_currency: str
@@ -0,0 +1,72 @@
+import os
+import sys
+import types
+from types import SimpleNamespace
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+
+def _metatrader5_stub() -> types.ModuleType:
+    """
+    Offline stand-in for the MetaTrader5 package (Windows only): the constants and the
+    symbol/account queries used by the backtesting components, for a USD account.
+    """
+    mt5 = types.ModuleType("MetaTrader5")
+    constants = {
+        "TIMEFRAME_M1": 1, "TIMEFRAME_M5": 5, "TIMEFRAME_M15": 15, "TIMEFRAME_M30": 30,
+        "TIMEFRAME_H1": 16385, "TIMEFRAME_H4": 16388, "TIMEFRAME_D1": 16408,
+        "TIMEFRAME_W1": 32769, "TIMEFRAME_MN1": 49153,
+        "ORDER_TYPE_BUY": 0, "ORDER_TYPE_SELL": 1, "ORDER_TYPE_BUY_LIMIT": 2, "ORDER_TYPE_SELL_LIMIT": 3,
+        "ORDER_TYPE_BUY_STOP": 4, "ORDER_TYPE_SELL_STOP": 5,
+        "ORDER_BUY_LIMIT": 2, "ORDER_SELL_LIMIT": 3, "ORDER_BUY_STOP": 4, "ORDER_SELL_STOP": 5,
+        "TRADE_ACTION_DEAL": 1, "TRADE_ACTION_PENDING": 5, "TRADE_ACTION_REMOVE": 8,
+        "ORDER_FILLING_IOC": 1, "ORDER_TIME_GTC": 0, "TRADE_RETCODE_DONE": 10009,
+        "ACCOUNT_TRADE_MODE_DEMO": 0, "ACCOUNT_TRADE_MODE_REAL": 2,
+    }
+    for name, value in constants.items():
+        setattr(mt5, name, value)
+    mt5.initialize = lambda *args, **kwargs: True
+    mt5.shutdown = lambda: None
+    mt5.last_error = lambda: (0, "ok")
+    mt5.positions_get = lambda **kwargs: ()
+    mt5.symbol_info = lambda symbol: SimpleNamespace(
+        point=1e-5, volume_min=0.01, volume_max=100.0, volume_step=0.01, trade_contract_size=100000,
+        trade_tick_size=1e-5, currency_profit="USD", visible=True
+    )
+    mt5.account_info = lambda: SimpleNamespace(
+        equity=10000.0, balance=10000.0, currency="USD", leverage=100, trade_mode=0
+    )
+    return mt5
+
+
+try:
+    import MetaTrader5  # noqa: F401
+except ImportError:
+    sys.modules["MetaTrader5"] = _metatrader5_stub()
+
+
+def _make_bars(seed: int, count: int = 600):
+    """Random-walk M15 bars around 1.10, so both strategies trade often."""
+    from bar_store.bar_store import BarStore
+
+    rng = np.random.default_rng(seed)
+    close = 1.10 + np.cumsum(rng.normal(0, 4e-4, count)) + 0.004 * np.sin(np.arange(count) / 9.0)
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    spread = rng.uniform(1e-5, 3e-4, count)
+    return BarStore(
+        time=1_699_999_200 + np.arange(count, dtype=np.int64) * 900,
+        open=open_,
+        high=np.maximum(open_, close) + spread,
+        low=np.minimum(open_, close) - spread,
+        close=close,
+        tickvol=np.full(count, 100, dtype=np.int64),
+        vol=np.zeros(count, dtype=np.int64),
+        spread=np.full(count, 2, dtype=np.int64),
+    )
+
+
+@pytest.fixture
+def make_bars():
+    return _make_bars
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+from backtesting.backtest_runner_mt5.backtest_runner_mt5 import run_backtest
+from risk_manager.properties.risk_manager_properties import MaxLeverageFactorRiskProps
+from strategy_manager.properties.strategy_manager_properties import MACrossoverProps, RSIProps
+
+STRATEGIES = {
+    "ma": MACrossoverProps(timeframe="M15", fast_period=5, slow_period=20),
+    "rsi_sl_tp": RSIProps(timeframe="M15", rsi_period=14, rsi_upper=65, rsi_lower=35, sl_points=300, tp_points=600),
+}
+
+RISK = MaxLeverageFactorRiskProps(max_leverage_factor=1000)
+
+
+def without_ticket(trade_log: list[dict]) -> list[dict]:
+    return [{key: value for key, value in trade.items() if key != "ticket"} for trade in trade_log]
+
+
+@pytest.mark.parametrize("strategy", list(STRATEGIES), ids=list(STRATEGIES))
+def test_resumed_backtest_matches_full_run(make_bars, tmp_path, strategy):
+    properties = STRATEGIES[strategy]
+    bars = {"EURUSD": make_bars(1), "GBPUSD": make_bars(2)}
+    first_half = {symbol: store.slice(0, 300) for symbol, store in bars.items()}
+    snapshot_path = str(tmp_path / "backtest.pkl")
+
+    full = run_backtest(properties, bars, "M15", risk_properties=RISK, record_equity=True)
+    partial = run_backtest(
+        properties, first_half, "M15", risk_properties=RISK, record_equity=True, snapshot_path=snapshot_path
+    )
+    resumed = run_backtest(
+        properties, bars, "M15", risk_properties=RISK, record_equity=True, snapshot_path=snapshot_path
+    )
+
+    assert 0 < len(partial.trade_log) < len(full.trade_log)
+    assert without_ticket(resumed.trade_log) == without_ticket(full.trade_log)
+    assert np.array_equal(resumed.equity_time, full.equity_time)
+    assert np.array_equal(resumed.equity, full.equity)
+    assert resumed.bars_processed == full.bars_processed
+    if isinstance(properties, RSIProps):
+        assert any(trade["sl"] != 0 or trade["tp"] != 0 for trade in resumed.trade_log)
+
+
+def test_snapshot_of_other_bars_is_rejected(make_bars, tmp_path):
+    properties = STRATEGIES["ma"]
+    bars = make_bars(1)
+    snapshot_path = str(tmp_path / "backtest.pkl")
+    run_backtest(properties, {"EURUSD": bars.slice(0, 300)}, "M15", snapshot_path=snapshot_path)
+
+    with pytest.raises(ValueError):  # Starts later, so the replayed bars are not there
+        run_backtest(properties, {"EURUSD": bars.slice(10, 600)}, "M15", snapshot_path=snapshot_path)
@@ -0,0 +1,101 @@
+from datetime import datetime, timezone
+import pytest
+from scheduler.bar_close_scheduler import BarCloseScheduler
+
+HOUR = 3600
+
+
+def utc(*args) -> int:
+    return int(datetime(*args, tzinfo=timezone.utc).timestamp())
+
+
+def make_scheduler(pairs, start, **kwargs):
+    now = [float(start)]
+    scheduler = BarCloseScheduler(symbol_timeframes=pairs, clock=lambda: now[0], **kwargs)
+    return scheduler, now
+
+
+def test_next_bar_close_on_boundaries():
+    wednesday = utc(2024, 1, 10, 10, 3)
+    scheduler, _ = make_scheduler([("EURUSD", "M15")], wednesday)
+    assert scheduler.next_bar_close() == utc(2024, 1, 10, 10, 15)
+
+    scheduler, _ = make_scheduler([("EURUSD", "M15"), ("GBPUSD", "H1")], utc(2024, 1, 10, 10, 15))
+    assert scheduler.next_bar_close() == utc(2024, 1, 10, 10, 30)
+
+
+@pytest.mark.parametrize("timeframe, offset, expected", [
+    ("H4", 0, utc(2024, 1, 10, 12)),
+    ("H4", 2 * HOUR, utc(2024, 1, 10, 14)),
+    ("D1", 2 * HOUR, utc(2024, 1, 10, 22)),
+    ("D1", 3 * HOUR, utc(2024, 1, 10, 21)),
+])
+def test_server_time_offset_moves_the_boundaries(timeframe, offset, expected):
+    scheduler, _ = make_scheduler([("EURUSD", timeframe)], utc(2024, 1, 10, 10, 3), server_time_offset=offset)
+    assert scheduler.next_bar_close() == expected
+
+
+def test_weekly_bars_close_on_the_broker_week_start():
+    scheduler, _ = make_scheduler(
+        [("EURUSD", "W1")], utc(2024, 1, 10, 10, 3), server_time_offset=2 * HOUR, skip_weekends=False
+    )
+    assert scheduler.next_bar_close() == utc(2024, 1, 13, 22)  # Sunday 00:00 server time
+
+    scheduler, _ = make_scheduler(
+        [("EURUSD", "W1")], utc(2024, 1, 10, 10, 3), week_start=0, skip_weekends=False
+    )
+    assert scheduler.next_bar_close() == utc(2024, 1, 15)
+
+
+def test_weekend_is_skipped():
+    scheduler, now = make_scheduler([("EURUSD", "M15")], utc(2024, 1, 12, 20, 50))
+    assert scheduler.next_bar_close() == utc(2024, 1, 12, 21)  # Bar closing at the weekend close
+
+    now[0] = utc(2024, 1, 12, 21, 0) + 30
+    assert scheduler.next_bar_close() == utc(2024, 1, 14, 21)
+
+    scheduler, _ = make_scheduler([("EURUSD", "W1")], utc(2024, 1, 10, 10, 3), server_time_offset=2 * HOUR)
+    assert scheduler.next_bar_close() == utc(2024, 1, 14, 21)  # The weekly bar is published on the reopening
+
+
+def test_expected_bar_over_the_weekend_is_the_last_one_before_the_close():
+    scheduler, _ = make_scheduler([("EURUSD", "M15")], utc(2024, 1, 13, 12))
+    assert scheduler.expected_bar_time("EURUSD", "M15") == utc(2024, 1, 12, 20, 45)
+
+    scheduler, _ = make_scheduler([("EURUSD", "H1")], utc(2024, 1, 13, 12), server_time_offset=2 * HOUR)
+    assert scheduler.expected_bar_time("EURUSD", "H1") == utc(2024, 1, 12, 22)  # Server time
+
+
+def test_retries_until_every_pair_has_its_new_bar():
+    pairs = [("EURUSD", "M15"), ("GBPUSD", "M15")]
+    scheduler, now = make_scheduler(pairs, utc(2024, 1, 10, 10, 15) + 0.5, retry_interval=1.0, close_delay=0.5)
+    new_bar, old_bar = utc(2024, 1, 10, 10), utc(2024, 1, 10, 9, 45)
+
+    scheduler.on_poll({("EURUSD", "M15"): new_bar, ("GBPUSD", "M15"): old_bar})
+    assert scheduler.pending == [("GBPUSD", "M15")]
+    assert scheduler.seconds_until_next_poll() == 1.0
+
+    for _ in range(10):  # No cap on the retries, the missing bar is still expected
+        now[0] += 1.0
+        scheduler.on_poll({("EURUSD", "M15"): new_bar, ("GBPUSD", "M15"): old_bar})
+        assert scheduler.seconds_until_next_poll() == 1.0
+
+    now[0] += 1.0
+    scheduler.on_poll({("EURUSD", "M15"): new_bar, ("GBPUSD", "M15"): new_bar})
+    assert scheduler.pending == []
+    assert scheduler.seconds_until_next_poll() == utc(2024, 1, 10, 10, 30) + 0.5 - now[0]
+
+
+def test_unreported_pairs_are_not_waited_for():
+    scheduler, now = make_scheduler([("EURUSD", "M15"), ("EURUSD", "H1")], utc(2024, 1, 10, 11, 0) + 0.5)
+    scheduler.on_poll({("EURUSD", "m15"): utc(2024, 1, 10, 10, 45)})
+    assert scheduler.pending == []
+    assert scheduler.seconds_until_next_poll() == utc(2024, 1, 10, 11, 15) + 0.5 - now[0]
+
+
+def test_server_time_offset_from_tick():
+    now = utc(2024, 1, 10, 10, 3)
+    assert BarCloseScheduler.server_time_offset_from_tick(now + 2 * HOUR - 4, now) == 2 * HOUR
+    assert BarCloseScheduler.server_time_offset_from_tick(now - 3, now) == 0
+    with pytest.raises(ValueError):
+        BarCloseScheduler.server_time_offset_from_tick(now - 2 * 86400, now)  # Stale weekend tick
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+from backtesting.backtest_runner_mt5.backtest_runner_mt5 import run_backtest
+from backtesting.event_queue_mt5.event_queue_mt5 import BacktestEventQueue
+from backtesting.journal_data_source_mt5.journal_data_source_mt5 import JournalReplayDataSource
+from event_journal.event_journal import EventJournalWriter
+from events.events import DataEvent
+from risk_manager.properties.risk_manager_properties import MaxLeverageFactorRiskProps
+from strategy_manager.properties.strategy_manager_properties import MACrossoverProps, RSIProps
+
+SYMBOL_SETS = {
+    "one_symbol": {"EURUSD": 1},
+    "two_symbols": {"EURUSD": 1, "GBPUSD": 2},
+}
+
+STRATEGIES = {
+    "ma": MACrossoverProps(timeframe="M15", fast_period=5, slow_period=20),
+    "rsi": RSIProps(timeframe="M15", rsi_period=14, rsi_upper=70, rsi_lower=30, sl_points=0, tp_points=0),
+    "rsi_sl_tp": RSIProps(timeframe="M15", rsi_period=14, rsi_upper=65, rsi_lower=35, sl_points=300, tp_points=600),
+}
+
+RISK = MaxLeverageFactorRiskProps(max_leverage_factor=1000)
+
+HISTORY_BARS = 100
+
+
+def without_ticket(trade_log: list[dict]) -> list[dict]:
+    return [{key: value for key, value in trade.items() if key != "ticket"} for trade in trade_log]
+
+
+def write_journal(path: str, bars: dict) -> None:
+    """Journal of a live session: the warm-up history, then the data events in time order."""
+    with EventJournalWriter(path) as journal:
+        for symbol, store in bars.items():
+            journal.write_history(symbol, "M15", store.slice(0, HISTORY_BARS))
+        for index in range(HISTORY_BARS, len(next(iter(bars.values())))):
+            for symbol, store in bars.items():
+                journal.write(DataEvent(symbol=symbol, data=store.bar(index), timeframe="M15"))
+
+
+def assert_same_run(fast_forward, normal) -> None:
+    assert len(normal.trade_log) > 5
+    assert without_ticket(fast_forward.trade_log) == without_ticket(normal.trade_log)
+    assert np.array_equal(fast_forward.equity_time, normal.equity_time)
+    assert np.array_equal(fast_forward.equity, normal.equity)
+
+
+@pytest.mark.parametrize("symbols", list(SYMBOL_SETS), ids=list(SYMBOL_SETS))
+@pytest.mark.parametrize("strategy", list(STRATEGIES), ids=list(STRATEGIES))
+def test_fast_forward_matches_normal_run(make_bars, strategy, symbols):
+    bars = {symbol: make_bars(seed) for symbol, seed in SYMBOL_SETS[symbols].items()}
+    properties = STRATEGIES[strategy]
+
+    normal = run_backtest(properties, bars, "M15", risk_properties=RISK, record_equity=True)
+    fast_forward = run_backtest(
+        properties, bars, "M15", risk_properties=RISK, record_equity=True, fast_forward=True
+    )
+
+    assert_same_run(fast_forward, normal)
+
+
+@pytest.mark.parametrize("symbols", list(SYMBOL_SETS), ids=list(SYMBOL_SETS))
+@pytest.mark.parametrize("strategy", list(STRATEGIES), ids=list(STRATEGIES))
+def test_fast_forward_matches_normal_journal_replay(make_bars, tmp_path, strategy, symbols):
+    bars = {symbol: make_bars(seed) for symbol, seed in SYMBOL_SETS[symbols].items()}
+    properties = STRATEGIES[strategy]
+    journal_path = str(tmp_path / "session.evj")
+    write_journal(journal_path, bars)
+
+    def replay(fast_forward: bool):
+        data_source = JournalReplayDataSource(BacktestEventQueue(), journal_path, "M15")
+        return run_backtest(
+            properties, data_source, "M15", risk_properties=RISK, record_equity=True, fast_forward=fast_forward
+        )
+
+    assert_same_run(replay(fast_forward=True), replay(fast_forward=False))
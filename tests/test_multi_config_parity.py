@@ -0,0 +1,27 @@
+import pytest
+from backtesting.multi_config_backtester_mt5.multi_config_backtester_mt5 import MultiConfigBacktester
+from backtesting.parameter_sweep_mt5.parameter_sweep_mt5 import ParameterSweep
+from backtesting.vectorized_backtester_mt5.vectorized_backtester_mt5 import VectorizedBacktester
+from strategy_manager.properties.strategy_manager_properties import MACrossoverProps, RSIProps
+
+CONFIGURATIONS = ParameterSweep.expand_grid(
+    MACrossoverProps(timeframe="M15", fast_period=5, slow_period=20),
+    {"fast_period": [3, 12], "slow_period": [20, 40, 70, 100]},
+) + ParameterSweep.expand_grid(
+    RSIProps(timeframe="M15", rsi_period=14, rsi_upper=70, rsi_lower=30, sl_points=300, tp_points=600),
+    {"rsi_period": [2, 14, 90], "rsi_upper": [65, 75]},
+)
+
+
+@pytest.mark.parametrize("chunk_size", [64, 1000, 100000])
+def test_multi_config_trade_logs_match_vectorized_runs(make_bars, chunk_size):
+    bars = {"EURUSD": make_bars(1), "GBPUSD": make_bars(2)}
+
+    result = MultiConfigBacktester(bars, magic_number=3, chunk_size=chunk_size).run_configs(CONFIGURATIONS)
+    vectorized = VectorizedBacktester(bars, magic_number=3)
+
+    assert result.errors == {}
+    for index, properties in enumerate(CONFIGURATIONS):
+        expected = vectorized.run(properties).trade_log
+        assert len(expected) > 0, properties
+        assert result.trade_log(index) == expected, properties
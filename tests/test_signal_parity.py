@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+from backtesting.data_source_mt5.data_source_mt5 import MT5BacktestDataSource
+from backtesting.event_queue_mt5.event_queue_mt5 import BacktestEventQueue
+from backtesting.platform_conector_mt5.platform_connector_mt5 import BacktestPlatformConnector
+from events.events import DataEvent, StrategyType
+from indicator_engine.indicator_engine import IndicatorEngine
+from portfolio.portfolio import Portfolio
+from strategy_manager.properties.strategy_manager_properties import MACrossoverProps, RSIProps
+from strategy_manager.strategies.strategy_ma_crossover import StrategyMACrossover
+from strategy_manager.strategies.strategy_rsi_mr import StrategyRSI
+
+PROPERTIES = [
+    MACrossoverProps(timeframe="M15", fast_period=2, slow_period=3),
+    MACrossoverProps(timeframe="M15", fast_period=5, slow_period=20),
+    MACrossoverProps(timeframe="M15", fast_period=12, slow_period=100),
+    RSIProps(timeframe="M15", rsi_period=2, rsi_upper=80, rsi_lower=20, sl_points=0, tp_points=0),
+    RSIProps(timeframe="M15", rsi_period=14, rsi_upper=70, rsi_lower=30, sl_points=0, tp_points=0),
+    RSIProps(timeframe="M15", rsi_period=50, rsi_upper=55, rsi_lower=45, sl_points=200, tp_points=400),
+]
+
+
+def per_bar_signals(strategy, bars) -> np.ndarray:
+    """
+    Signal of every bar as generate_strategy produces it when the bars arrive one at a time.
+    The portfolio stays flat, so every BUY or SELL signal gives a StrategyEvent.
+    """
+    events_queue = BacktestEventQueue()
+    data_source = MT5BacktestDataSource.from_bars(events_queue, {"EURUSD": bars}, "M15")
+    platform_connector = BacktestPlatformConnector(initial_balance=10000.0)
+    portfolio = Portfolio(magic_number=0, platform_connector=platform_connector)
+    indicator_engine = IndicatorEngine(data_source)
+
+    signals = np.zeros(len(bars), dtype=np.int8)
+    for index in range(len(bars)):
+        data_source.cursors["EURUSD"] = index + 1
+        event = DataEvent(symbol="EURUSD", data=bars.bar(index), timeframe="M15")
+        indicator_engine.update("EURUSD", "M15", event.data)
+        strategy_event = strategy.generate_strategy(
+            event, data_source, portfolio, None, None, None, indicator_engine
+        )
+        if strategy_event is not None:
+            signals[index] = 1 if strategy_event.strategy == StrategyType.BUY else -1
+    return signals
+
+
+PROPERTY_IDS = [
+    f"ma-{p.fast_period}-{p.slow_period}" if isinstance(p, MACrossoverProps) else f"rsi-{p.rsi_period}-sl{p.sl_points}"
+    for p in PROPERTIES
+]
+
+
+@pytest.mark.parametrize("properties", PROPERTIES, ids=PROPERTY_IDS)
+def test_batch_signals_match_per_bar_signals(make_bars, properties):
+    bars = make_bars(seed=3, count=800)
+    strategy_class = StrategyMACrossover if isinstance(properties, MACrossoverProps) else StrategyRSI
+
+    batch = strategy_class(properties=properties).generate_signals(bars)
+    per_bar = per_bar_signals(strategy_class(properties=properties), bars)
+
+    assert (batch != 0).sum() > 0
+    np.testing.assert_array_equal(batch, per_bar)
@@ -0,0 +1,50 @@
+import pytest
+from backtesting.backtest_runner_mt5.backtest_runner_mt5 import run_backtest
+from backtesting.vectorized_backtester_mt5.vectorized_backtester_mt5 import VectorizedBacktester
+from risk_manager.properties.risk_manager_properties import MaxLeverageFactorRiskProps
+from strategy_manager.properties.strategy_manager_properties import MACrossoverProps, RSIProps
+
+
+SYMBOL_SETS = {
+    "one_symbol": {"EURUSD": 1},
+    "two_symbols": {"EURUSD": 1, "GBPUSD": 2},
+}
+
+STRATEGIES = {
+    "ma": MACrossoverProps(timeframe="M15", fast_period=5, slow_period=20),
+    "ma_slow": MACrossoverProps(timeframe="M15", fast_period=12, slow_period=40),
+    "rsi": RSIProps(timeframe="M15", rsi_period=14, rsi_upper=70, rsi_lower=30, sl_points=0, tp_points=0),
+    "rsi_sl_tp": RSIProps(timeframe="M15", rsi_period=14, rsi_upper=65, rsi_lower=35, sl_points=300, tp_points=600),
+    "rsi_sl_only": RSIProps(timeframe="M15", rsi_period=9, rsi_upper=70, rsi_lower=30, sl_points=250, tp_points=0),
+}
+
+
+def without_ticket(trade_log: list[dict]) -> list[dict]:
+    return [{key: value for key, value in trade.items() if key != "ticket"} for trade in trade_log]
+
+
+@pytest.mark.parametrize("symbols", list(SYMBOL_SETS), ids=list(SYMBOL_SETS))
+@pytest.mark.parametrize("strategy", list(STRATEGIES), ids=list(STRATEGIES))
+def test_vectorized_trade_log_matches_event_driven(make_bars, strategy, symbols):
+    bars = {symbol: make_bars(seed) for symbol, seed in SYMBOL_SETS[symbols].items()}
+    properties = STRATEGIES[strategy]
+
+    event_driven = run_backtest(
+        properties, bars, "M15", risk_properties=MaxLeverageFactorRiskProps(max_leverage_factor=1000)
+    )
+    vectorized = VectorizedBacktester(bars).run(properties)
+
+    expected = without_ticket(event_driven.trade_log)
+    actual = without_ticket(vectorized.trade_log)
+    assert len(expected) > 5
+    assert {trade["symbol"] for trade in expected} == set(bars)
+    assert len(actual) == len(expected)
+    for expected_trade, actual_trade in zip(expected, actual):
+        assert actual_trade.keys() == expected_trade.keys()
+        for key, value in expected_trade.items():
+            if isinstance(value, float):
+                assert actual_trade[key] == pytest.approx(value, abs=1e-6), key
+            else:
+                assert actual_trade[key] == value, key
+    if isinstance(properties, RSIProps) and (properties.sl_points > 0 or properties.tp_points > 0):
+        assert any(trade["sl"] != 0 or trade["tp"] != 0 for trade in actual)